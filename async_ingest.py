@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+
+from import_ledger import ImportLedger
+from quiz_pipeline import QuizPipeline, Stage
+
+READ_RETRIES = 5  # re-reads of an export that changes while being read before giving up on it
+
+
+class AsyncIngest:
+    """
+    asyncio front end that reads many exports and rosters at once (e.g. from a
+    slow network share) and folds them into the pipeline's memo.
+
+    Reader tasks read each file once in a thread (at most `readers` at a time),
+    hash and decode it there and put the decoded export on a bounded queue;
+    `workers` consumers take exports off it and run match + fold in a process
+    pool sized to the batch. The sorter's caches and the pipeline memo are not
+    thread-safe: readers only touch them under the ingest's lock. A full queue blocks the readers (backpressure), so reading overlaps
+    with matching while at most `queue_size` decoded exports wait in memory.
+    Exports already in their period's import ledger are skipped after hashing.
+    Folds are remembered by the pipeline, so the imports that follow only
+    combine and merge.
+    """
+
+    def __init__(self, pipeline: QuizPipeline, readers: int = 8, queue_size: int = 4,
+                 workers: Optional[int] = None):
+        self.pipeline = pipeline
+        self.sorter = pipeline.sorter
+        self.readers = readers
+        self.queue_size = queue_size
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()  # sorter caches + pipeline memo
+
+    def ingest(self, groups: Dict[str, Sequence[str]], sheet=None) -> Dict[str, Stage]:
+        """
+        Blocking entry point: attendance file -> its quiz files in; attendance file ->
+        built delta of the files an import would still merge out (groups with none are left out).
+        """
+        return asyncio.run(self.run(groups, sheet))
+
+    async def run(self, groups: Dict[str, Sequence[str]], sheet=None) -> Dict[str, Stage]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        io_pool = ThreadPoolExecutor(max_workers=self.readers)
+        gate = asyncio.Semaphore(self.readers)
+        rosters = {att: asyncio.ensure_future(self._read_roster(loop, io_pool, att)) for att in groups}
+        pending = {att: [] for att in groups}
+        reads = [self._read_export(loop, io_pool, gate, queue, rosters[att], att, q, sheet, pending[att])
+                 for att, files in groups.items() for q in dict.fromkeys(files)]
+        # Every fold of the batch must survive until build; the larger limit lasts only this batch
+        keep = self.pipeline.reserve("fold", len(reads))
+        workers = min(self.workers, max(1, len(reads)))
+        pools = []
+
+        def cpu_pool():
+            """Started by the first fold, so a batch with nothing to fold starts no processes."""
+            if not pools:
+                # A single worker folds in a thread: not worth starting a process for
+                pools.append(ProcessPoolExecutor(workers) if workers > 1 else ThreadPoolExecutor(max_workers=1))
+            return pools[0]
+        try:
+            producers = asyncio.gather(*rosters.values(), *reads)
+            consumers = [asyncio.ensure_future(self._fold_worker(loop, cpu_pool, queue)) for _ in range(workers)]
+            drained = None
+            try:
+                await self._until(producers, consumers)
+                drained = asyncio.ensure_future(queue.join())
+                await self._until(drained, consumers)
+            finally:
+                producers.cancel()
+                if drained is not None:
+                    drained.cancel()
+                for task in consumers:
+                    task.cancel()
+                io_pool.shutdown(wait=True, cancel_futures=True)
+                for pool in pools:
+                    pool.shutdown(wait=True, cancel_futures=True)
+            # Every pending fold is memoized now: build only combines
+            return {att: self.pipeline.build([q for q in groups[att] if q in files], att, sheet, workers=1)
+                    for att, files in pending.items() if files}
+        finally:
+            self.pipeline.release("fold", keep)
+
+    @staticmethod
+    async def _until(task, consumers):
+        """Wait for `task`; consumers never finish on their own, so one that does has failed."""
+        done, _ = await asyncio.wait({task, *consumers}, return_when=asyncio.FIRST_COMPLETED)
+        for finished in done:
+            finished.result()  # re-raises the first failure
+        if task not in done:
+            await task
+
+    async def _read_roster(self, loop, io_pool, attendance_file: str) -> Stage:
+        return await loop.run_in_executor(io_pool, self._roster, attendance_file)
+
+    def _roster(self, attendance_file: str) -> Stage:
+        with self._lock:
+            return self.pipeline.roster(attendance_file)
+
+    def _read_file(self, path: str):
+        """(version, bytes) of a file, re-read if it changed while being read."""
+        for _ in range(READ_RETRIES):
+            version = self.sorter.master_version(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            if self.sorter.master_version(path) == version:
+                return version, data
+        raise ValueError(f"{os.path.basename(path)} kept changing while being read; import it once it is saved")
+
+    def _decode(self, attendance_file: str, quiz_file: str, sheet, roster: Stage):
+        """
+        Reader thread: read, hash and decode one export. False when its import ledger
+        already has it, None when its fold is memoized, else (export stage, fold key).
+        Reading, hashing and decoding run unlocked; only the cache and memo lookups take the lock.
+        """
+        version, data = self._read_file(quiz_file)
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.sorter.content_hash(quiz_file, version=version, digest=digest)
+            master_path = self.sorter.period_master_path(self.sorter.extract_period_from_path(attendance_file))
+            if ImportLedger(master_path).lookup(self.sorter.import_ledger_key(quiz_file, attendance_file, sheet)):
+                return False
+            export_key = self.pipeline.export_key(quiz_file, sheet)  # served from the hash just stored
+            fold_key = self.pipeline.fold_key(export_key, roster, True, False)
+            if self.pipeline.memoized("fold", fold_key):
+                return None
+        return Stage(export_key, self.pipeline.decode_export(quiz_file, sheet, data)), fold_key
+
+    async def _read_export(self, loop, io_pool, gate, queue, roster_task, attendance_file: str, quiz_file: str,
+                           sheet, pending: list):
+        roster = await roster_task
+        async with gate:  # a reader holds its decoded export until the queue takes it
+            item = await loop.run_in_executor(io_pool, self._decode, attendance_file, quiz_file, sheet, roster)
+            if item is False:
+                return
+            pending.append(quiz_file)
+            if item is not None:
+                export, fold_key = item
+                await queue.put((export, roster, fold_key))
+
+    async def _fold_worker(self, loop, cpu_pool, queue):
+        while True:
+            export, roster, fold_key = await queue.get()
+            value = await loop.run_in_executor(cpu_pool(), _match_fold_job, (export, roster))
+            with self._lock:
+                self.pipeline.remember("fold", fold_key, value)
+            queue.task_done()
+
+
+_SORTER = None
+
+
+def _match_fold_job(job):
+    """Executor job: match + fold one decoded export against its roster (a private pipeline per process)."""
+    global _SORTER
+    if _SORTER is None:
+        from enhanced_quiz_sorter import EnhancedQuizSorter
+        _SORTER = EnhancedQuizSorter()
+    export, roster = job
+    pipeline = QuizPipeline(_SORTER)
+    # Exports are already spread over the workers; don't start a nested pool for fuzzy matching
+    return pipeline.fold(export, roster, pipeline.match(roster, export, 1)).value
@@ -0,0 +1,201 @@
+import json
+import os
+import shutil
+import stat
+import struct
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from score_table import ScoreTable
+
+
+def replacement_mode(path: str) -> int:
+    """Permission bits for a file that replaces `path`: the current file's, else 0666 minus the umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+class ColumnarMaster:
+    """
+    Binary MASTER store ('<Period>_MASTER.qsm'): a students x quizzes int16 score
+    matrix (-1 = X) kept column-major in a memory-mapped file, so each quiz is one
+    contiguous block. An update encodes and writes only the changed blocks, into an
+    OS-level copy that atomically replaces the file, and reads are zero-copy views
+    of the mapping (a file is never modified once written).
+
+    Layout: 16-byte prefix (magic, header capacity, students, quizzes), a JSON
+    header with the student and quiz axes padded to `capacity` bytes, then the
+    columns. The header keeps slack so new quiz names rarely force a rewrite.
+    It also holds a generation that every write bumps, so versions are told apart
+    even where inode numbers are reused and mtimes are coarse.
+    """
+
+    MAGIC = b"QSM1"
+    PREFIX = struct.Struct("<4sIII")
+    DTYPE = np.dtype("<i2")
+    MISSING = -1
+
+    def __init__(self, path: str):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        """Read the header and map the columns through one open file, so both are of the same version."""
+        with open(self.path, "rb") as f:
+            self.capacity, n_students, n_quizzes, header = self._read_header(f, self.path)
+            self.students: List[str] = header["students"]
+            self.quizzes: List[str] = header["quizzes"]
+            self.generation: int = header.get("generation", 0)
+            if len(self.students) != n_students or len(self.quizzes) != n_quizzes:
+                raise ValueError(f"{self.path}: header does not match its axes")
+            self.data_offset = self.PREFIX.size + self.capacity
+            if n_students and n_quizzes:
+                self._data = np.memmap(f, dtype=self.DTYPE, mode="r", shape=(n_quizzes, n_students),
+                                       offset=self.data_offset)
+            else:  # an empty range cannot be mapped
+                self._data = np.empty((n_quizzes, n_students), dtype=self.DTYPE)
+                self._data.flags.writeable = False
+
+    @classmethod
+    def _read_header(cls, f, path: str):
+        magic, capacity, n_students, n_quizzes = cls.PREFIX.unpack(f.read(cls.PREFIX.size))
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a columnar MASTER")
+        return capacity, n_students, n_quizzes, json.loads(f.read(capacity).rstrip(b"\0 "))
+
+    @classmethod
+    def read_generation(cls, path: str) -> int:
+        """The write generation of a .qsm (part of its MASTER version); 0 for files written before it existed."""
+        with open(path, "rb") as f:
+            return cls._read_header(f, path)[3].get("generation", 0)
+
+    # ---- encoding ----
+    @classmethod
+    def encode(cls, values) -> np.ndarray:
+        """MASTER cells (int or 'X') -> int16 column."""
+        if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+            return values.astype(cls.DTYPE)  # already a ScoreTable column
+        def cell(v):
+            try:
+                return int(float(v))
+            except (TypeError, ValueError):  # 'X', blank, NaN
+                return cls.MISSING
+        return np.array([cell(v) for v in values], dtype=cls.DTYPE)
+
+    @classmethod
+    def _header_bytes(cls, students: List[str], quizzes: List[str], capacity: Optional[int] = None,
+                      generation: int = 0):
+        blob = json.dumps({"students": students, "quizzes": quizzes, "generation": generation}).encode("utf-8")
+        if capacity is None:
+            capacity = -(-(len(blob) * 2 + 1024) // 4096) * 4096  # room for more quizzes
+        if len(blob) > capacity:
+            return None, capacity
+        return blob.ljust(capacity, b" "), capacity
+
+    # ---- whole-file writes ----
+    @classmethod
+    def write_table(cls, table: ScoreTable, path: str) -> "ColumnarMaster":
+        """Write a MASTER table atomically (its matrix already is the on-disk encoding)."""
+        students, quizzes = [str(s) for s in table.students], table.quizzes
+        # Carry the generation on so a rewrite never looks like an earlier version
+        generation = cls.read_generation(path) + 1 if os.path.exists(path) else 0
+        header, capacity = cls._header_bytes(students, quizzes, generation=generation)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".qsm", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(cls.PREFIX.pack(cls.MAGIC, capacity, len(students), len(quizzes)))
+                f.write(header)
+                # Column-major: each quiz is one contiguous block
+                f.write(np.asfortranarray(table.matrix, dtype=cls.DTYPE).tobytes(order="F"))
+                f.flush()
+                os.fsync(f.fileno())
+                # mkstemp files are 0600; keep the MASTER readable/writable by the other accounts
+                if hasattr(os, "fchmod"):
+                    os.fchmod(f.fileno(), replacement_mode(path))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return cls(path)
+
+    # ---- reads ----
+    def column(self, quiz: str) -> np.ndarray:
+        """Zero-copy read-only view of one quiz column."""
+        return self._data[self.quizzes.index(quiz)]
+
+    def matrix(self) -> np.ndarray:
+        """Zero-copy read-only students x quizzes view (-1 = X)."""
+        return self._data.T
+
+    def to_table(self, quizzes: Optional[List[str]] = None, copy: bool = True) -> ScoreTable:
+        """
+        MASTER table (an in-memory copy); pass `quizzes` to read only those columns.
+        copy=False wraps the read-only mapping itself (all quizzes) for callers that only
+        read, such as rendering; it keeps showing this version after the file is replaced.
+        """
+        if quizzes is None:
+            matrix = self.matrix()
+            return ScoreTable(self.students, self.quizzes, np.array(matrix) if copy else matrix)
+        matrix = np.column_stack([self.column(q) for q in quizzes]) if quizzes and self.students else None
+        return ScoreTable(self.students, quizzes, matrix)
+
+    def to_frame(self, quizzes: Optional[List[str]] = None):
+        """pandas DataFrame of to_table() (interop)."""
+        return self.to_table(quizzes).to_frame()
+
+    def export_csv(self, csv_path: str):
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            self.to_table().write_csv(f)
+
+    # ---- column updates ----
+    def update_columns(self, columns: Dict[str, List]) -> bool:
+        """
+        Write whole quiz columns (same student axis): the file is copied by the OS, only
+        the changed quizzes are written into the copy (new quizzes are appended) and the
+        copy replaces the MASTER atomically. Readers and mappings of the old file keep
+        seeing it whole, and a crash leaves either version. Returns False when the header
+        has no room left (the caller rewrites the file instead).
+        """
+        new = [q for q in columns if q not in self.quizzes]
+        header, _ = self._header_bytes(self.students, self.quizzes + new, self.capacity, self.generation + 1)
+        if header is None:
+            return False
+        n = len(self.students)
+        column_bytes = n * self.DTYPE.itemsize
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".qsm", dir=directory)
+        os.close(fd)
+        try:
+            shutil.copyfile(self.path, tmp_path)
+            with open(tmp_path, "r+b") as f:
+                # Only the known columns are kept (drops any tail an older writer left behind)
+                f.truncate(self.data_offset + len(self.quizzes) * column_bytes)
+                for q in self.quizzes:
+                    if q in columns and n:
+                        f.seek(self.data_offset + self.quizzes.index(q) * column_bytes)
+                        f.write(self.encode(columns[q]).tobytes())
+                f.seek(0, os.SEEK_END)
+                for q in new:
+                    f.write(self.encode(columns[q]).tobytes())
+                f.seek(0)
+                f.write(self.PREFIX.pack(self.MAGIC, self.capacity, n, len(self.quizzes) + len(new)))
+                f.write(header)
+                f.flush()
+                os.fsync(f.fileno())
+                if hasattr(os, "fchmod"):
+                    os.fchmod(f.fileno(), replacement_mode(self.path))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._open()
+        return True
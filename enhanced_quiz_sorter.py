@@ -1,22 +1,77 @@
+import bisect
 import csv
+import hashlib
 import re
-import unicodedata
 import os
-import pandas as pd
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from difflib import SequenceMatcher
 from typing import List, Dict, Tuple, Optional
 from fuzzywuzzy import fuzz
 from fuzzywuzzy import process
+from score_journal import ScoreJournal, apply_changes
+from import_ledger import ImportLedger, file_sha256
+from quiz_analytics import MasterAnalytics
+from name_aliases import NameAliases
+from name_normalization import normalize_name, strip_diacritics
+from columnar_master import ColumnarMaster, replacement_mode
+from sheet_reader import is_xlsx, iter_rows, resolve_sheet
+from score_table import ScoreTable
+from quiz_pipeline import QuizPipeline, Stage
+
+try:
+    import fcntl  # advisory locks for MASTER updates (POSIX only)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+class CurveViews:
+    """
+    Read-time curve views over one MASTER (which stores raw scores).
+    Each policy is computed on first use by the pipeline's curve stage and memoized until
+    the MASTER changes; tables returned by get() (and frames from frame()) are shared,
+    so treat them as read-only.
+    """
+    def __init__(self, sorter, master: Stage, version=None):
+        self.sorter = sorter
+        self.master = master
+        self.version = version
+        self._frames: Dict[Optional[tuple], "pd.DataFrame"] = {}
+
+    def get(self, policy) -> ScoreTable:
+        return self.sorter.pipeline().curve(self.master, policy).value
+
+    def frame(self, policy) -> "pd.DataFrame":
+        """get() as a pandas DataFrame (results grid, legacy callers)."""
+        policy = self.sorter.parse_curve_policy(policy)
+        df = self._frames.get(policy)
+        if df is None:
+            df = self._frames[policy] = self.get(policy).to_frame()
+        return df
 
 class EnhancedQuizSorter:
     def __init__(self):
         self.students = []
         self.attendance_list = []
         self.quiz_data = []
+        self._roster_cache = {}
+        self._master_cache = {}
+        self._views_cache = {}
+        self._analytics_cache = {}
+        self._hash_cache = {}  # path -> (file version, sha256)
+        self._collation_keys = {}  # canonical name -> collation_key, filled when rosters are parsed
+        self._pipeline = None
         
+    def pipeline(self) -> QuizPipeline:
+        """The memoized stage pipeline every processing path of this sorter runs on."""
+        if self._pipeline is None:
+            self._pipeline = QuizPipeline(self)
+        return self._pipeline
+
     def _strip_diacritics(self, s: str) -> str:
-        return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+        return strip_diacritics(s)
 
     # Accepts: "Last, Middle, First (Nick) #123"  OR  "Last, First (Nick) #123" (no middle)
     _ATT_RX = re.compile(
@@ -38,7 +93,7 @@ class EnhancedQuizSorter:
     def parse_attendance_entry_new(self, entry: str):
         m = self._ATT_RX.match(entry.strip().strip('"'))
         if not m:
-            raise ValueError(f"Bad attendance line: {entry}")
+            raise ValueError(f"Bad attendance line: {entry} (expected 'Last, First #ID')")
         g = m.groupdict()
         first = (g["first"] or g["first2"] or "").strip()
         middle = (g["middle"] or "").strip()
@@ -46,10 +101,10 @@ class EnhancedQuizSorter:
         nick = (g["nick"] or "").strip()
         sid = g["id"].strip()
 
-        # Clean keys for matching
-        last_clean  = self._strip_diacritics(last).lower().replace("'", "'").strip()
-        first_clean = self._strip_diacritics(first).lower().strip()
-        nick_clean  = self._strip_diacritics(nick).lower().strip()
+        # Clean keys for matching (same normalization as typed quiz names)
+        last_clean  = normalize_name(last)
+        first_clean = normalize_name(first)
+        nick_clean  = normalize_name(nick)
         return {
             "last": last, "middle": middle, "first": first, "nick": nick, "id": sid,
             "last_clean": last_clean, "first_clean": first_clean, "nick_clean": nick_clean,
@@ -74,6 +129,7 @@ class EnhancedQuizSorter:
                 continue
             p = self.parse_attendance_entry_new(line)
             canonical = self._format_canonical_last_middle_first(p)
+            self._collation_keys[canonical] = self.collation_key(p["last"], p["first"], p["middle"], p["nick"], p["id"])
 
             # Keys - create multiple variations for matching
             keys = []
@@ -107,11 +163,12 @@ class EnhancedQuizSorter:
         return idx
 
     def normalize_quiz_name(self, raw: str) -> str:
-        s = self._strip_diacritics(raw.strip().strip('"'))
-        s = re.sub(r"\s+", " ", s)
-        return s.lower()
+        return normalize_name(raw)
+
+    # fuzz.ratio a typed name must exceed to match a roster key (matcher_eval sweeps this)
+    FUZZY_THRESHOLD = 80
 
-    def lookup_canonical_new(self, raw_name: str, roster_index: dict):
+    def lookup_canonical_new(self, raw_name: str, roster_index: dict, threshold: Optional[int] = None):
         key = self.normalize_quiz_name(raw_name)
         
         # Direct match
@@ -124,19 +181,92 @@ class EnhancedQuizSorter:
             return roster_index[key2]
         
         # Try fuzzy matching as fallback
-        best_match = None
-        best_score = 0
+        return _best_fuzzy_match(key, roster_index.items(), self.FUZZY_THRESHOLD if threshold is None else threshold)
+
+    def match_names(self, raw_names, roster_index: dict, workers: Optional[int] = None,
+                    threshold: Optional[int] = None) -> Dict[str, Optional[str]]:
+        """
+        lookup_canonical_new for many typed names at once: each distinct name is looked up
+        once, and the names that miss the exact lookup are fuzzy-matched together
+        (fuzzy_match_keys), in parallel when there are many of them. Names that already
+        carry a roster student's '#ID' (e.g. exports of canonical names) match that student.
+        """
+        by_id = {}
+        ids = {raw: self.student_key(raw) for raw in dict.fromkeys(raw_names) if "#" in str(raw)}
+        if ids:
+            roster_ids = {self.student_key(c): c for c in set(roster_index.values())}
+            by_id = {raw: roster_ids[sid] for raw, sid in ids.items() if sid in roster_ids}
+        keys = {raw: self.normalize_quiz_name(raw) for raw in dict.fromkeys(raw_names) if raw not in by_id}
+        found, pending = {}, []
+        for key in dict.fromkeys(keys.values()):
+            canon = roster_index.get(key) or roster_index.get(key.replace(".", ""))
+            if canon:
+                found[key] = canon
+            else:
+                pending.append(key)
+        found.update(zip(pending, self.fuzzy_match_keys(pending, roster_index, workers, threshold)))
+        return {raw: by_id[raw] if raw in by_id else found[keys[raw]] for raw in dict.fromkeys(raw_names)}
+
+    # Below this many unresolved names a process pool costs more than it saves
+    PARALLEL_FUZZY_MIN = 200
+
+    def fuzzy_match_keys(self, keys: List[str], roster_index: dict, workers: Optional[int] = None,
+                         threshold: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Fuzzy fallback of lookup_canonical_new for normalized keys, in input order.
+        Large sets are sharded across a process pool whose initializer ships the roster
+        index to each worker once; chunks come back in order, so the result does not
+        depend on the number of workers.
+        """
+        if threshold is None:
+            threshold = self.FUZZY_THRESHOLD
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(keys) // self.PARALLEL_FUZZY_MIN)
+        if workers <= 1 or len(keys) < 2:
+            items = list(roster_index.items())
+            return [_best_fuzzy_match(key, items, threshold) for key in keys]
+        chunk = -(-len(keys) // (workers * 4))  # a few chunks per worker evens out slow names
+        chunks = [keys[i:i + chunk] for i in range(0, len(keys), chunk)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fuzzy_worker,
+                                 initargs=(roster_index, threshold)) as pool:
+            return [canon for part in pool.map(_fuzzy_match_chunk, chunks) for canon in part]
+
+    def rank_candidates(self, raw_name: str, roster_index: dict, k: int = 5) -> List[Tuple[str, int]]:
+        """
+        Ranked roster candidates for a typed name: [(canonical, score 0-100)], best first.
+        Same keys and fuzz.ratio scorer as lookup_canonical_new, but every student is kept
+        (scored by their best-matching key) instead of only the one above the threshold.
+        """
+        key = self.normalize_quiz_name(raw_name)
+        key2 = key.replace(".", "")
+        best: Dict[str, int] = {}
         for roster_key, canonical in roster_index.items():
-            score = fuzz.ratio(key, roster_key)
-            if score > best_score and score > 80:  # 80% similarity threshold
-                best_score = score
-                best_match = canonical
-        
-        return best_match
+            score = 100 if roster_key in (key, key2) else fuzz.ratio(key, roster_key)
+            if score > best.get(canonical, -1):
+                best[canonical] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], self.sort_key_by_last(item[0])))
+        return ranked[:k]
+
+    def collation_key(self, last: str, first: str = "", middle: str = "", nick: str = "", sid: str = "") -> tuple:
+        """The one student order: last, first, middle, nickname (case/diacritics folded), then ID."""
+        return (normalize_name(last), normalize_name(first), normalize_name(middle), normalize_name(nick), sid)
 
-    def sort_key_by_last(self, canonical_name: str):
-        last = canonical_name.split(",", 1)[0]
-        return self._strip_diacritics(last).lower()
+    def sort_key_by_last(self, canonical_name: str) -> tuple:
+        """collation_key of a canonical name; roster students were keyed once when the roster was parsed."""
+        key = self._collation_keys.get(canonical_name)
+        if key is None:
+            try:
+                p = self.parse_attendance_entry_new(canonical_name)
+                key = self.collation_key(p["last"], p["first"], p["middle"], p["nick"], p["id"])
+            except ValueError:  # not roster-shaped, e.g. an unmatched typed name
+                last, _, rest = str(canonical_name).partition(",")
+                key = self.collation_key(last, rest)
+            self._collation_keys[canonical_name] = key
+        return key
+
+    def student_sort_key(self, student: Dict) -> tuple:
+        """collation_key of a parse_student_name dict (legacy list-of-dicts paths)."""
+        return self.collation_key(student["last"], student["first"], student["middle"], student["nickname"])
     
     def extract_period_from_path(self, path: str) -> str:
         """
@@ -144,17 +274,18 @@ class EnhancedQuizSorter:
         Examples:
           attendance/Period 1.csv -> 'Period 1'
           quiz_data/Period3_Mitosis.csv -> 'Period 3'
+          period_2_attendance.csv -> 'Period 2'
         Fallback: 'Period'
         """
         base = os.path.basename(path).lower()
-        m = re.search(r'(period\s*\d+)', base)
+        m = re.search(r'period[\s_-]*0*(\d+)', base)
         if m:
-            return m.group(1).title().replace("  ", " ")
+            return f"Period {m.group(1)}"
         # try parent folder
         parent = os.path.basename(os.path.dirname(path)).lower()
-        m = re.search(r'(period\s*\d+)', parent)
+        m = re.search(r'period[\s_-]*0*(\d+)', parent)
         if m:
-            return m.group(1).title().replace("  ", " ")
+            return f"Period {m.group(1)}"
         return "Period"
 
     def is_weird_quiz_header(self, col: str) -> bool:
@@ -207,53 +338,57 @@ class EnhancedQuizSorter:
             return re.sub(r'\s+', ' ', str(header)).strip()
         return f"Quiz {n} (/10)"
 
-    def fold_to_canonical(self, df: pd.DataFrame, use_curve: bool, curve_cap: int) -> pd.DataFrame:
+    def is_quiz_like_header(self, col) -> bool:
+        """Any header that should be folded into a canonical 'Quiz N (/10)' column."""
+        return col != "Student" and (
+            self.is_canonical_quiz(col) or self.is_weird_quiz_header(str(col)) or "quiz" in str(col).lower() or "(/10)" in str(col)
+        )
+
+    def quiz_slot_layout(self, headers) -> tuple[list[str], dict[str, int]]:
         """
-        Build a NEW dataframe that contains only:
-          - 'Student'
-          - ONE column per canonical quiz name 'Quiz N (/10)'
-        All weird/duplicate headers are folded into their canonical target using retake_merge.
+        Map quiz-like headers onto canonical quiz slots.
+        Returns (slots, header_slot):
+          - slots: canonical quiz names ordered by quiz number
+          - header_slot: source header -> index into slots (several headers may share a slot)
         """
-        if "Student" not in df.columns:
-            raise ValueError("DataFrame must contain a 'Student' column")
-
-        # Identify quiz-like columns to process (exclude 'Student').
-        quiz_like = [c for c in df.columns if c != "Student" and (
-            self.is_canonical_quiz(c) or self.is_weird_quiz_header(str(c)) or "quiz" in str(c).lower() or "(/10)" in str(c)
-        )]
-        if not quiz_like:
-            # Nothing to fold, return Student only
-            return df[["Student"]].copy()
-
-        # Group by canonical name
-        groups: dict[str, list[str]] = {}
-        for col in quiz_like:
-            canon = self.canonical_quiz_name(col)
-            groups.setdefault(canon, []).append(col)
-
-        # Start with Student only
-        out = pd.DataFrame({"Student": df["Student"]})
-
-        # For each canonical group, merge all its source columns into one
-        for canon_name, cols in groups.items():
-            series = pd.Series(["X"] * len(df), index=df.index)
-            for src in cols:
-                vals = df[src].apply(self.normalize_score_cell)
-                if use_curve:
-                    vals = vals.apply(lambda x: self.apply_curve_cap(x, curve_cap))
-                series = pd.Series([self.retake_merge(o, n) for o, n in zip(series, vals)], index=df.index)
-            out[canon_name] = series
-
-        # Order quiz columns by quiz number
+        canon_of = {h: self.canonical_quiz_name(h) for h in headers if self.is_quiz_like_header(h)}
         order = []
-        for c in out.columns:
-            if c == "Student":
-                continue
+        for c in dict.fromkeys(canon_of.values()):
             m = re.search(r'\bquiz\s*([1-9]\d*)\b', c.lower())
             n = int(m.group(1)) if m else 10_000
             order.append((n, c))
         order.sort()
-        return out[["Student"] + [c for _, c in order]]
+        slots = [c for _, c in order]
+        pos = {c: i for i, c in enumerate(slots)}
+        return slots, {h: pos[c] for h, c in canon_of.items()}
+
+    def fold_table(self, table: ScoreTable) -> ScoreTable:
+        """
+        Keep only ONE column per canonical quiz name 'Quiz N (/10)' (ordered by quiz number).
+        All weird/duplicate headers are folded into their canonical target with retake_merge,
+        which on the int16 matrix (X = -1) is a column-wise maximum.
+        """
+        slots, header_slot = self.quiz_slot_layout(table.quizzes)
+        if slots == table.quizzes and all(header_slot[q] == j for j, q in enumerate(slots)):
+            return table  # already canonical
+        out = ScoreTable(table.students, slots)
+        for j, q in enumerate(table.quizzes):
+            if q in header_slot:
+                k = header_slot[q]
+                out.matrix[:, k] = np.maximum(out.matrix[:, k], table.matrix[:, j])
+        return out
+
+    def fold_to_canonical(self, df: "pd.DataFrame", use_curve: bool, curve_cap: int) -> "pd.DataFrame":
+        """
+        Build a NEW dataframe that contains only:
+          - 'Student'
+          - ONE column per canonical quiz name 'Quiz N (/10)'
+        DataFrame interop for fold_table (optionally capped).
+        """
+        if "Student" not in df.columns:
+            raise ValueError("DataFrame must contain a 'Student' column")
+        table = self.fold_table(ScoreTable.from_frame(df))
+        return table.curved(self.curve_policy(use_curve, curve_cap)).to_frame()
 
     def normalize_score_cell(self, v):
         """Return 'X' for NaN/blank; else clamp to int 0..100."""
@@ -280,6 +415,82 @@ class EnhancedQuizSorter:
         """Curve rule: 10->9; 9->9; 8->8 ... Treat X as X."""
         return self.apply_curve_cap(v, 9)
 
+    def parse_curve_policy(self, spec) -> Optional[tuple]:
+        """
+        Curve policies are applied when a MASTER is read, never stored in it.
+          None / 'none'          -> raw scores
+          'cap:N'                -> apply_curve_cap(score, N)
+          'cap9'                 -> apply_curve_cap9
+          'linear:F' / 'linear:F:MAX' -> round(score * F), clamped to 0..MAX (default 100)
+        Returns a hashable tuple (or None for raw scores).
+        """
+        if spec is None or isinstance(spec, tuple):
+            return spec
+        parts = str(spec).strip().lower().split(":")
+        kind = parts[0]
+        if kind in {"", "none", "raw"}:
+            return None
+        if kind == "cap9":
+            return ("cap", 9)
+        if kind == "cap" and len(parts) == 2:
+            return ("cap", int(parts[1]))
+        if kind == "linear" and len(parts) in {2, 3}:
+            return ("linear", float(parts[1]), int(parts[2]) if len(parts) == 3 else 100)
+        raise ValueError(f"Unknown curve policy: {spec}")
+
+    def curve_policy(self, use_curve: bool, curve_cap: int) -> Optional[tuple]:
+        """The GUI's 'Apply curve cap' + 'Max points' settings as a curve policy."""
+        return ("cap", int(curve_cap)) if use_curve else None
+
+    def apply_curve_policy(self, v, policy):
+        """Curve one cell. Treat X as X."""
+        policy = self.parse_curve_policy(policy)
+        v = self.normalize_score_cell(v)
+        if policy is None or v == "X":
+            return v
+        if policy[0] == "cap":
+            return self.apply_curve_cap(v, policy[1])
+        _, factor, top = policy
+        return max(0, min(top, int(round(v * factor))))
+
+    def curved_view(self, master, policy):
+        """A curved copy of a MASTER table (or DataFrame, returned as one), computed over the score matrix."""
+        policy = self.parse_curve_policy(policy)
+        if isinstance(master, ScoreTable):
+            return master.curved(policy)
+        return ScoreTable.from_frame(master).curved(policy).to_frame()
+
+    def curve_views(self, master_path: str) -> "CurveViews":
+        """Memoized curved views of a MASTER; a new set starts whenever the file changes."""
+        version = self.master_version(master_path)
+        views = self._views_cache.get(master_path)
+        if views is None or views.version != version or version is None:
+            views = CurveViews(self, self.pipeline().master(master_path), version)
+            self._views_cache[master_path] = views
+        return views
+
+    def master_analytics(self, master_path: str) -> MasterAnalytics:
+        """
+        Per-quiz / per-student statistics of a MASTER. Commits made through this
+        sorter fold their deltas into the cached instance; any other change to
+        the file rebuilds it from scratch.
+        """
+        version = self.master_version(master_path)
+        analytics = self._analytics_cache.get(master_path)
+        if analytics is None or analytics.version != version or version is None:
+            analytics = MasterAnalytics(self.load_table(master_path, []), self.student_key, version)
+            self._analytics_cache[master_path] = analytics
+        return analytics
+
+    def _advance_analytics(self, master_path: str, old_version, entry: Optional[Dict], master: ScoreTable):
+        """After a commit: apply the journaled delta to cached analytics of the previous version."""
+        analytics = self._analytics_cache.get(master_path)
+        if analytics is None or old_version is None or analytics.version != old_version:
+            self._analytics_cache.pop(master_path, None)
+            return
+        analytics.apply(entry["students"] if entry else [], entry["changes"] if entry else [],
+                        self.master_version(master_path), (master.students, master.quizzes))
+
     def retake_merge(self, existing, new_value):
         """
         existing/new_value may be 'X' or int-like.
@@ -295,11 +506,509 @@ class EnhancedQuizSorter:
             return max(int(existing), int(new_value))
         return existing
 
+    MASTER_FORMATS = {"csv": ".csv", "columnar": ".qsm"}
+
     def period_master_path(self, period: str) -> str:
-        """Where we store the master CSV for a period (same directory as chosen output)."""
+        """
+        Where we store the master for a period (same directory as chosen output):
+        '{Period}_MASTER.qsm' once the period was converted to the columnar format, else the CSV.
+        """
         safe = period.replace(" ", "_")
-        return os.path.join(os.getcwd(), f"{safe}_MASTER.csv")
-        
+        base = os.path.join(os.getcwd(), f"{safe}_MASTER")
+        if os.path.exists(base + self.MASTER_FORMATS["columnar"]):
+            return base + self.MASTER_FORMATS["columnar"]
+        return base + self.MASTER_FORMATS["csv"]
+
+    def is_columnar_master(self, master_path: str) -> bool:
+        return master_path.endswith(self.MASTER_FORMATS["columnar"])
+
+    def convert_master(self, period: str, master_format: str) -> str:
+        """Switch a period MASTER between 'csv' and 'columnar' storage; returns the new path."""
+        source = self.period_master_path(period)
+        target = os.path.splitext(source)[0] + self.MASTER_FORMATS[master_format]
+        if target == source:
+            return target
+        if not os.path.exists(source):
+            raise FileNotFoundError(source)
+        with self.master_lock(source):
+            self.write_master_atomic(self.load_table(source, []), target)
+            os.unlink(source)
+        return target
+
+    def export_master_csv(self, period: str, csv_path: str) -> str:
+        """Write a period MASTER (either format) as a plain CSV."""
+        master_path = self.period_master_path(period)
+        if not os.path.exists(master_path):
+            raise FileNotFoundError(master_path)
+        if self.is_columnar_master(master_path):
+            ColumnarMaster(master_path).export_csv(csv_path)
+        else:
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                self.load_table(master_path, []).write_csv(f)
+        return csv_path
+
+    ATTENDANCE_HEADERS = {"student", "name", "period 1 attendance", '"student"'}
+    LEGACY_NAME_COLUMN = "Name"
+
+    def read_attendance_lines(self, attendance_file: str) -> List[str]:
+        """
+        Attendance lines (single column, header optional). Workbooks: first column of the first sheet.
+        Attendance lists with a 'Name' column among others (the older 'Name,Expected_Status'
+        format) are read from that column.
+        """
+        if is_xlsx(attendance_file):
+            rows = [[str(c).strip() for c in row] for row in iter_rows(attendance_file) if row]
+            if rows and len(rows[0]) > 1 and self.LEGACY_NAME_COLUMN in rows[0]:
+                col = rows[0].index(self.LEGACY_NAME_COLUMN)
+                return [row[col] for row in rows[1:] if len(row) > col and row[col]]
+            lines = [row[0] for row in rows if row[0]]
+            if lines and lines[0].lower() in self.ATTENDANCE_HEADERS:
+                return lines[1:]
+            return lines
+        with open(attendance_file, "r", encoding="utf-8", newline="") as f:
+            first_line = f.readline()
+            header = [h.strip() for h in next(csv.reader([first_line]), [])]
+            if len(header) > 1 and self.LEGACY_NAME_COLUMN in header:
+                col = header.index(self.LEGACY_NAME_COLUMN)
+                return [row[col].strip() for row in csv.reader(f) if len(row) > col and row[col].strip()]
+            # If the first line looks like a header, skip it; else include
+            if first_line.strip().lower() in self.ATTENDANCE_HEADERS:
+                return [line.strip() for line in f if line.strip()]
+            return [first_line.strip()] + [line.strip() for line in f if line.strip()]
+
+    def read_master_csv(self, path: str) -> ScoreTable:
+        """A MASTER (or snapshot) CSV as read: every non-Student column, cells encoded, nothing folded."""
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "Student" not in header:
+                raise ValueError(f"{os.path.basename(path)} has no 'Student' column")
+            si = header.index("Student")
+            cols = [i for i in range(len(header)) if i != si]
+            students, vectors = [], []
+            for row in reader:
+                if not any(row):
+                    continue
+                row += [""] * (len(header) - len(row))
+                students.append(row[si])
+                vectors.append([row[i] for i in cols])
+        return ScoreTable.from_vectors(students, [header[i] for i in cols], vectors)
+
+    def load_table(self, master_path: str, att_lines: List[str]) -> ScoreTable:
+        """
+        Read the period MASTER, or build an empty one from the full attendance so ALL students exist.
+        Legacy weird headers are folded without altering numeric values.
+        Parsed MASTERs are cached until the file changes (previews re-read it on every selection).
+        """
+        version = self.master_version(master_path)
+        cached = self._master_cache.get(master_path)
+        if version is not None and cached and cached[0] == version:
+            return cached[1].copy()
+        if version is not None and self.is_columnar_master(master_path):
+            table = ColumnarMaster(master_path).to_table()
+        elif version is not None:
+            table = self.read_master_csv(master_path)
+        else:
+            canonical_attendance = [
+                self._format_canonical_last_middle_first(self.parse_attendance_entry_new(line))
+                for line in att_lines
+            ]
+            table = ScoreTable(canonical_attendance, [])
+
+        # Deduplicate students (first row wins)
+        rows = list(table.row_index().values())
+        if len(rows) != len(table):
+            table = table.take(rows)
+        table = self.fold_table(table)
+        if version is not None:
+            self._master_cache[master_path] = (version, table.copy())
+        return table
+
+    def view_table(self, master_path: str) -> ScoreTable:
+        """
+        An existing MASTER for reading only (rendering, previews). A columnar MASTER that
+        needs no dedupe/fold is served as zero-copy, read-only views of its mapping;
+        anything else is load_table. Merge inputs must come from load_table.
+        """
+        if self.is_columnar_master(master_path) and os.path.exists(master_path):
+            table = ColumnarMaster(master_path).to_table(copy=False)
+            if len(table.row_index()) == len(table) and self.fold_table(table) is table:
+                return table
+        return self.load_table(master_path, [])
+
+    def load_master(self, master_path: str, att_lines: List[str]) -> "pd.DataFrame":
+        """load_table as a pandas DataFrame (ints and 'X'), for the GUI and other pandas callers."""
+        return self.load_table(master_path, att_lines).to_frame()
+
+    def merge_into_master(self, master: ScoreTable, delta: ScoreTable, quiz_columns: List[str]) -> ScoreTable:
+        """
+        Retake-merge every quiz column of an import into the master (kept in collation order).
+        Rows are matched by student_key like insert_students, so a student whose roster name
+        changed (same #ID) gets the scores on their existing MASTER row.
+        """
+        # Every quiz column from this import exists in the master (default X) before the merge
+        master = self.insert_students(master, delta.students).with_quizzes(quiz_columns)
+        missing = master.retake_merge(delta, quiz_columns, key=self.student_key)
+        if missing:  # insert_students adds every new ID, so this is a bug, never a skip
+            raise RuntimeError(f"Imported rows without a MASTER row: {', '.join(missing)}")
+        return self.sort_master(master)
+
+    def insert_students(self, master: ScoreTable, students) -> ScoreTable:
+        """
+        Add roster students the MASTER does not have yet (e.g. joined mid-term) with X cells.
+        Each one is bisect-inserted at its collation position, so a MASTER that is in
+        order stays in order without a re-sort. Students are matched by ID, so a renamed
+        roster entry does not create a second row.
+        """
+        present = {self.student_key(s) for s in master.students}
+        new = [s for s in dict.fromkeys(students) if self.student_key(s) not in present]
+        if not new:
+            return master.copy()
+        keys = [self.sort_key_by_last(s) for s in master.students]
+        order = list(range(len(keys)))  # final row order, as positions in the extended table
+        for i, student in enumerate(new):
+            key = self.sort_key_by_last(student)
+            pos = bisect.bisect_right(keys, key)
+            keys.insert(pos, key)
+            order.insert(pos, len(master) + i)
+        return master.with_students(new).take(order)
+
+    def sort_master(self, master: ScoreTable) -> ScoreTable:
+        """Collation order (sort_key_by_last); a MASTER that is already in order is returned as-is."""
+        keys = [self.sort_key_by_last(s) for s in master.students]
+        if all(a <= b for a, b in zip(keys, keys[1:])):
+            return master
+        return master.take(sorted(range(len(keys)), key=keys.__getitem__))
+
+    def student_key(self, canonical_name: str) -> str:
+        """Stable key for a MASTER row: the '#ID' when present, else the full canonical name."""
+        m = re.search(r'#\d+\s*$', str(canonical_name))
+        return m.group(0).strip() if m else str(canonical_name)
+
+    def diff_masters(self, before: ScoreTable, after: ScoreTable) -> Tuple[List, List]:
+        """
+        Cells that differ between two MASTER tables.
+        Returns (students, changes):
+          - students: [id, canonical] for rows only present in `after`
+          - changes:  [id, quiz, old, new] for every changed cell (missing cells count as 'X')
+        """
+        students, changes = after.diff(before)
+        return ([[self.student_key(s), s] for s in students],
+                [[self.student_key(s), q, old, new] for s, q, old, new in changes])
+
+    def score_journal(self, master_path: str) -> ScoreJournal:
+        return ScoreJournal(master_path)
+
+    def master_version(self, master_path: str):
+        """
+        Cheap change token for a MASTER file (None when it does not exist yet). A columnar
+        MASTER's write generation is part of it: a reused inode number with a coarse mtime
+        alone cannot tell two quick commits apart.
+        """
+        try:
+            st = os.stat(master_path)
+            if self.is_columnar_master(master_path):
+                return (st.st_ino, st.st_size, st.st_mtime_ns, ColumnarMaster.read_generation(master_path))
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @contextmanager
+    def master_lock(self, master_path: str):
+        """
+        Exclusive advisory lock on '<master base>.lock' held while a MASTER is committed
+        (shared by both storage formats). Without fcntl (Windows) this degrades to no locking.
+        """
+        with open(f"{os.path.splitext(master_path)[0]}.lock", "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def write_master_atomic(self, table: ScoreTable, master_path: str):
+        """Write to a temp file next to the MASTER, fsync, then os.replace so readers never see a partial file."""
+        if self.is_columnar_master(master_path):
+            ColumnarMaster.write_table(table, master_path)
+            return
+        directory = os.path.dirname(os.path.abspath(master_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".csv", dir=directory)
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                table.write_csv(f)
+                f.flush()
+                os.fsync(f.fileno())
+                # mkstemp files are 0600; keep the MASTER readable/writable by the other accounts
+                if hasattr(os, "fchmod"):
+                    os.fchmod(f.fileno(), replacement_mode(master_path))
+            os.replace(tmp_path, master_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def store_master(self, master_path: str, before: Optional[ScoreTable], after: ScoreTable):
+        """
+        Persist `after`. A columnar MASTER with the same students only gets the quiz
+        columns that differ from `before` encoded and written (update_columns); everything
+        else is a full rewrite. Both replace the file atomically.
+        """
+        if before is None or not self.is_columnar_master(master_path) or not os.path.exists(master_path):
+            self.write_master_atomic(after, master_path)
+            return
+        store = ColumnarMaster(master_path)
+        if store.students != after.students:
+            self.write_master_atomic(after, master_path)  # new students / new order
+            return
+        changed = {
+            q: after.column(q) for q in after.quizzes
+            if q not in before.quizzes or not np.array_equal(before.column(q), after.column(q))
+        }
+        if changed and not store.update_columns(changed):
+            self.write_master_atomic(after, master_path)
+
+    def update_master(self, master_path: str, delta: ScoreTable, quiz_columns: List[str], att_lines: List[str],
+                      source: Optional[str] = None, ledger_keys: Optional[List[Tuple[str, str]]] = None) -> ScoreTable:
+        """
+        Read-merge-write a MASTER safely under concurrent imports.
+        The merge runs optimistically without the lock; if another writer committed
+        in the meantime we re-merge on top of their result while holding the lock.
+        The changed cells are appended to the MASTER's score journal and every
+        (ledger key, file name) in ledger_keys is recorded in the MASTER's import ledger.
+        """
+        version = self.master_version(master_path)
+        before = self.load_table(master_path, att_lines)
+        master = self.merge_into_master(before, delta, quiz_columns)
+        with self.master_lock(master_path):
+            if self.master_version(master_path) != version:
+                version = self.master_version(master_path)
+                before = self.load_table(master_path, att_lines)
+                master = self.merge_into_master(before, delta, quiz_columns)
+            self.store_master(master_path, before if version is not None else None, master)
+            self._master_cache[master_path] = (self.master_version(master_path), master.copy())
+            entry = self._journal_commit(master_path, before if version is not None else None, master, source)
+            for key, name in ledger_keys or []:
+                ImportLedger(master_path).record(key, name, entry["seq"] if entry else None)
+            self._advance_analytics(master_path, version, entry, master)
+        return master
+
+    def _journal_commit(self, master_path: str, before: Optional[ScoreTable], after: ScoreTable,
+                        source: Optional[str], kind: str = "import", undoes: Optional[List[int]] = None):
+        """Record before->after as one journal entry (caller holds the MASTER lock)."""
+        journal = self.score_journal(master_path)
+        if before is not None and not journal.has_history():
+            # Journaling starts on an existing MASTER: keep it as the baseline snapshot
+            journal.write_snapshot(0, before, self.write_master_atomic)
+        if before is None:
+            before = ScoreTable([], [])
+        students, changes = self.diff_masters(before, after)
+        if not students and not changes:
+            return None
+        entry = journal.append(kind, students, changes, source=source, undoes=undoes)
+        if journal.needs_snapshot(entry["seq"]):
+            journal.write_snapshot(entry["seq"], after, self.write_master_atomic)
+        return entry
+
+    def undo_imports(self, master_path: str, n: int = 1) -> ScoreTable:
+        """
+        Revert the last `n` journaled imports of a MASTER.
+        A cell is only restored while it still holds the value that import wrote,
+        so later imports touching other cells survive. The undo is journaled too.
+        """
+        with self.master_lock(master_path):
+            version = self.master_version(master_path)
+            journal = self.score_journal(master_path)
+            targets = journal.undoable(n)
+            if not targets:
+                raise ValueError("Nothing to undo for this MASTER")
+            before = self.load_table(master_path, [])
+            current = {(self.student_key(row[0]), q): v
+                       for row in before.rows() for q, v in zip(before.quizzes, row[1:])}
+            inverse = []
+            for entry in targets:  # newest first
+                for sid, quiz, old, new in reversed(entry["changes"]):
+                    if current.get((sid, quiz), "X") == new:
+                        current[(sid, quiz)] = old
+                        inverse.append([sid, quiz, new, old])
+            after, _ = apply_changes(before, [], inverse, self.student_key)
+            after = self.sort_master(after)
+            self.store_master(master_path, before, after)
+            self._master_cache[master_path] = (self.master_version(master_path), after.copy())
+            entry = journal.append("undo", [], inverse, undoes=[e["seq"] for e in targets])
+            ImportLedger(master_path).forget_seqs([e["seq"] for e in targets])
+            self._advance_analytics(master_path, version, entry, after)
+        return after
+
+    def rebuild_master(self, master_path: str, seq: int) -> ScoreTable:
+        """Point-in-time MASTER as of journal entry `seq`: nearest snapshot + replayed deltas (nothing is written)."""
+        journal = self.score_journal(master_path)
+        base_seq, snap_path = journal.base_for(seq)
+        table = self.fold_table(self.read_master_csv(snap_path)) if snap_path else ScoreTable([], [])
+        for entry in journal.entries():
+            if base_seq < entry["seq"] <= seq:
+                table, _ = apply_changes(table, entry["students"], entry["changes"], self.student_key)
+        return self.sort_master(self.fold_table(table))
+
+    def with_aliases(self, roster_index: dict, master_path: str) -> dict:
+        """Roster index plus the MASTER's confirmed aliases (the cached index is not modified)."""
+        aliases = NameAliases(master_path).load()
+        if not aliases:
+            return roster_index
+        by_key = {self.student_key(c): c for c in set(roster_index.values())}
+        extra = {typed: by_key[sid] for typed, sid in aliases.items() if sid in by_key}
+        return {**roster_index, **extra}
+
+    def unmatched_scores(self, unmatched: ScoreTable) -> Dict[str, Dict]:
+        """typed name -> {quiz: score} for the rows an import could not match (X cells left out)."""
+        return {
+            row[0]: {q: v for q, v in zip(unmatched.quizzes, row[1:]) if v != "X"}
+            for row in unmatched.rows()
+        }
+
+    def resolve_unmatched(self, attendance_file: str, typed_name: str, canonical: str, scores: Dict,
+                          save_alias: bool = True) -> ScoreTable:
+        """
+        Confirm that `typed_name` is roster student `canonical`: retake-merge only that
+        student's scores into the period MASTER (journaled like any import) and remember
+        the spelling so later imports match it directly.
+        """
+        period = self.extract_period_from_path(attendance_file)
+        master_path = self.period_master_path(period)
+        att_lines, roster_index = self.load_roster(attendance_file)
+        if canonical not in set(roster_index.values()):
+            raise ValueError(f"{canonical} is not on the {period} roster")
+        if save_alias:
+            with self.master_lock(master_path):
+                NameAliases(master_path).add(self.normalize_quiz_name(typed_name), self.student_key(canonical))
+        quiz_columns = [q for q, v in scores.items() if self.normalize_score_cell(v) != "X"]
+        if not quiz_columns:
+            return self.load_table(master_path, att_lines)
+        delta = ScoreTable.from_vectors([canonical], quiz_columns, [[scores[q] for q in quiz_columns]])
+        return self.update_master(master_path, delta, quiz_columns, att_lines,
+                                  source=f"resolved: {typed_name} -> {canonical}")
+
+    def content_hash(self, path: str, version=None, digest: Optional[str] = None) -> str:
+        """
+        sha256 of a file's content, cached until the file changes (same token as master_version),
+        so a file is read once per change however many ledger/pipeline keys need it. `digest` and
+        its `version` are passed by readers that already hashed the bytes.
+        """
+        if digest is not None:
+            self._hash_cache[path] = (version, digest)
+            return digest
+        version = self.master_version(path)
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        digest = file_sha256(path)
+        self._hash_cache[path] = (version, digest)
+        return digest
+
+    def import_ledger_key(self, quiz_file: str, attendance_file: str, sheet=None) -> str:
+        # MASTERs store raw scores, so the curve is not part of an import's identity
+        settings = {"scores": "raw"}
+        sheet = resolve_sheet(quiz_file, sheet, "Student")
+        if sheet is not None:
+            settings["sheet"] = sheet  # another sheet of the same workbook is another import
+        aliases = NameAliases(self.period_master_path(self.extract_period_from_path(attendance_file))).version()
+        if aliases:
+            settings["aliases"] = aliases  # a new alias can match rows that were unmatched before
+        return ImportLedger.make_key(self.content_hash(quiz_file), settings, self.roster_version(attendance_file))
+
+    def combine_imports(self, tables: List[ScoreTable]) -> ScoreTable:
+        """Fold several folded imports (delta) into one delta with retake_merge semantics."""
+        slots, _ = self.quiz_slot_layout([q for t in tables for q in t.quizzes])
+        combined = ScoreTable(list(dict.fromkeys(s for t in tables for s in t.students)), slots)
+        for t in tables:
+            combined.retake_merge(t, [q for q in t.quizzes if q in slots])
+        return combined
+
+    def import_quiz_file(self, quiz_file: str, attendance_file: str, output_file: Optional[str] = None,
+                         curve=None, sheet=None) -> Dict:
+        """
+        Match, fold and retake-merge one quiz export (raw scores) into its period MASTER.
+        Returns status ('merged' or 'already merged'), period, master_path, master (raw ScoreTable),
+        quiz_columns and unmatched names. A file already in the MASTER's import ledger with the
+        same roster is skipped before any matching runs. output_file receives the `curve` view.
+        """
+        return self.import_quiz_files([quiz_file], attendance_file, output_file, curve, sheet=sheet)
+
+    def import_quiz_files(self, quiz_files: List[str], attendance_file: str, output_file: Optional[str] = None,
+                          curve=None, workers: Optional[int] = None, sheet=None,
+                          exports: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Merge several quiz exports of one period in a single MASTER pass: every new file is
+        matched and folded (in a process pool when there are enough), the results are
+        combined into one delta, and the MASTER is read, merged and written once. Files
+        already in the import ledger are skipped. `exports` (format -> path: csv/pdf/xlsx/json)
+        are written concurrently from the curved view, like output_file (= the csv export).
+        All of it runs on pipeline() stages, so repeating a request only redoes what changed.
+        Adds merged_files / skipped_files / exports to the import_quiz_file result.
+        """
+        period = self.extract_period_from_path(attendance_file)
+        master_path = self.period_master_path(period)
+        ledger = ImportLedger(master_path)
+        todo, keys, skipped = [], [], []
+        for q in dict.fromkeys(quiz_files):
+            key = self.import_ledger_key(q, attendance_file, sheet)
+            if ledger.lookup(key):
+                skipped.append(q)
+            else:
+                todo.append(q)
+                keys.append((key, os.path.basename(q)))
+
+        pipeline = self.pipeline()
+        if not todo:
+            table = pipeline.master(master_path)
+            result = {"status": "already merged", "period": period, "master_path": master_path,
+                      "master": table.value, "quiz_columns": [], "unmatched": [], "unmatched_scores": {}}
+            view = pipeline.curve(table, curve)
+        else:
+            stages = pipeline.run(todo, attendance_file, sheet, workers, master_path=master_path, commit=True,
+                                  source=", ".join(name for _, name in keys), ledger_keys=keys, curve=curve)
+            built = stages["built"].value
+            result = {"status": "merged", "period": period, "master_path": master_path,
+                      "master": stages["table"].value, "quiz_columns": built["quiz_columns"],
+                      "unmatched": built["unmatched"], "unmatched_scores": self.unmatched_scores(built["unmatched_delta"])}
+            view = stages["view"]
+        targets = {**({"csv": output_file} if output_file else {}), **(exports or {})}
+        if targets:
+            pipeline.render(view, targets, f"{period} – Quiz Results (updated)")
+        result["exports"] = targets
+        result["merged_files"] = todo
+        result["skipped_files"] = skipped
+        return result
+
+    def preview_import(self, quiz_file: str, attendance_file: str, sheet=None) -> Dict:
+        """
+        Dry run of import_quiz_file: same matching and retake_merge semantics, but nothing
+        is written or rendered. Returns the cells that would change and the unmatched names:
+          changes: [{"student", "quiz", "old", "new"}] where old == 'X' means an X cell fills
+        """
+        return self.preview_imports([quiz_file], attendance_file, sheet)
+
+    def preview_imports(self, quiz_files: List[str], attendance_file: str, sheet=None) -> Dict:
+        """preview_import for a multi-file import (the combined delta of all files)."""
+        period = self.extract_period_from_path(attendance_file)
+        master_path = self.period_master_path(period)
+        pipeline = self.pipeline()
+        built = pipeline.build(quiz_files, attendance_file, sheet, workers=1)
+        att_lines = pipeline.roster(attendance_file).value[0]
+        before = pipeline.master(master_path, att_lines).value
+        after = pipeline.merge(built, master_path, att_lines).value
+        students, changes = self.diff_masters(before, after)
+        names = {self.student_key(s): s for s in after.students}
+        return {
+            "period": period,
+            "master_path": master_path,
+            "new_students": [canon for _, canon in students],
+            "changes": [{"student": names.get(sid, sid), "quiz": q, "old": old, "new": new}
+                        for sid, q, old, new in changes],
+            "unmatched": built.value["unmatched"],
+        }
+
     def parse_student_name(self, full_name: str) -> Dict[str, str]:
         """
         Parse a student name in format: "Last, First Middle (Nickname) #ID"
@@ -349,19 +1058,6 @@ class EnhancedQuizSorter:
                 students.append(student_info)
         return students
     
-    def load_attendance_list(self, attendance_file: str) -> List[Dict]:
-        """
-        Load full attendance list (expected format: CSV with full names)
-        """
-        attendance = []
-        with open(attendance_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Assuming attendance file has a 'Name' column
-                student_info = self.parse_student_name(row['Name'])
-                attendance.append(student_info)
-        return attendance
-    
     def create_name_variations(self, student: Dict) -> List[str]:
         """
         Create various name variations for matching
@@ -394,10 +1090,18 @@ class EnhancedQuizSorter:
         
         return variations
     
-    def enhanced_fuzzy_match(self, partial_name: str, full_names: List[Dict]) -> Tuple[Optional[Dict], float]:
+    # Scorers tried by enhanced_fuzzy_match; the best of them counts
+    VARIATION_SCORERS = (fuzz.ratio, fuzz.partial_ratio, fuzz.token_sort_ratio, fuzz.token_set_ratio)
+    VARIATION_THRESHOLD = 70
+
+    def enhanced_fuzzy_match(self, partial_name: str, full_names: List[Dict], threshold: Optional[int] = None,
+                             scorers=None) -> Tuple[Optional[Dict], float]:
         """
         Enhanced fuzzy matching with multiple strategies
+        (defaults: VARIATION_THRESHOLD and all VARIATION_SCORERS)
         """
+        threshold = self.VARIATION_THRESHOLD if threshold is None else threshold
+        scorers = scorers or self.VARIATION_SCORERS
         best_match = None
         best_score = 0
         
@@ -407,57 +1111,28 @@ class EnhancedQuizSorter:
             
             for variation in variations:
                 # Try different matching strategies
-                scores = [
-                    fuzz.ratio(partial_name.lower(), variation.lower()),
-                    fuzz.partial_ratio(partial_name.lower(), variation.lower()),
-                    fuzz.token_sort_ratio(partial_name.lower(), variation.lower()),
-                    fuzz.token_set_ratio(partial_name.lower(), variation.lower())
-                ]
+                scores = [scorer(partial_name.lower(), variation.lower()) for scorer in scorers]
                 
                 max_score = max(scores)
-                if max_score > best_score and max_score > 70:  # Higher threshold
+                if max_score > best_score and max_score > threshold:
                     best_score = max_score
                     best_match = full_name
         
         return best_match, best_score
     
-    def find_missing_students(self, quiz_students: List[Dict], attendance_list: List[Dict]) -> List[Dict]:
-        """
-        Find students who are in attendance but not in quiz data
-        """
-        quiz_names = {(s['last'], s['first']) for s in quiz_students}
-        missing = []
-        
-        for attendance_student in attendance_list:
-            if (attendance_student['last'], attendance_student['first']) not in quiz_names:
-                missing.append(attendance_student)
-        
-        return missing
-    
     def process_with_attendance(self, quiz_file: str, attendance_file: str) -> List[Dict]:
         """
         Process quiz data with attendance list to identify missing students
+        (pipeline with the roster filled in; student dicts flagged 'absent' when they have no score).
         """
-        # Load data
-        quiz_students = self.load_quiz_data(quiz_file)
-        attendance_list = self.load_attendance_list(attendance_file)
-        
-        # Find missing students
-        missing_students = self.find_missing_students(quiz_students, attendance_list)
-        
-        # Get quiz columns for missing entries
-        quiz_columns = list(quiz_students[0]['scores'].keys()) if quiz_students else []
-        
-        # Add missing students with X marks
-        for missing_student in missing_students:
-            missing_student['scores'] = {col: 'X' for col in quiz_columns}
-            missing_student['absent'] = True
-            quiz_students.append(missing_student)
-        
-        # Sort by last name, then middle name, then first name, then nickname
-        quiz_students.sort(key=lambda x: (x['last'], x['middle'], x['first'], x['nickname']))
-        
-        return quiz_students
+        table = self.pipeline().run([quiz_file], attendance_file)["table"].value
+        students = []
+        for student, *cells in table.rows():
+            p = self.parse_attendance_entry_new(student)
+            scores = dict(zip(table.quizzes, cells))
+            students.append({"last": p["last"], "first": p["first"], "middle": p["middle"], "nickname": p["nick"],
+                             "full": student, "scores": scores, "absent": all(v == "X" for v in cells)})
+        return students
     
     def export_with_attendance(self, students: List[Dict], output_file: str):
         """
@@ -503,126 +1178,38 @@ class EnhancedQuizSorter:
                 row.update(student['scores'])
                 writer.writerow(row)
     
-    def process_with_canonical_names(self, quiz_file: str, attendance_file: str, output_file: str):
+    def process_with_canonical_names(self, quiz_file: str, attendance_file: str, output_file: str, sheet=None):
         """
         Process quiz data with canonical name replacement and proper sorting
+        (only the students in the export; unmatched names are kept as '[UNMATCHED] name').
         """
-        # 1) Read attendance lines (single column, header optional)
-        att_lines = []
-        with open(attendance_file, "r", encoding="utf-8") as f:
-            first_line = f.readline()
-            # If the first line looks like a header, skip it; else include
-            if first_line.strip().lower() in {"student", "period 1 attendance", '"student"'}:
-                att_lines = [line.strip() for line in f if line.strip()]
-            else:
-                att_lines = [first_line.strip()] + [line.strip() for line in f if line.strip()]
-
+        stages = self.pipeline().run([quiz_file], attendance_file, sheet, fill_roster=False, keep_unmatched=True,
+                                     targets={"csv": output_file})
+        return stages["table"].value.records(), stages["built"].value["unmatched"]
+    
+    def load_roster(self, attendance_file: str) -> Tuple[List[str], dict]:
+        """Attendance lines + roster index, cached until the attendance file changes."""
+        version = self.master_version(attendance_file)
+        cached = self._roster_cache.get(attendance_file)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+        att_lines = self.read_attendance_lines(attendance_file)
         roster_index = self.build_roster_index_new(att_lines)
+        self._roster_cache[attendance_file] = (version, att_lines, roster_index)
+        return att_lines, roster_index
 
-        # 2) Load quiz CSV (names typed by students)
-        quiz_rows = []
-        with open(quiz_file, newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            if "Student" not in r.fieldnames:
-                raise ValueError("Quiz CSV must have a 'Student' column.")
-            for row in r:
-                quiz_rows.append(row)
-
-        # 3) Replace 'Student' with canonical 'Last, Middle, First (Nick) #ID'
-        canonical_rows, unmatched = [], []
-        for row in quiz_rows:
-            raw = row["Student"]
-            canon = self.lookup_canonical_new(raw, roster_index)
-            if not canon:
-                unmatched.append(raw)
-                # Optional: skip unmatched entirely instead of keeping them
-                # continue
-                canon = f"[UNMATCHED] {raw}"
-            row["Student"] = canon
-            canonical_rows.append(row)
-
-        # 4) Sort by last name
-        canonical_rows.sort(key=lambda r: self.sort_key_by_last(r["Student"]))
-
-        # 5) Write CSV
-        if canonical_rows:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                fieldnames = canonical_rows[0].keys()
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(canonical_rows)
-        
-        return canonical_rows, unmatched
-    
-    def process_with_canonical_names_full_roster(self, quiz_file: str, attendance_file: str, output_file: str):
+    def roster_version(self, attendance_file: str) -> str:
+        """Content hash of the parsed attendance lines (ignores header/blank-line differences)."""
+        att_lines, _ = self.load_roster(attendance_file)
+        return hashlib.sha256("\n".join(att_lines).encode("utf-8")).hexdigest()
+
+    def process_with_canonical_names_full_roster(self, quiz_file: str, attendance_file: str, output_file: str,
+                                                 sheet=None):
         """
         Process quiz data with canonical name replacement, full roster inclusion, and X for missing scores
         """
-        # 1) Read attendance lines (single column, header optional)
-        att_lines = []
-        with open(attendance_file, "r", encoding="utf-8") as f:
-            first_line = f.readline()
-            # If the first line looks like a header, skip it; else include
-            if first_line.strip().lower() in {"student", "period 1 attendance", '"student"'}:
-                att_lines = [line.strip() for line in f if line.strip()]
-            else:
-                att_lines = [first_line.strip()] + [line.strip() for line in f if line.strip()]
-
-        roster_index = self.build_roster_index_new(att_lines)
-
-        # 2) Load quiz CSV (names typed by students)
-        quiz_rows = []
-        with open(quiz_file, newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            if "Student" not in r.fieldnames:
-                raise ValueError("Quiz CSV must have a 'Student' column.")
-            for row in r:
-                quiz_rows.append(row)
-
-        # ---- columns present in the quiz CSV ----
-        quiz_columns = [c for c in quiz_rows[0].keys() if c != "Student"]
-
-        # ---- map quiz names -> canonical ----
-        canonical_rows = {}
-        unmatched = []
-        for row in quiz_rows:
-            raw = row["Student"]
-            canon = self.lookup_canonical_new(raw, roster_index)
-            if not canon:
-                unmatched.append(raw)
-                # Skip unmatched entirely; they are not in attendance
-                continue
-            # Normalize all blanks/None to "X" (we'll also coerce NaN later)
-            fixed = {"Student": canon}
-            for c in quiz_columns:
-                v = row.get(c, "")
-                fixed[c] = "X" if (v is None or str(v).strip() == "" or str(v).lower() == "nan") else v
-            canonical_rows[canon] = fixed  # last write wins if duplicates
-
-        # ---- add missing students from attendance with full X row ----
-        for att_line in att_lines:
-            p = self.parse_attendance_entry_new(att_line)
-            canon = self._format_canonical_last_middle_first(p)
-            if canon not in canonical_rows:
-                canonical_rows[canon] = {"Student": canon, **{c: "X" for c in quiz_columns}}
-
-        # ---- turn dict -> list and sort by last name ----
-        rows_out = list(canonical_rows.values())
-        rows_out.sort(key=lambda r: self.sort_key_by_last(r["Student"]))
-
-        # ---- write CSV (ensure X, not NaN) ----
-        with open(output_file, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=["Student"] + quiz_columns)
-            w.writeheader()
-            for r in rows_out:
-                # Safety: convert any lingering NaN to "X"
-                for c in quiz_columns:
-                    v = r.get(c, "")
-                    if v is None or str(v).strip() == "" or str(v).lower() == "nan":
-                        r[c] = "X"
-                w.writerow(r)
-        
-        return rows_out, unmatched
+        stages = self.pipeline().run([quiz_file], attendance_file, sheet, targets={"csv": output_file})
+        return stages["table"].value.records(), stages["built"].value["unmatched"]
     
     def make_attendance_line(self, last, first, middle, nick, sid):
         """Helper to create attendance line in canonical format"""
@@ -657,14 +1244,14 @@ class EnhancedQuizSorter:
         # Combine all students
         all_students = [student['full'] for student in quiz_students] + absent_students
         
-        # Sort alphabetically by last name, middle name, first name, nickname
+        # Sort in MASTER collation order (last, first, middle, nickname)
         # Parse names for proper sorting
         parsed_students = []
         for student in all_students:
             parsed = self.parse_student_name(student)
             parsed_students.append((parsed, student))
         
-        parsed_students.sort(key=lambda x: (x[0]['last'], x[0]['middle'], x[0]['first'], x[0]['nickname']))
+        parsed_students.sort(key=lambda x: self.student_sort_key(x[0]))
         all_students = [student for _, student in parsed_students]
         
         with open(output_file, 'w', newline='', encoding='utf-8') as file:
@@ -681,6 +1268,29 @@ class EnhancedQuizSorter:
         print(f"Expected present: {len(quiz_students)}")
         print(f"Expected absent: {len(absent_students)}")
 
+def _best_fuzzy_match(key: str, roster_items, threshold: int = EnhancedQuizSorter.FUZZY_THRESHOLD) -> Optional[str]:
+    """Best roster entry above the similarity threshold (first one wins ties)."""
+    best_match = None
+    best_score = 0
+    for roster_key, canonical in roster_items:
+        score = fuzz.ratio(key, roster_key)
+        if score > best_score and score > threshold:
+            best_score = score
+            best_match = canonical
+    return best_match
+
+_FUZZY_ROSTER = None
+_FUZZY_THRESHOLD = EnhancedQuizSorter.FUZZY_THRESHOLD
+
+def _init_fuzzy_worker(roster_index: dict, threshold: int):
+    """Pool initializer: each worker receives the roster index (and threshold) once."""
+    global _FUZZY_ROSTER, _FUZZY_THRESHOLD
+    _FUZZY_ROSTER = list(roster_index.items())
+    _FUZZY_THRESHOLD = threshold
+
+def _fuzzy_match_chunk(keys: List[str]) -> List[Optional[str]]:
+    return [_best_fuzzy_match(key, _FUZZY_ROSTER, _FUZZY_THRESHOLD) for key in keys]
+
 def main():
     sorter = EnhancedQuizSorter()
     
@@ -0,0 +1,151 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from import_ledger import file_sha256
+
+
+class GradebookRollup:
+    """
+    Cross-period gradebook built from every period MASTER ('<Period>_MASTER.csv' or .qsm) in a folder.
+
+    Each period's contribution (its student rows plus score sums/counts) is cached
+    in 'gradebook.rollup.json' together with the MASTER's sha256. A later run only
+    re-reads the MASTERs whose checksum changed; an unchanged stat signature skips
+    hashing altogether. Overall figures are combined from the cached sums, so
+    unchanged periods are never loaded again.
+    """
+
+    CACHE_NAME = "gradebook.rollup.json"
+    MASTER_SUFFIXES = ("_MASTER.csv", "_MASTER.qsm")
+
+    def __init__(self, sorter=None, directory: Optional[str] = None):
+        if sorter is None:
+            from enhanced_quiz_sorter import EnhancedQuizSorter
+            sorter = EnhancedQuizSorter()
+        self.sorter = sorter
+        self.directory = directory or os.getcwd()
+        self.cache_path = os.path.join(self.directory, self.CACHE_NAME)
+
+    def master_paths(self) -> Dict[str, str]:
+        """period -> MASTER path, e.g. 'Period 3' -> '.../Period_3_MASTER.csv' (or the columnar .qsm)"""
+        found = {}
+        for name in sorted(os.listdir(self.directory)):
+            for suffix in self.MASTER_SUFFIXES:
+                if name.endswith(suffix) and not name.startswith("."):
+                    period = name[:-len(suffix)].replace("_", " ")
+                    if period not in found or suffix.endswith(".qsm"):  # a converted period reads its .qsm
+                        found[period] = os.path.join(self.directory, name)
+        return found
+
+    def _load_cache(self) -> Dict:
+        if not os.path.exists(self.cache_path):
+            return {}
+        with open(self.cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_cache(self, entries: Dict):
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.cache_path)
+
+    def _period_entry(self, period: str, master_path: str, checksum: str, signature: List[int]) -> Dict:
+        df_master = self.sorter.load_master(master_path, [])
+        analytics = self.sorter.master_analytics(master_path)
+        per_student = analytics.student_stats().set_index("Student")
+        quizzes = [c for c in df_master.columns if c != "Student"]
+        rows = []
+        for record in df_master.to_dict("records"):
+            stats = per_student.loc[record["Student"]]
+            average = stats["Average"]
+            rows.append({
+                "Period": period,
+                **{k: self.sorter.normalize_score_cell(v) if k != "Student" else v for k, v in record.items()},
+                "Average": None if pd.isna(average) else float(average),
+                "Missing": int(stats["Missing"]),
+            })
+        summary = analytics.summary()
+        return {
+            "sha256": checksum,
+            "signature": signature,
+            "quizzes": quizzes,
+            "rows": rows,
+            "students": summary["students"],
+            "complete": summary["complete"],
+            "with_missing": summary["with_missing"],
+            "quiz_sums": {q: [float(analytics.col_sum[j]), int(analytics.col_count[j])]
+                          for j, q in enumerate(analytics.quizzes)},
+        }
+
+    def refresh(self) -> Tuple[Dict, List[str]]:
+        """Bring the cache up to date. Returns (period -> entry, periods that were recomputed)."""
+        cached = self._load_cache()
+        entries, recomputed = {}, []
+        for period, path in self.master_paths().items():
+            signature = list(self.sorter.master_version(path))  # includes a .qsm's write generation
+            entry = cached.get(period)
+            if entry is None or entry["signature"] != signature:
+                checksum = file_sha256(path)
+                if entry is not None and entry["sha256"] == checksum:
+                    entry["signature"] = signature  # touched, not changed
+                else:
+                    entry = self._period_entry(period, path, checksum, signature)
+                    recomputed.append(period)
+            entries[period] = entry
+        if entries != cached:
+            self._save_cache(entries)
+        return entries, recomputed
+
+    def _quiz_order(self, entries: Dict) -> List[str]:
+        quizzes = {q for e in entries.values() for q in e["quizzes"]}
+        return sorted(quizzes, key=lambda q: (self.sorter.detect_quiz_number(q) or 0, q))
+
+    def table(self, entries: Dict) -> pd.DataFrame:
+        """One row per student of every period; quizzes a period never had are left blank."""
+        columns = ["Period", "Student"] + self._quiz_order(entries) + ["Average", "Missing"]
+        rows = [row for e in entries.values() for row in e["rows"]]
+        return pd.DataFrame(rows, columns=columns).astype(object).where(lambda df: df.notna(), "")
+
+    def summary(self, entries: Dict) -> pd.DataFrame:
+        """Per-period and overall summary: students, completion and mean score per quiz."""
+        quizzes = self._quiz_order(entries)
+
+        def line(name, parts):
+            total_sum = sum(s for e in parts for s, _ in e["quiz_sums"].values())
+            total_count = sum(c for e in parts for _, c in e["quiz_sums"].values())
+            out = {
+                "Period": name,
+                "Students": sum(e["students"] for e in parts),
+                "Complete": sum(e["complete"] for e in parts),
+                "With missing": sum(e["with_missing"] for e in parts),
+                "Mean": round(total_sum / total_count, 2) if total_count else "",
+            }
+            for q in quizzes:
+                s = sum(e["quiz_sums"].get(q, [0, 0])[0] for e in parts)
+                c = sum(e["quiz_sums"].get(q, [0, 0])[1] for e in parts)
+                out[q] = round(s / c, 2) if c else ""
+            return out
+
+        lines = [line(period, [e]) for period, e in entries.items()]
+        if entries:
+            lines.append(line("All periods", list(entries.values())))
+        return pd.DataFrame(lines, columns=["Period", "Students", "Complete", "With missing", "Mean"] + quizzes)
+
+    def build(self, csv_path: Optional[str] = None, pdf_path: Optional[str] = None,
+              title: str = "Gradebook – All Periods") -> Dict:
+        entries, recomputed = self.refresh()
+        if not entries:
+            raise FileNotFoundError(f"No period MASTER files in {self.directory}")
+        table, summary = self.table(entries), self.summary(entries)
+        if csv_path:
+            table.to_csv(csv_path, index=False)
+        if pdf_path:
+            from quiz_pdf import build_rollup_pdf
+            build_rollup_pdf(summary, table, pdf_path, title)
+        return {"periods": list(entries), "recomputed": recomputed, "table": table, "summary": summary,
+                "csv_path": csv_path, "pdf_path": pdf_path}
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 16) -> str:
+    """Content hash of a file, streamed in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ImportLedger:
+    """
+    Record of every file already merged into one period MASTER, stored next to
+    it as '<master>.ledger.json'. An import is identified by the content hash of
+    the export plus the settings that change its result (roster version),
+    so re-importing an identical file can return before any matching runs.
+    """
+
+    def __init__(self, master_path: str):
+        self.master_path = master_path
+        self.ledger_path = f"{os.path.splitext(master_path)[0]}.ledger.json"
+
+    @staticmethod
+    def make_key(content_hash: str, settings: Dict, roster_version: str) -> str:
+        blob = json.dumps({"content": content_hash, "settings": settings, "roster": roster_version}, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict:
+        # A ledger without its MASTER is stale (the MASTER was deleted or moved)
+        if not os.path.exists(self.ledger_path) or not os.path.exists(self.master_path):
+            return {}
+        with open(self.ledger_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, entries: Dict):
+        tmp_path = f"{self.ledger_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.ledger_path)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        return self._load().get(key)
+
+    def record(self, key: str, source: str, journal_seq: Optional[int]):
+        """Caller holds the MASTER lock."""
+        entries = self._load()
+        entries[key] = {
+            "file": source,
+            "journal_seq": journal_seq,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._save(entries)
+
+    def forget_seqs(self, seqs):
+        """
+        Drop entries whose journal entry was undone so the file can be imported again.
+        Imports that changed nothing (no journal entry) are dropped too: they may have
+        relied on the scores that were just reverted.
+        """
+        seqs = set(seqs)
+        entries = self._load()
+        kept = {k: v for k, v in entries.items() if v.get("journal_seq") is not None and v["journal_seq"] not in seqs}
+        if len(kept) != len(entries):
+            self._save(kept)
@@ -0,0 +1,95 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict
+
+from score_table import ScoreTable
+
+EXPORT_FORMATS = ("csv", "pdf", "xlsx", "json")
+
+
+def timestamped_path(base_path: str, ext: str) -> str:
+    """'out/Period_3.csv', 'pdf' -> 'out/Period_3_20250101_120000.pdf' (never overwrites an open PDF)."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{os.path.splitext(base_path)[0]}_{timestamp}.{ext}"
+
+
+def _columns_rows(table):
+    """(header, row lists) of a ScoreTable or a pandas DataFrame."""
+    if isinstance(table, ScoreTable):
+        return table.columns, table.rows()
+    return list(table.columns), table.itertuples(index=False, name=None)
+
+
+def write_csv(table, path: str, title: str):
+    if not isinstance(table, ScoreTable):
+        table.to_csv(path, index=False)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        table.write_csv(f)
+
+
+def write_pdf(table, path: str, title: str):
+    from quiz_pdf import build_master_pdf
+    build_master_pdf(table.to_frame() if isinstance(table, ScoreTable) else table, path, title)
+
+
+def write_xlsx(table, path: str, title: str):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("XLSX export needs openpyxl (pip install openpyxl)") from None
+    wb = Workbook(write_only=True)  # rows go straight to the file, no cell objects kept
+    ws = wb.create_sheet("MASTER")
+    columns, rows = _columns_rows(table)
+    ws.append([str(c) for c in columns])
+    for row in rows:
+        ws.append([_plain(v) for v in row])
+    wb.save(path)
+
+
+def write_json(table, path: str, title: str):
+    columns, rows = _columns_rows(table)
+    payload = {
+        "title": title,
+        "columns": [str(c) for c in columns],
+        "rows": [[_plain(v) for v in row] for row in rows],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def _plain(v):
+    """numpy scalars -> Python values; NaN -> None (MASTER views hold ints and 'X')."""
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+WRITERS = {"csv": write_csv, "pdf": write_pdf, "xlsx": write_xlsx, "json": write_json}
+
+
+def export_master(table, paths: Dict[str, str], title: str = "Quiz Results - Grading Sheet") -> Dict[str, str]:
+    """
+    Write one finished MASTER view (a ScoreTable, or a DataFrame from the legacy paths)
+    to every requested format (format -> path) at once.
+    All writers read the same in-memory table (treated as read-only) on their own
+    thread, so nothing is re-read from disk and the wall time is about that of the
+    slowest format (the PDF layout). Every format is attempted; the first failure
+    is raised once all of them are done.
+    """
+    unknown = [fmt for fmt in paths if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)} (use {', '.join(EXPORT_FORMATS)})")
+    if len(paths) <= 1:
+        for fmt, path in paths.items():
+            WRITERS[fmt](table, path, title)
+        return dict(paths)
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        futures = {fmt: pool.submit(WRITERS[fmt], table, path, title) for fmt, path in paths.items()}
+    for future in futures.values():
+        future.result()
+    return dict(paths)
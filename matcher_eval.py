@@ -0,0 +1,140 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from name_normalization import normalize_name, strip_diacritics
+from sheet_reader import read_records
+
+
+class MatcherEvaluation:
+    """
+    Offline harness for the typed-name matchers. Every strategy runs at every
+    threshold over labeled fixtures (typed name -> expected student, blank =
+    should stay unmatched) and is scored on precision, recall, ambiguous-match
+    rate and per-query latency, so a faster matcher can be adopted only when it
+    still matches the same students.
+
+    Strategies:
+      exact       roster-index lookup only (no threshold)
+      ratio       lookup_canonical_new, one name at a time (what single lookups use)
+      batch       match_names over all fixtures at once (what imports use);
+                  latency is the batch time divided by the number of names
+      variations  enhanced_fuzzy_match: name variations x VARIATION_SCORERS
+    """
+
+    STRATEGIES = ("exact", "ratio", "batch", "variations")
+    DEFAULT_THRESHOLDS = (60, 70, 80, 90)
+    # Runner-up within this many points of the winner (and above the threshold) = ambiguous
+    AMBIGUITY_MARGIN = 5
+
+    def __init__(self, attendance_file: str, sorter=None):
+        if sorter is None:
+            from enhanced_quiz_sorter import EnhancedQuizSorter
+            sorter = EnhancedQuizSorter()
+        self.sorter = sorter
+        self.att_lines, self.roster_index = sorter.load_roster(attendance_file)
+        self.people = []  # enhanced_fuzzy_match's student dicts, 'full' = canonical name
+        for line in self.att_lines:
+            p = sorter.parse_attendance_entry_new(line)
+            self.people.append({"last": p["last"], "first": p["first"], "middle": p["middle"],
+                                "nickname": p["nick"], "full": sorter._format_canonical_last_middle_first(p)})
+
+    @staticmethod
+    def load_fixtures(path: str) -> List[Tuple[str, Optional[str]]]:
+        """CSV/XLSX with 'Typed' and 'Expected' columns; Expected is a canonical name or '#ID', blank = no match."""
+        header, rows = read_records(path, key="Typed")
+        if "Expected" not in header:
+            raise ValueError("Fixtures need 'Typed' and 'Expected' columns.")
+        return [(row["Typed"], (row["Expected"] or "").strip() or None) for row in rows if row["Typed"]]
+
+    # ---- strategies: names -> (predicted canonical per name, seconds per name) ----
+    def _timed(self, match, names: Sequence[str]) -> Tuple[List[Optional[str]], List[float]]:
+        predicted, seconds = [], []
+        for raw in names:
+            t0 = time.perf_counter()
+            predicted.append(match(raw))
+            seconds.append(time.perf_counter() - t0)
+        return predicted, seconds
+
+    def run_exact(self, names, threshold=None):
+        def match(raw):
+            key = self.sorter.normalize_quiz_name(raw)
+            return self.roster_index.get(key) or self.roster_index.get(key.replace(".", ""))
+        return self._timed(match, names)
+
+    def run_ratio(self, names, threshold):
+        return self._timed(lambda raw: self.sorter.lookup_canonical_new(raw, self.roster_index, threshold), names)
+
+    def run_batch(self, names, threshold):
+        t0 = time.perf_counter()
+        found = self.sorter.match_names(names, self.roster_index, workers=1, threshold=threshold)
+        per_name = (time.perf_counter() - t0) / max(len(names), 1)
+        return [found[raw] for raw in names], [per_name] * len(names)
+
+    def run_variations(self, names, threshold):
+        def match(raw):
+            person, _ = self.sorter.enhanced_fuzzy_match(raw, self.people, threshold)
+            return person["full"] if person else None
+        return self._timed(match, names)
+
+    # ---- candidate scores, for the ambiguity check ----
+    def candidate_scores(self, strategy: str, raw: str) -> List[int]:
+        """Best score per roster student for one typed name, highest first."""
+        if strategy == "exact":
+            return []  # an index key names exactly one student
+        if strategy == "variations":
+            best = []
+            for person in self.people:
+                variations = self.sorter.create_name_variations(person)
+                best.append(max(scorer(raw.lower(), v.lower())
+                                for v in variations for scorer in self.sorter.VARIATION_SCORERS))
+            return sorted(best, reverse=True)
+        return [score for _, score in self.sorter.rank_candidates(raw, self.roster_index, k=2)]
+
+    def is_ambiguous(self, scores: List[int], threshold: Optional[int]) -> bool:
+        if len(scores) < 2 or threshold is None:
+            return False
+        return scores[1] > threshold and scores[0] - scores[1] < self.AMBIGUITY_MARGIN
+
+    # ---- report ----
+    def evaluate(self, fixtures: List[Tuple[str, Optional[str]]], strategies: Optional[Sequence[str]] = None,
+                 thresholds: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """One row per (strategy, threshold): precision, recall, ambiguous %, p50/p99 ms per query."""
+        strategies = list(strategies or self.STRATEGIES)
+        thresholds = list(thresholds or self.DEFAULT_THRESHOLDS)
+        unknown = [s for s in strategies if s not in self.STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategy: {', '.join(unknown)} (use {', '.join(self.STRATEGIES)})")
+
+        names = [typed for typed, _ in fixtures]
+        expected = [self.sorter.student_key(e) if e else None for _, e in fixtures]
+        scores: Dict[str, List[List[int]]] = {}
+        rows = []
+        for strategy in strategies:
+            run = getattr(self, f"run_{strategy}")
+            if strategy not in scores:
+                scores[strategy] = [self.candidate_scores(strategy, raw) for raw in names]
+            for threshold in ([None] if strategy == "exact" else thresholds):
+                # Cold name caches for every run, so runs are timed alike
+                normalize_name.cache_clear()
+                strip_diacritics.cache_clear()
+                predicted, seconds = run(names, threshold)
+                got = [self.sorter.student_key(p) if p else None for p in predicted]
+                correct = sum(1 for g, e in zip(got, expected) if g is not None and g == e)
+                made = sum(1 for g in got if g is not None)
+                wanted = sum(1 for e in expected if e is not None)
+                ambiguous = sum(1 for s in scores[strategy] if self.is_ambiguous(s, threshold))
+                ms = np.array(seconds) * 1000.0
+                rows.append({
+                    "Strategy": strategy,
+                    "Threshold": "" if threshold is None else threshold,
+                    "Queries": len(names),
+                    "Precision": round(correct / made, 4) if made else np.nan,
+                    "Recall": round(correct / wanted, 4) if wanted else np.nan,
+                    "Ambiguous %": round(100.0 * ambiguous / len(names), 1) if names else np.nan,
+                    "p50 ms": round(float(np.percentile(ms, 50)), 3) if len(ms) else np.nan,
+                    "p99 ms": round(float(np.percentile(ms, 99)), 3) if len(ms) else np.nan,
+                })
+        return pd.DataFrame(rows)
@@ -0,0 +1,41 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+
+class NameAliases:
+    """
+    Confirmed spellings for one period MASTER, stored next to it as
+    '<master>.aliases.json': normalized typed name -> student key ('#ID').
+    Aliases are added to the roster index before matching, so a name resolved
+    once by hand matches exactly on every later import.
+    """
+
+    def __init__(self, master_path: str):
+        self.master_path = master_path
+        self.aliases_path = f"{os.path.splitext(master_path)[0]}.aliases.json"
+
+    def load(self) -> Dict[str, str]:
+        if not os.path.exists(self.aliases_path):
+            return {}
+        with open(self.aliases_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def version(self) -> Optional[str]:
+        """Content hash of the aliases (None when there are none), for import ledger keys."""
+        aliases = self.load()
+        if not aliases:
+            return None
+        return hashlib.sha256(json.dumps(aliases, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def add(self, typed_key: str, student_key: str):
+        """Caller holds the MASTER lock."""
+        aliases = self.load()
+        aliases[typed_key] = student_key
+        tmp_path = f"{self.aliases_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.aliases_path)
@@ -0,0 +1,26 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+_WS_RX = re.compile(r"\s+")
+
+# Rosters and exports repeat the same few thousand names; enough to hold a school year
+CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strip_diacritics(s: str) -> str:
+    """'José' -> 'Jose'. Pure-ASCII strings are returned as-is without decomposing."""
+    if s.isascii():
+        return s
+    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_name(s: str) -> str:
+    """
+    Matching form of a name: surrounding quotes/whitespace removed, diacritics
+    stripped, runs of whitespace collapsed, lowercase. Typed quiz names and
+    roster parts go through this same function, so both sides compare equal.
+    """
+    return _WS_RX.sub(" ", strip_diacritics(s.strip().strip('"'))).lower()
@@ -0,0 +1,210 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from score_table import MISSING, ScoreTable
+
+
+def _score(v) -> float:
+    """MASTER cell -> float score, NaN for X/blank."""
+    s = str(v).strip()
+    if s == "" or s.upper() == "X" or s.lower() in {"nan", "none"}:
+        return np.nan
+    try:
+        return float(s)
+    except ValueError:
+        return np.nan
+
+
+class MasterAnalytics:
+    """
+    Per-quiz and per-student statistics over one MASTER's score matrix.
+
+    The MASTER's score table becomes a students x quizzes float matrix (NaN = X) once;
+    column and row sums/counts come from vectorized reductions. apply() takes the
+    same (students, changes) deltas the score journal records and adjusts only
+    the touched cells, so a merge that changed a handful of scores does not
+    rescan the whole MASTER. Medians are recomputed lazily for changed quizzes.
+    Large MASTERs are reduced in quiz shards across a process pool that reads
+    the int16 matrix from shared memory (shared_master) instead of a pickled copy.
+    """
+
+    # Below this many cells a process pool costs more than it saves
+    PARALLEL_CELLS = 4_000_000
+
+    def __init__(self, table: ScoreTable, student_key: Callable[[str], str], version=None,
+                 workers: Optional[int] = None):
+        self.student_key = student_key
+        self.version = version
+        self.students: List[str] = list(table.students)
+        self.quizzes: List[str] = list(table.quizzes)
+        self._row = {student_key(s): i for i, s in enumerate(self.students)}
+        self._col = {q: j for j, q in enumerate(self.quizzes)}
+        self.matrix = np.where(table.matrix == MISSING, np.nan, table.matrix.astype(float))
+        if workers is None:
+            workers = min(os.cpu_count() or 1, table.matrix.size // self.PARALLEL_CELLS)
+        workers = min(workers, len(self.quizzes))
+        if workers > 1:
+            col_sum, col_count, row_sum, row_count, dist = self._reduce_shared(table, workers)
+        else:
+            col_sum, col_count, row_sum, row_count, dist = _reduce(table.matrix)
+        self.col_sum, self.col_count = col_sum.astype(float), col_count
+        self.row_sum, self.row_count = row_sum.astype(float), row_count
+        self.dist: List[Counter] = [Counter(d) for d in dist]
+        self._medians: Dict[int, float] = {}
+
+    @staticmethod
+    def _reduce_shared(table: ScoreTable, workers: int):
+        """_reduce over quiz shards in a pool; row totals are summed over the shards (exact: integer scores)."""
+        from shared_master import SharedMaster
+        n = len(table.quizzes)
+        chunk = -(-n // (workers * 2))
+        with SharedMaster(table) as shared, ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [(shared.descriptor, j, min(j + chunk, n)) for j in range(0, n, chunk)]
+            parts = list(pool.map(_reduce_shard, jobs))
+        return (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]),
+                sum(p[2] for p in parts), sum(p[3] for p in parts), [d for p in parts for d in p[4]])
+
+    # ---- incremental updates ----
+    def _add_student(self, canonical: str):
+        self._row[self.student_key(canonical)] = len(self.students)
+        self.students.append(canonical)
+        self.matrix = np.vstack([self.matrix, np.full((1, len(self.quizzes)), np.nan)])
+        self.row_sum = np.append(self.row_sum, 0.0)
+        self.row_count = np.append(self.row_count, 0)
+
+    def _add_quiz(self, quiz: str):
+        self._col[quiz] = len(self.quizzes)
+        self.quizzes.append(quiz)
+        self.matrix = np.hstack([self.matrix, np.full((len(self.students), 1), np.nan)])
+        self.col_sum = np.append(self.col_sum, 0.0)
+        self.col_count = np.append(self.col_count, 0)
+        self.dist.append(Counter())
+
+    def apply(self, students: List, changes: List, version=None,
+              order: Optional[Tuple[Sequence[str], Sequence[str]]] = None):
+        """
+        Fold one journal delta in: students [[id, canonical]], changes [[id, quiz, old, new]].
+        `order` is the MASTER's (students, quizzes) after the delta; rows and columns the
+        delta added at the end are moved to their place in it.
+        """
+        for _, canonical in students:
+            if self.student_key(canonical) not in self._row:
+                self._add_student(canonical)
+        for sid, quiz, _, new in changes:
+            i = self._row.get(sid)
+            if i is None:
+                continue  # not a MASTER row (apply_changes ignores it too)
+            if quiz not in self._col:
+                self._add_quiz(quiz)
+            j = self._col[quiz]
+            old_v, new_v = self.matrix[i, j], _score(new)
+            if not np.isnan(old_v):
+                self.col_sum[j] -= old_v
+                self.col_count[j] -= 1
+                self.row_sum[i] -= old_v
+                self.row_count[i] -= 1
+                self.dist[j][int(old_v)] -= 1
+                if not self.dist[j][int(old_v)]:
+                    del self.dist[j][int(old_v)]
+            if not np.isnan(new_v):
+                self.col_sum[j] += new_v
+                self.col_count[j] += 1
+                self.row_sum[i] += new_v
+                self.row_count[i] += 1
+                self.dist[j][int(new_v)] += 1
+            self.matrix[i, j] = new_v
+            self._medians.pop(j, None)
+        self.version = version
+        if order is not None and (list(order[0]) != self.students or list(order[1]) != self.quizzes):
+            self._reorder(*order)
+
+    def _reorder(self, students: Sequence[str], quizzes: Sequence[str]):
+        """Permute rows and columns into the MASTER's order (nothing is recomputed)."""
+        rows = [self._row.get(self.student_key(s)) for s in students]
+        cols = [self._col.get(q) for q in quizzes]
+        if None in rows or None in cols or sorted(rows) != list(range(len(self.students))) \
+                or sorted(cols) != list(range(len(self.quizzes))):
+            self.version = None  # not a permutation of these rows: the next read rebuilds
+            return
+        self.students = [self.students[i] for i in rows]
+        self.quizzes = [self.quizzes[j] for j in cols]
+        self.matrix = self.matrix[np.ix_(rows, cols)]
+        self.row_sum, self.row_count = self.row_sum[rows], self.row_count[rows]
+        self.col_sum, self.col_count = self.col_sum[cols], self.col_count[cols]
+        self.dist = [self.dist[j] for j in cols]
+        self._medians = {new: self._medians[old] for new, old in enumerate(cols) if old in self._medians}
+        self._row = {self.student_key(s): i for i, s in enumerate(self.students)}
+        self._col = {q: j for j, q in enumerate(self.quizzes)}
+
+    # ---- reductions ----
+    def median(self, quiz: str) -> float:
+        j = self._col[quiz]
+        if j not in self._medians:
+            column = self.matrix[:, j]
+            column = column[~np.isnan(column)]
+            self._medians[j] = float(np.median(column)) if column.size else np.nan
+        return self._medians[j]
+
+    def distribution(self, quiz: str) -> Dict[int, int]:
+        """score -> number of students with that score"""
+        return dict(sorted(self.dist[self._col[quiz]].items()))
+
+    def missing_counts(self) -> np.ndarray:
+        return len(self.quizzes) - self.row_count
+
+    def quiz_stats(self) -> "pd.DataFrame":
+        """One row per quiz: mean, median, completed count and completion rate."""
+        import pandas as pd
+        n = len(self.students)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.col_sum / self.col_count
+        return pd.DataFrame({
+            "Quiz": self.quizzes,
+            "Mean": np.round(mean, 2),
+            "Median": [self.median(q) for q in self.quizzes],
+            "Completed": self.col_count,
+            "Completion %": np.round(100.0 * self.col_count / n, 1) if n else np.nan,
+        })
+
+    def student_stats(self) -> "pd.DataFrame":
+        """One row per student: average over taken quizzes and number of X cells."""
+        import pandas as pd
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = self.row_sum / self.row_count
+        return pd.DataFrame({
+            "Student": self.students,
+            "Average": np.round(average, 2),
+            "Missing": self.missing_counts(),
+        })
+
+    def summary(self) -> Dict:
+        missing = self.missing_counts()
+        return {
+            "students": len(self.students),
+            "quizzes": len(self.quizzes),
+            "complete": int((missing == 0).sum()),
+            "with_missing": int((missing > 0).sum()),
+            "mean": round(float(self.col_sum.sum() / self.col_count.sum()), 2) if self.col_count.sum() else None,
+        }
+
+
+def _reduce(matrix: np.ndarray):
+    """int16 score block -> (column sums, column counts, row sums, row counts, per-column {score: count})."""
+    present = matrix != MISSING
+    values = np.where(present, matrix, 0).astype(np.int64)
+    dist = []
+    for j in range(matrix.shape[1]):
+        scores, counts = np.unique(matrix[present[:, j], j], return_counts=True)
+        dist.append({int(s): int(c) for s, c in zip(scores, counts)})
+    return values.sum(axis=0), present.sum(axis=0), values.sum(axis=1), present.sum(axis=1), dist
+
+
+def _reduce_shard(job):
+    """Pool job: _reduce over quizzes start..stop-1 of a shared MASTER."""
+    from shared_master import attach
+    descriptor, start, stop = job
+    return _reduce(attach(descriptor).columns(start, stop))
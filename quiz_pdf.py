@@ -0,0 +1,76 @@
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak
+
+
+def score_table(df: pd.DataFrame, first_score_col: int = 1, repeat_header: bool = False) -> Table:
+    """Grid table with a blue header; scores centered and X cells in bold."""
+    # Convert DataFrame to list and coerce NaN -> "X"
+    df = df.astype(object).fillna("X")  # replaces pandas NaN
+    for col in df.columns:
+        df.loc[df[col].astype(str).str.strip().isin(["nan", "NaN", "None"]), col] = "X"
+
+    data = [df.columns.tolist()] + df.values.tolist()
+
+    # Create table
+    table = Table(data, repeatRows=1 if repeat_header else 0)
+
+    # Style: header + grid; center/bold X marks
+    style = TableStyle([
+        # Header
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
+        ('TEXTCOLOR',  (0, 0), (-1, 0), colors.white),
+        ('ALIGN',      (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME',   (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE',   (0, 0), (-1, 0), 12),
+
+        # Body
+        ('GRID',       (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN',     (0, 1), (-1, -1), 'MIDDLE'),
+        ('ALIGN',      (first_score_col, 1), (-1, -1), 'CENTER'),  # center scores/X
+        ('FONTSIZE',   (first_score_col, 1), (-1, -1), 10),
+    ])
+
+    # Make "X" bold so it fills the box
+    # (Apply to all body cells that contain "X")
+    for r in range(1, len(data)):
+        for c in range(first_score_col, len(data[0])):  # score cols only
+            if str(data[r][c]).strip().upper() == "X":
+                style.add('FONTNAME', (c, r), (c, r), 'Helvetica-Bold')
+
+    table.setStyle(style)
+    return table
+
+
+def _title(pdf_title: str) -> list:
+    styles = getSampleStyleSheet()
+    title_style = styles['Heading1']
+    title_style.alignment = 1  # Center alignment
+    return [Paragraph(pdf_title, title_style), Paragraph("<br/><br/>", styles['Normal'])]
+
+
+def build_master_pdf(df: pd.DataFrame, pdf_file_path: str, pdf_title: str = "Quiz Results - Grading Sheet") -> str:
+    """Render a MASTER-style table (Student + quiz columns) as a print-ready landscape PDF."""
+    doc = SimpleDocTemplate(pdf_file_path, pagesize=landscape(letter))
+    elements = _title(pdf_title)
+    # Blank cells count as missing in a MASTER
+    df = df.astype(object).where(df.astype(str).apply(lambda col: col.str.strip()) != "", "X")
+    elements.append(score_table(df))
+
+    # Build PDF
+    doc.build(elements)
+    return pdf_file_path
+
+
+def build_rollup_pdf(summary: pd.DataFrame, table: pd.DataFrame, pdf_file_path: str,
+                     pdf_title: str = "Gradebook – All Periods") -> str:
+    """Cross-period gradebook: summary table first, then every student of every period."""
+    doc = SimpleDocTemplate(pdf_file_path, pagesize=landscape(letter))
+    elements = _title(pdf_title)
+    elements.append(score_table(summary))
+    elements.append(PageBreak())
+    elements.append(score_table(table, first_score_col=2, repeat_header=True))
+    doc.build(elements)
+    return pdf_file_path
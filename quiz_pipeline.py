@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from master_export import export_master
+from name_aliases import NameAliases
+from score_table import RetakeAccumulator, ScoreTable
+from sheet_reader import read_records
+
+
+class Stage(NamedTuple):
+    """A stage output plus the hash of everything it was computed from."""
+    key: str
+    value: object
+
+
+class QuizPipeline:
+    """
+    The one processing engine behind the GUI, the CLI, the watch folder and the service:
+
+        load roster -> load export -> match -> fold -> merge -> sort -> curve -> export
+
+    Each stage's output is memoized under a hash of its inputs (file contents, upstream
+    keys, settings). Asking again with only another curve or title re-runs just the
+    curve/export stages; a changed roster re-matches without re-reading the exports, and
+    a MASTER written in between re-runs merge and everything after it. `runs` counts how
+    often each stage was actually computed. Outputs are shared; treat them as read-only.
+    """
+
+    STAGES = ("roster", "export", "match", "fold", "combine", "master", "merge", "sort", "curve", "render")
+    KEEP = 8  # memoized outputs per stage
+
+    def __init__(self, sorter):
+        self.sorter = sorter
+        self._memo: Dict[str, OrderedDict] = {name: OrderedDict() for name in self.STAGES}
+        self._keep: Dict[str, int] = {name: self.KEEP for name in self.STAGES}
+        self._written: Dict[str, str] = {}  # output path -> render key that last wrote it
+        self.runs = Counter()
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+    def _stage(self, name: str, key: str, compute: Callable[[], object]) -> Stage:
+        memo = self._memo[name]
+        if key in memo:
+            memo.move_to_end(key)
+            return Stage(key, memo[key])
+        return self.remember(name, key, compute())
+
+    def memoized(self, name: str, key: str) -> bool:
+        return key in self._memo[name]
+
+    def reserve(self, name: str, n: int) -> int:
+        """
+        Keep at least `n` outputs of a stage (e.g. every fold of a large batch until it is
+        merged). Returns the previous limit, to hand back to release() after the batch.
+        """
+        previous = self._keep[name]
+        self._keep[name] = max(previous, n)
+        return previous
+
+    def release(self, name: str, keep: int):
+        """Undo reserve(): back to keeping `keep` outputs, dropping the oldest beyond that."""
+        self._keep[name] = keep
+        memo = self._memo[name]
+        while len(memo) > keep:
+            memo.popitem(last=False)
+
+    def remember(self, name: str, key: str, value) -> Stage:
+        """Store an output computed elsewhere (e.g. by a pool worker) as if the stage had run."""
+        self.runs[name] += 1
+        memo = self._memo[name]
+        memo[key] = value
+        if len(memo) > self._keep[name]:
+            memo.popitem(last=False)
+        return Stage(key, value)
+
+    # ---- keys (computable without running the stage) ----
+    def export_key(self, quiz_file: str, sheet=None) -> str:
+        return self.key("export", self.sorter.content_hash(quiz_file), sheet)
+
+    def fold_key(self, export_key: str, roster: Optional[Stage], fill_roster: bool, keep_unmatched: bool) -> str:
+        match_key = self.key("match", roster.key, export_key, self.sorter.FUZZY_THRESHOLD) if roster else None
+        return self.key("fold", export_key, match_key, fill_roster and roster is not None, keep_unmatched)
+
+    # ---- stages ----
+    def roster(self, attendance_file: str) -> Stage:
+        """(attendance lines, roster index plus the period MASTER's confirmed aliases)"""
+        master_path = self.sorter.period_master_path(self.sorter.extract_period_from_path(attendance_file))
+
+        def compute():
+            att_lines, roster_index = self.sorter.load_roster(attendance_file)
+            return att_lines, self.sorter.with_aliases(roster_index, master_path)
+        key = self.key("roster", self.sorter.roster_version(attendance_file), NameAliases(master_path).version())
+        return self._stage("roster", key, compute)
+
+    def load_export(self, quiz_file: str, sheet=None) -> Stage:
+        """
+        (quiz slots, typed name -> score vector). Rows are streamed and retake-merged per
+        typed name as they arrive, so memory grows with distinct names, not rows.
+        """
+        return self._stage("export", self.export_key(quiz_file, sheet), lambda: self.decode_export(quiz_file, sheet))
+
+    def decode_export(self, quiz_file: str, sheet=None, data: Optional[bytes] = None):
+        """The load_export computation on its own (touches no memo); `data` is the file's content if already read."""
+        header, records = read_records(quiz_file, sheet, data=data)
+        slots, header_slot = self.sorter.quiz_slot_layout(header)
+        typed = RetakeAccumulator(self.sorter, slots)
+        for row in records:
+            typed.add(row["Student"] or "", ((slot, row.get(h)) for h, slot in header_slot.items()))
+        return slots, typed.vectors
+
+    def match(self, roster: Stage, export: Stage, workers: Optional[int] = None) -> Stage:
+        """typed name -> canonical roster name (None = unmatched)"""
+        _, typed = export.value
+        key = self.key("match", roster.key, export.key, self.sorter.FUZZY_THRESHOLD)
+        return self._stage("match", key, lambda: self.sorter.match_names(list(typed), roster.value[1], workers))
+
+    def fold(self, export: Stage, roster: Optional[Stage] = None, match: Optional[Stage] = None,
+             fill_roster: bool = True, keep_unmatched: bool = False) -> Stage:
+        """
+        Score vectors folded per canonical student (retake_merge is order-independent, so
+        vectors fold as-is). Returns {"delta": table over every quiz slot, "quiz_columns":
+        its canonical quizzes, "unmatched": typed names, "unmatched_delta": their scores}.
+        fill_roster adds an X row per roster student without a score; keep_unmatched keeps
+        unmatched names in the delta as '[UNMATCHED] name'. Without a roster the typed
+        names are used as they are.
+        """
+        slots, typed = export.value
+
+        def compute():
+            names = match.value if match else {raw: raw for raw in typed}
+            acc = RetakeAccumulator(self.sorter, slots)
+            unmatched_acc = RetakeAccumulator(self.sorter, slots)
+            for raw, vec in typed.items():
+                canon = names[raw]
+                if canon:
+                    acc.add(canon, enumerate(vec))
+                    continue
+                # Unmatched names stay out of the MASTER; their scores are kept for the resolver
+                unmatched_acc.add(raw, enumerate(vec))
+                if keep_unmatched:
+                    acc.add(f"[UNMATCHED] {raw}", enumerate(vec))
+            if roster is not None and fill_roster:
+                for line in roster.value[0]:
+                    p = self.sorter.parse_attendance_entry_new(line)
+                    acc.ensure(self.sorter._format_canonical_last_middle_first(p))
+            return {
+                "delta": ScoreTable.from_vectors(list(acc.vectors), slots, acc.vectors.values()),
+                "quiz_columns": [c for c in slots if self.sorter.is_canonical_quiz(c)],
+                "unmatched": list(unmatched_acc.vectors),
+                "unmatched_delta": ScoreTable.from_vectors(list(unmatched_acc.vectors), slots,
+                                                           unmatched_acc.vectors.values()),
+            }
+        return self._stage("fold", self.fold_key(export.key, roster, fill_roster, keep_unmatched), compute)
+
+    def fold_file(self, quiz_file: str, roster: Optional[Stage] = None, sheet=None, fuzzy_workers: Optional[int] = None,
+                  fill_roster: bool = True, keep_unmatched: bool = False) -> Stage:
+        """load export -> match -> fold for one file (the export is not read when the fold is memoized)."""
+        key = self.fold_key(self.export_key(quiz_file, sheet), roster, fill_roster, keep_unmatched)
+        if key in self._memo["fold"]:
+            return self._stage("fold", key, lambda: None)
+        export = self.load_export(quiz_file, sheet)
+        match = self.match(roster, export, fuzzy_workers) if roster else None
+        return self.fold(export, roster, match, fill_roster, keep_unmatched)
+
+    def combine(self, folds: List[Stage]) -> Stage:
+        """Several folded exports as one delta (retake_merge semantics across files)."""
+        if len(folds) == 1:
+            return folds[0]
+
+        def compute():
+            delta = self.sorter.combine_imports([f.value["delta"] for f in folds])
+            return {
+                "delta": delta,
+                "quiz_columns": [c for c in delta.quizzes if self.sorter.is_canonical_quiz(c)],
+                "unmatched": list(dict.fromkeys(name for f in folds for name in f.value["unmatched"])),
+                "unmatched_delta": self.sorter.combine_imports([f.value["unmatched_delta"] for f in folds]),
+            }
+        return self._stage("combine", self.key("combine", [f.key for f in folds]), compute)
+
+    def build(self, quiz_files: Sequence[str], attendance_file: Optional[str] = None, sheet=None,
+              workers: Optional[int] = None, fuzzy_workers: Optional[int] = None,
+              fill_roster: bool = True, keep_unmatched: bool = False) -> Stage:
+        """
+        roster -> export -> match -> fold for every file, combined into one delta. Files
+        whose fold is not memoized yet are folded in a process pool when there are enough.
+        """
+        roster = self.roster(attendance_file) if attendance_file else None
+        files = list(dict.fromkeys(quiz_files))
+        if workers is None:
+            workers = min(len(files), os.cpu_count() or 1) if len(files) > 2 else 1
+        keys = {q: self.fold_key(self.export_key(q, sheet), roster, fill_roster, keep_unmatched) for q in files}
+        todo = [q for q in files if keys[q] not in self._memo["fold"]]
+        if workers > 1 and len(todo) > 1:
+            jobs = [(q, attendance_file, sheet, fill_roster, keep_unmatched) for q in todo]
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                for q, value in zip(todo, pool.map(_fold_job, jobs)):
+                    self.remember("fold", keys[q], value)
+        folds = [self.fold_file(q, roster, sheet, fuzzy_workers, fill_roster, keep_unmatched) for q in files]
+        return self.combine(folds)
+
+    def master(self, master_path: str, att_lines: Sequence[str] = ()) -> Stage:
+        """The period MASTER as stored (keyed by its file version)."""
+        version = self.sorter.master_version(master_path)
+        if version is None:  # not written yet: the roster decides its rows
+            return Stage(self.key("master", master_path, None, list(att_lines)), self.sorter.load_table(master_path, att_lines))
+        # Read-only stage: a columnar MASTER is rendered straight from its mapping
+        return self._stage("master", self.key("master", master_path, version),
+                           lambda: self.sorter.view_table(master_path))
+
+    def merge(self, built: Stage, master_path: str, att_lines: Sequence[str], commit: bool = False,
+              source: Optional[str] = None, ledger_keys=None) -> Stage:
+        """
+        The built delta retake-merged into the period MASTER. commit=True writes it through
+        update_master (locked, journaled, recorded in the import ledger); a commit is a side
+        effect, so it always runs and only the uncommitted merge is memoized.
+        """
+        quiz_columns = built.value["quiz_columns"]
+        if not quiz_columns:
+            raise ValueError("No quiz columns detected in the quiz file. Expected headers like 'Quiz 1 (/10)'.")
+        delta = built.value["delta"]
+        if commit:
+            table = self.sorter.update_master(master_path, delta, quiz_columns, list(att_lines),
+                                              source=source, ledger_keys=ledger_keys)
+            # Keyed by the version it wrote, so the stages after it never mix it up with another table
+            return Stage(self.key("commit", built.key, master_path, self.sorter.master_version(master_path)), table)
+
+        def compute():
+            before = self.master(master_path, att_lines).value
+            return self.sorter.merge_into_master(before, delta, quiz_columns)
+        key = self.key("merge", built.key, master_path, self.sorter.master_version(master_path), list(att_lines))
+        return self._stage("merge", key, compute)
+
+    def sort(self, table: Stage, enabled: bool = True) -> Stage:
+        """Collation order (or the order as read when disabled)."""
+        if not enabled:
+            return table
+        return self._stage("sort", self.key("sort", table.key), lambda: self.sorter.sort_master(table.value))
+
+    def curve(self, table: Stage, policy) -> Stage:
+        """Read-time curve view; shared, so treat it as read-only."""
+        policy = self.sorter.parse_curve_policy(policy)
+        if policy is None:
+            return table
+        return self._stage("curve", self.key("curve", table.key, policy),
+                           lambda: self.sorter.curved_view(table.value, policy))
+
+    def render(self, view: Stage, targets: Dict[str, str], title: str = "Quiz Results - Grading Sheet") -> Stage:
+        """
+        export_master to every target (format -> path). Skipped only when these exact
+        files still hold this exact view and title.
+        """
+        key = self.key("render", view.key, title, sorted(targets.items()))
+        if key in self._memo["render"] and all(self._written.get(p) == key and os.path.exists(p)
+                                               for p in targets.values()):
+            return Stage(key, self._memo["render"][key])
+        written = export_master(view.value, targets, title)
+        self._written.update({p: key for p in targets.values()})
+        return self.remember("render", key, written)
+
+    # ---- one request ----
+    def run(self, quiz_files: Sequence[str], attendance_file: Optional[str] = None, sheet=None,
+            workers: Optional[int] = None, master_path: Optional[str] = None, commit: bool = False,
+            source: Optional[str] = None, ledger_keys=None, fill_roster: bool = True,
+            keep_unmatched: bool = False, sort: bool = True, curve=None,
+            title: str = "Quiz Results - Grading Sheet", targets: Optional[Dict[str, str]] = None) -> Dict[str, Stage]:
+        """
+        Drive the stages for one request. With master_path the built delta is merged into
+        that MASTER (written when commit); without one the folded exports are the result.
+        `targets` are exported from the `curve` view. Returns {"built", "table", "view"
+        (+ "render")} stages; "table" holds raw scores.
+        """
+        built = self.build(quiz_files, attendance_file, sheet, workers, fill_roster=fill_roster,
+                           keep_unmatched=keep_unmatched)
+        if master_path:
+            att_lines = self.roster(attendance_file).value[0] if attendance_file else []
+            table = self.merge(built, master_path, att_lines, commit, source, ledger_keys)
+        else:
+            table = Stage(built.key, built.value["delta"])
+        table = self.sort(table, sort)
+        stages = {"built": built, "table": table, "view": self.curve(table, curve)}
+        if targets:
+            stages["render"] = self.render(stages["view"], targets, title)
+        return stages
+
+
+def _fold_job(job):
+    """Process-pool entry point for QuizPipeline.build: one export, folded in a fresh pipeline."""
+    from enhanced_quiz_sorter import EnhancedQuizSorter
+    quiz_file, attendance_file, sheet, fill_roster, keep_unmatched = job
+    pipeline = EnhancedQuizSorter().pipeline()
+    roster = pipeline.roster(attendance_file) if attendance_file else None
+    # Files are already spread over the pool; don't start a nested one for fuzzy matching
+    return pipeline.fold_file(quiz_file, roster, sheet, 1, fill_roster, keep_unmatched).value
@@ -0,0 +1,210 @@
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Dict, Optional
+
+DEFAULT_ADDRESS = ".quiz_sorter.sock"
+
+
+def parse_address(address: str):
+    """
+    'host:port' -> TCP tuple, anything else -> Unix socket path. The service has no
+    authentication, so a TCP host must be a loopback address.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        host = host.strip("[]") or "127.0.0.1"
+        if host != "localhost":
+            try:
+                loopback = ipaddress.ip_address(host).is_loopback
+            except ValueError:
+                loopback = False
+            if not loopback:
+                raise ValueError(f"Service only listens on loopback addresses (e.g. 127.0.0.1), not {host}")
+        return (host, int(port))
+    return address
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.dispatch(request)}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class QuizService:
+    """
+    Resident warm-cache service.
+
+    serve() keeps one EnhancedQuizSorter alive behind a local socket, so pandas,
+    reportlab and fuzzywuzzy are imported once and parsed rosters / MASTERs stay
+    cached between jobs. ServiceClient is the thin side: standard library only,
+    so a CLI call that talks to a running service starts in milliseconds.
+
+    Protocol: one JSON object per line in each direction.
+      request:  {"op": "import" | "preview" | "render" | "cards" | "rollup" | "ping" | "shutdown", "cwd": ..., "args": {...}}
+      response: {"ok": true, "result": {...}}  or  {"ok": false, "error": "..."}
+    """
+
+    def __init__(self, sorter=None):
+        if sorter is None:
+            from enhanced_quiz_sorter import EnhancedQuizSorter
+            sorter = EnhancedQuizSorter()
+        self.sorter = sorter
+        self.cwd = os.getcwd()
+        # The sorter's caches are not thread-safe; jobs run one at a time
+        self._lock = threading.Lock()
+
+    def dispatch(self, request: Dict) -> Dict:
+        op = request.get("op")
+        if request.get("cwd") != self.cwd:
+            # MASTERs live in the working directory; never write another folder's periods
+            origin = request.get("cwd") or "an unknown folder"
+            raise ValueError(f"Service runs in {self.cwd}, request came from {origin}")
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise ValueError(f"Unknown operation: {op}")
+        with self._lock:
+            return handler(**request.get("args", {}))
+
+    def op_ping(self):
+        return {"pid": os.getpid(), "cwd": self.cwd}
+
+    def op_import(self, quiz_files, attendance_file, output_file=None, curve=None, workers=None, sheet=None,
+                  exports=None):
+        result = self.sorter.import_quiz_files(quiz_files, attendance_file, output_file,
+                                               curve=curve, workers=workers, sheet=sheet, exports=exports)
+        return {
+            "status": result["status"],
+            "period": result["period"],
+            "master_path": result["master_path"],
+            "students": len(result["master"]),
+            "merged_files": result["merged_files"],
+            "skipped_files": result["skipped_files"],
+            "unmatched": result["unmatched"],
+            "exports": result["exports"],
+        }
+
+    def op_preview(self, quiz_files, attendance_file, sheet=None):
+        return self.sorter.preview_imports(quiz_files, attendance_file, sheet)
+
+    def op_render(self, period, pdf_path=None, title=None, curve=None, exports=None):
+        from master_export import timestamped_path
+        master_path = self.sorter.period_master_path(period)
+        if not os.path.exists(master_path):
+            raise FileNotFoundError(master_path)
+        if pdf_path is None:
+            pdf_path = timestamped_path(master_path, "pdf")
+        # MASTER and curve stages are memoized until the file changes, so only the export re-runs
+        pipeline = self.sorter.pipeline()
+        view = pipeline.curve(pipeline.master(master_path), curve)
+        written = pipeline.render(view, {"pdf": pdf_path, **(exports or {})},
+                                  title or f"{period} – Quiz Results (updated)").value
+        return {"pdf_path": pdf_path, "exports": written}
+
+    def op_cards(self, period, out_path=None, merged=True, title=None, curve=None, workers=None):
+        from master_export import timestamped_path
+        from report_cards import build_report_cards
+        master_path = self.sorter.period_master_path(period)
+        if not os.path.exists(master_path):
+            raise FileNotFoundError(master_path)
+        if out_path is None:
+            base = os.path.join(os.path.dirname(master_path), f"{period.replace(' ', '_')}_report_cards")
+            out_path = timestamped_path(base, "pdf") if merged else base
+        pipeline = self.sorter.pipeline()
+        view = pipeline.curve(pipeline.master(master_path), curve).value
+        paths = build_report_cards(view, out_path, title or f"{period} – Quiz Report Card", merged, workers)
+        return {"out_path": out_path, "students": len(view), "files": len(paths)}
+
+    def op_rollup(self, csv_path=None, pdf_path=None):
+        from gradebook_rollup import GradebookRollup
+        result = GradebookRollup(self.sorter, self.cwd).build(csv_path, pdf_path)
+        return {
+            "periods": result["periods"],
+            "recomputed": result["recomputed"],
+            "summary": result["summary"].to_dict("records"),
+            "csv_path": csv_path,
+            "pdf_path": pdf_path,
+        }
+
+
+def serve(address: str = DEFAULT_ADDRESS, service: Optional[QuizService] = None, log=print):
+    """Run the resident service until a 'shutdown' request or Ctrl+C."""
+    service = service or QuizService()
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        base = socketserver.ThreadingTCPServer
+    else:
+        base = socketserver.ThreadingUnixStreamServer
+        if os.path.exists(target):
+            os.unlink(target)  # stale socket from a previous run
+
+    class _Server(base):
+        if isinstance(target, tuple) and ":" in target[0]:
+            address_family = socket.AF_INET6
+        allow_reuse_address = True
+        daemon_threads = True
+
+    with _Server(target, _Handler) as server:
+        if not isinstance(target, tuple):
+            os.chmod(target, 0o600)  # only the user who started the service may send it jobs
+        def op_shutdown():
+            threading.Thread(target=server.shutdown, daemon=True).start()
+            return {"stopping": True}
+        service.op_shutdown = op_shutdown
+        server.dispatch = service.dispatch
+        log(f"🟢 Quiz Sorter service listening on {address} (cwd: {service.cwd})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    if not isinstance(target, tuple) and os.path.exists(target):
+        os.unlink(target)
+    log("Stopped.")
+
+
+class ServiceClient:
+    """Thin client: standard library only."""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        target = parse_address(address)
+        if isinstance(target, tuple):
+            family = socket.AF_INET6 if ":" in target[0] else socket.AF_INET
+        else:
+            family = socket.AF_UNIX
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(target)
+        self._file = self._sock.makefile("rwb")
+
+    def call(self, op: str, **args) -> Dict:
+        request = {"op": op, "cwd": os.getcwd(), "args": args}
+        self._file.write((json.dumps(request) + "\n").encode("utf-8"))
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Quiz Sorter service closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
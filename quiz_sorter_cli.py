@@ -0,0 +1,280 @@
+import argparse
+import os
+import sys
+
+# EnhancedQuizSorter (fuzzywuzzy, NumPy) is imported inside the local commands so
+# that calls handed to a running service (--service) stay cheap to start.
+
+
+def _add_curve_args(parser):
+    parser.add_argument("--no-curve", action="store_true", help="Show raw scores (no curve cap)")
+    parser.add_argument("--cap", type=int, default=9, help="Curve cap / max points (default: 9)")
+    parser.add_argument("--curve", metavar="POLICY",
+                        help="Curve policy instead of --cap: none, cap:N, cap9, linear:FACTOR[:MAX]")
+
+
+def _curve_spec(args) -> str:
+    """MASTERs hold raw scores; the curve only shapes what is written or rendered."""
+    if args.curve:
+        return args.curve
+    return "none" if args.no_curve else f"cap:{args.cap}"
+
+
+def _add_sheet_arg(parser):
+    parser.add_argument("--sheet", help="Worksheet of .xlsx exports, by name or 0-based index "
+                                        "(default: the first sheet with a Student header)")
+
+
+def _add_export_args(parser, formats):
+    for fmt in formats:
+        parser.add_argument(f"--{fmt}", metavar="PATH",
+                            help=f"Also write the (curved) MASTER as {fmt.upper()}; all outputs are written concurrently")
+
+
+def _exports(args, formats) -> dict:
+    return {fmt: os.path.abspath(getattr(args, fmt)) for fmt in formats if getattr(args, fmt)}
+
+
+def _add_service_arg(parser):
+    parser.add_argument("--service", metavar="ADDRESS",
+                        help="Submit the job to a running 'serve' process (socket path or host:port)")
+
+
+def _sorter():
+    from enhanced_quiz_sorter import EnhancedQuizSorter
+    return EnhancedQuizSorter()
+
+
+def _submit(args, op, **job):
+    from quiz_service import ServiceClient
+    with ServiceClient(args.service) as client:
+        return client.call(op, **job)
+
+
+def cmd_import(args):
+    job = dict(quiz_files=[os.path.abspath(q) for q in args.quiz_files],
+               attendance_file=os.path.abspath(args.attendance),
+               output_file=os.path.abspath(args.output) if args.output else None,
+               curve=_curve_spec(args), workers=args.workers, sheet=args.sheet,
+               exports=_exports(args, ("pdf", "xlsx", "json")))
+    if args.service:
+        result = _submit(args, "import", **job)
+    else:
+        result = _sorter().import_quiz_files(**job)
+    for q in result["merged_files"]:
+        print(f"✅ {os.path.basename(q)} -> {os.path.basename(result['master_path'])} (merged)")
+    for q in result["skipped_files"]:
+        print(f"✅ {os.path.basename(q)} -> {os.path.basename(result['master_path'])} (already merged)")
+    for name in result["unmatched"]:
+        print(f"   ⚠️ Unmatched: {name}")
+    for path in result["exports"].values():
+        print(f"📄 {path}")
+    return 0
+
+
+def cmd_preview(args):
+    job = dict(quiz_files=[os.path.abspath(q) for q in args.quiz_files],
+               attendance_file=os.path.abspath(args.attendance), sheet=args.sheet)
+    if args.service:
+        preview = _submit(args, "preview", **job)
+    else:
+        preview = _sorter().preview_imports(**job)
+    for c in preview["changes"]:
+        print(f"{c['student']}\t{c['quiz']}\t{c['old']} -> {c['new']}")
+    for name in preview["unmatched"]:
+        print(f"⚠️ Unmatched: {name}")
+    return 0
+
+
+def cmd_render(args):
+    job = dict(period=args.period, pdf_path=os.path.abspath(args.pdf) if args.pdf else None, title=args.title,
+               curve=_curve_spec(args), exports=_exports(args, ("csv", "xlsx", "json")))
+    if args.service:
+        result = _submit(args, "render", **job)
+    else:
+        from quiz_service import QuizService
+        result = QuizService(_sorter()).op_render(**job)
+    for path in result["exports"].values():
+        print(f"📄 {path}")
+    return 0
+
+
+def cmd_cards(args):
+    job = dict(period=args.period, out_path=os.path.abspath(args.output) if args.output else None,
+               merged=not args.per_student, title=args.title, curve=_curve_spec(args), workers=args.workers)
+    if args.service:
+        result = _submit(args, "cards", **job)
+    else:
+        from quiz_service import QuizService
+        result = QuizService(_sorter()).op_cards(**job)
+    print(f"🎓 {result['students']} report card(s) -> {result['out_path']}")
+    return 0
+
+
+def cmd_rollup(args):
+    job = dict(csv_path=os.path.abspath(args.output) if args.output else None,
+               pdf_path=os.path.abspath(args.pdf) if args.pdf else None)
+    if args.service:
+        result = _submit(args, "rollup", **job)
+    else:
+        from quiz_service import QuizService
+        result = QuizService(_sorter()).op_rollup(**job)
+    for line in result["summary"]:
+        print(f"{line['Period']}\t{line['Students']} students\t{line['With missing']} with missing\tmean {line['Mean']}")
+    print(f"🔄 Recomputed: {', '.join(result['recomputed']) or 'nothing (all periods unchanged)'}")
+    for path in (result["csv_path"], result["pdf_path"]):
+        if path:
+            print(f"📄 {path}")
+    return 0
+
+
+def cmd_undo(args):
+    sorter = _sorter()
+    master_path = sorter.period_master_path(args.period)
+    sorter.undo_imports(master_path, args.count)
+    print(f"↩️ Reverted {args.count} import(s) in {os.path.basename(master_path)}")
+    return 0
+
+
+def cmd_convert(args):
+    path = _sorter().convert_master(args.period, args.to)
+    print(f"🔁 {args.period} MASTER is now {os.path.basename(path)}")
+    return 0
+
+
+def cmd_export(args):
+    path = _sorter().export_master_csv(args.period, os.path.abspath(args.csv))
+    print(f"📄 {path}")
+    return 0
+
+
+def cmd_evaluate(args):
+    from matcher_eval import MatcherEvaluation
+    evaluation = MatcherEvaluation(os.path.abspath(args.attendance), _sorter())
+    fixtures = evaluation.load_fixtures(os.path.abspath(args.fixtures))
+    thresholds = [int(t) for t in args.thresholds.split(",")] if args.thresholds else None
+    strategies = args.strategies.split(",") if args.strategies else None
+    report = evaluation.evaluate(fixtures, strategies, thresholds)
+    print(report.to_string(index=False))
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+        print(f"📄 {os.path.abspath(args.csv)}")
+    return 0
+
+
+def cmd_watch(args):
+    from quiz_watcher import FolderWatcher
+    watcher = FolderWatcher(input_dir=args.input_dir, attendance_dir=args.attendance_dir,
+                            interval=args.interval, debounce=args.debounce)
+    if args.once:
+        watcher.run_once()
+    else:
+        watcher.run_forever()
+    return 0
+
+
+def cmd_serve(args):
+    from quiz_service import serve
+    serve(args.address)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from quiz_service import DEFAULT_ADDRESS
+
+    parser = argparse.ArgumentParser(prog="quiz_sorter_cli.py", description="Quiz Sorter for TAs (command line)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="Merge one or more quiz exports into their period MASTER in one pass")
+    p.add_argument("quiz_files", nargs="+")
+    p.add_argument("--attendance", required=True, help="Attendance list for the period")
+    p.add_argument("--output", help="Also write the updated MASTER (curved per --cap/--curve) to this CSV")
+    p.add_argument("--workers", type=int, help="Processes used to match/fold the files (default: automatic)")
+    _add_export_args(p, ("pdf", "xlsx", "json"))
+    _add_sheet_arg(p)
+    _add_curve_args(p)
+    _add_service_arg(p)
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("preview", help="Show what an import would change without writing anything")
+    p.add_argument("quiz_files", nargs="+")
+    p.add_argument("--attendance", required=True, help="Attendance list for the period")
+    _add_sheet_arg(p)
+    _add_service_arg(p)
+    p.set_defaults(func=cmd_preview)
+
+    p = sub.add_parser("render", help="Render a period MASTER as a PDF")
+    p.add_argument("period", help="e.g. 'Period 3'")
+    p.add_argument("--pdf", help="PDF path (default: timestamped next to the MASTER)")
+    p.add_argument("--title", help="PDF title")
+    _add_export_args(p, ("csv", "xlsx", "json"))
+    _add_curve_args(p)
+    _add_service_arg(p)
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("cards", help="One report-card page per student of a period MASTER")
+    p.add_argument("period", help="e.g. 'Period 3'")
+    p.add_argument("--output", help="Merged PDF path, or the folder with --per-student "
+                                    "(default: timestamped next to the MASTER)")
+    p.add_argument("--per-student", action="store_true", help="Write one PDF per student instead of one merged PDF")
+    p.add_argument("--title", help="Card title")
+    p.add_argument("--workers", type=int, help="Processes writing chunks of cards (default: automatic)")
+    _add_curve_args(p)
+    _add_service_arg(p)
+    p.set_defaults(func=cmd_cards)
+
+    p = sub.add_parser("rollup", help="Combine every period MASTER into one cross-period gradebook")
+    p.add_argument("--output", default="gradebook.csv", help="Gradebook CSV (default: gradebook.csv)")
+    p.add_argument("--pdf", help="Also render the summary + gradebook as a PDF")
+    _add_service_arg(p)
+    p.set_defaults(func=cmd_rollup)
+
+    p = sub.add_parser("undo", help="Revert the last import(s) of a period MASTER")
+    p.add_argument("period", help="e.g. 'Period 3'")
+    p.add_argument("-n", "--count", type=int, default=1)
+    p.set_defaults(func=cmd_undo)
+
+    p = sub.add_parser("convert", help="Store a period MASTER as CSV or in the memory-mapped columnar format")
+    p.add_argument("period", help="e.g. 'Period 3'")
+    p.add_argument("--to", choices=["csv", "columnar"], required=True)
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("export", help="Write a period MASTER (either format) as a CSV")
+    p.add_argument("period", help="e.g. 'Period 3'")
+    p.add_argument("--csv", required=True, help="Output CSV path")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("evaluate", help="Score the name matchers on labeled fixtures (accuracy + latency)")
+    p.add_argument("fixtures", help="CSV/XLSX with Typed and Expected (canonical name or #ID, blank = no match)")
+    p.add_argument("--attendance", required=True, help="Roster the fixtures refer to")
+    p.add_argument("--strategies", help="Comma-separated: exact,ratio,batch,variations (default: all)")
+    p.add_argument("--thresholds", help="Comma-separated fuzzy thresholds (default: 60,70,80,90)")
+    p.add_argument("--csv", help="Also write the report to this CSV")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("watch", help="Poll input/ and attendance/ and merge new exports as they arrive")
+    p.add_argument("--input-dir", default="input")
+    p.add_argument("--attendance-dir", default="attendance")
+    p.add_argument("--interval", type=float, default=5.0, help="Seconds between polls")
+    p.add_argument("--debounce", type=float, default=2.0, help="Seconds a file must stay unchanged before import")
+    p.add_argument("--once", action="store_true", help="Poll twice, --debounce seconds apart, and exit (for cron)")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("serve", help="Keep rosters and MASTERs warm in a resident local service")
+    p.add_argument("--address", default=DEFAULT_ADDRESS,
+                   help=f"Unix socket path or loopback host:port (default: {DEFAULT_ADDRESS})")
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (FileNotFoundError, ValueError, RuntimeError, ConnectionError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,20 +2,17 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import csv
 import os
-import pandas as pd
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph
 from enhanced_quiz_sorter import EnhancedQuizSorter
+from master_export import export_master, timestamped_path
+from results_grid import ResultsGrid
+from resolver_panel import ResolverPanel
 
 class QuizSorterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Quiz Sorter for TAs")
-        self.root.geometry("700x600")
+        self.root.geometry("900x820")
         
         # Set a modern color scheme
         self.bg_color = "#f5f5f5"  # Light gray background
@@ -79,6 +76,12 @@ class QuizSorterGUI:
         
         self.sorter = EnhancedQuizSorter()
         self.quiz_file = ""
+        self.quiz_files = []
+        self.master_views = None  # CurveViews of the last processed MASTER
+        self.unmatched_names = []
+        self.unmatched_scores = {}  # typed name -> {quiz: score} kept for the resolver
+        self.master_title = "Quiz Results - Grading Sheet"
+        self._rerender_job = None
         self.attendance_file = ""
         
         self.create_widgets()
@@ -87,68 +90,21 @@ class QuizSorterGUI:
         """This method is no longer needed with ttk styles"""
         pass
         
-    def create_pdf_file(self, csv_file_path, pdf_title="Quiz Results - Grading Sheet"):
-        """Create a PDF file from the CSV and open it automatically"""
+    def export_outputs(self, df, pdf_title="Quiz Results - Grading Sheet", write_csv=True):
+        """Write the output CSV, a timestamped PDF and any extra formats from one in-memory table; open the PDF."""
         try:
-            # Read the CSV file
-            df = pd.read_csv(csv_file_path)
-            
-            # Create PDF file path with timestamp to make it unique
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name = os.path.splitext(csv_file_path)[0]
-            pdf_file_path = f"{base_name}_{timestamp}.pdf"
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(pdf_file_path, pagesize=landscape(letter))
-            elements = []
-            
-            # Add title
-            styles = getSampleStyleSheet()
-            title_style = styles['Heading1']
-            title_style.alignment = 1  # Center alignment
-            title = Paragraph(pdf_title, title_style)
-            elements.append(title)
-            elements.append(Paragraph("<br/><br/>", styles['Normal']))
-            
-            # Convert DataFrame to list and coerce NaN -> "X"
-            df = df.fillna("X")  # replaces pandas NaN
-            for col in df.columns:
-                df.loc[df[col].astype(str).str.strip().isin(["", "nan", "NaN", "None"]), col] = "X"
-
-            data = [df.columns.tolist()] + df.values.tolist()
-
-            # Create table
-            table = Table(data)
-
-            # Style: header + grid; center/bold X marks
-            style = TableStyle([
-                # Header
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
-                ('TEXTCOLOR',  (0, 0), (-1, 0), colors.white),
-                ('ALIGN',      (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME',   (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE',   (0, 0), (-1, 0), 12),
-
-                # Body
-                ('GRID',       (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN',     (0, 1), (-1, -1), 'MIDDLE'),
-                ('ALIGN',      (1, 1), (-1, -1), 'CENTER'),  # center scores/X
-                ('FONTSIZE',   (1, 1), (-1, -1), 10),
-            ])
-
-            # Make "X" bold so it fills the box
-            # (Apply to all body cells that contain "X")
-            for r in range(1, len(data)):
-                for c in range(1, len(data[0])):  # score cols only
-                    if str(data[r][c]).strip().upper() == "X":
-                        style.add('FONTNAME', (c, r), (c, r), 'Helvetica-Bold')
-            
-            table.setStyle(style)
-            elements.append(table)
-            
-            # Build PDF
-            doc.build(elements)
+            out_csv = self.output_label.cget("text")
+            base_name = os.path.splitext(out_csv)[0]
+            paths = {"csv": out_csv} if write_csv else {}
+            paths["pdf"] = timestamped_path(out_csv, "pdf")
+            if self.export_xlsx.get():
+                paths["xlsx"] = f"{base_name}.xlsx"
+            if self.export_json.get():
+                paths["json"] = f"{base_name}.json"
+
+            # All formats are written concurrently (shared with the CLI / resident service)
+            export_master(df, paths, pdf_title)
+            pdf_file_path = paths["pdf"]
             
             # Open the PDF file automatically
             import subprocess
@@ -164,9 +120,18 @@ class QuizSorterGUI:
             return pdf_file_path
             
         except Exception as e:
-            messagebox.showerror("PDF Export Error", f"Could not create PDF file: {str(e)}")
+            messagebox.showerror("Export Error", f"Could not export the results: {str(e)}")
             return None
         
+    def sample_students(self, table, n=5):
+        """Parsed names of the first `n` rows (only the results sample needs them)."""
+        students = []
+        for _, (student, *cells) in zip(range(n), table.rows()):
+            student_info = self.sorter.parse_student_name(student)
+            student_info['absent'] = "X" in cells
+            students.append(student_info)
+        return students
+
     def create_widgets(self):
         # Title
         title_label = tk.Label(self.root, text="Quiz Sorter for TAs", 
@@ -188,7 +153,7 @@ class QuizSorterGUI:
         file_frame.pack(fill="x", padx=25, pady=10)
         
         # Quiz file selection
-        tk.Label(file_frame, text="Quiz Data File (CSV):", 
+        tk.Label(file_frame, text="Quiz Data File (CSV/XLSX):", 
                 font=("Arial", 10, "bold"),
                 bg=self.bg_color, fg=self.text_color).grid(row=0, column=0, sticky="w", pady=8)
         self.quiz_label = tk.Label(file_frame, text="No file selected", 
@@ -202,7 +167,7 @@ class QuizSorterGUI:
         self.browse_quiz_btn.grid(row=0, column=2, padx=10, pady=8)
         
         # Attendance file selection
-        tk.Label(file_frame, text="Attendance List (CSV):", 
+        tk.Label(file_frame, text="Attendance List (CSV/XLSX):", 
                 font=("Arial", 10, "bold"),
                 bg=self.bg_color, fg=self.text_color).grid(row=1, column=0, sticky="w", pady=8)
         self.attendance_label = tk.Label(file_frame, text="No file selected (optional)", 
@@ -261,6 +226,10 @@ class QuizSorterGUI:
 
         self.curve_enabled.trace_add('write', _toggle_curve_spin)
         _toggle_curve_spin()
+
+        # The MASTER stores raw scores; changing the curve re-renders from a cached view
+        self.curve_enabled.trace_add('write', self.schedule_curve_rerender)
+        self.curve_cap_var.trace_add('write', self.schedule_curve_rerender)
         
         # Output frame
         output_frame = tk.LabelFrame(self.root, text="💾 Output", 
@@ -281,6 +250,28 @@ class QuizSorterGUI:
                                           style='Blue.TButton',
                                           padding=(25, 8))
         self.choose_output_btn.grid(row=0, column=2, padx=10, pady=8)
+        self.undo_btn = ttk.Button(output_frame, text="↩️ Undo Last Import",
+                                   command=self.undo_last_import,
+                                   style='Blue.TButton',
+                                   padding=(25, 8))
+        self.undo_btn.grid(row=1, column=2, padx=10, pady=8)
+        self.cards_btn = ttk.Button(output_frame, text="🎓 Report Cards",
+                                    command=self.export_report_cards,
+                                    style='Blue.TButton',
+                                    padding=(25, 8))
+        self.cards_btn.grid(row=2, column=2, padx=10, pady=8)
+
+        # CSV + PDF are always written; these go alongside them from the same table
+        self.export_xlsx = tk.BooleanVar(value=False)
+        self.export_json = tk.BooleanVar(value=False)
+        extra_row = ttk.Frame(output_frame)
+        extra_row.grid(row=1, column=0, columnspan=2, sticky="w", pady=8)
+        ttk.Label(extra_row, text="Also export:", background=self.bg_color,
+                  foreground=self.text_color).pack(side="left", padx=(0, 8))
+        ttk.Checkbutton(extra_row, text="XLSX", variable=self.export_xlsx,
+                        style='Custom.TCheckbutton').pack(side="left")
+        ttk.Checkbutton(extra_row, text="JSON", variable=self.export_json,
+                        style='Custom.TCheckbutton').pack(side="left", padx=(8, 0))
         
         # Process button
         self.process_text = tk.StringVar(value="🚀 Process Quiz Data")
@@ -298,21 +289,33 @@ class QuizSorterGUI:
                                     font=("Arial", 10, "bold"))
         self.status_label.pack(pady=5)
         
-        # Results text area
+        # Results: summary text + full MASTER grid
         results_frame = tk.LabelFrame(self.root, text="📊 Results", 
                                      font=("Arial", 12, "bold"),
                                      bg=self.bg_color, fg=self.text_color,
                                      padx=15, pady=15)
         results_frame.pack(fill="both", expand=True, padx=25, pady=10)
-        
-        self.results_text = tk.Text(results_frame, height=10, wrap="word",
+
+        self.results_tabs = ttk.Notebook(results_frame)
+        self.results_tabs.pack(fill="both", expand=True)
+
+        summary_tab = tk.Frame(self.results_tabs, bg=self.bg_color)
+        self.results_text = tk.Text(summary_tab, height=10, wrap="word",
                                    font=("Arial", 9),
                                    bg="white", fg=self.text_color)
-        scrollbar = tk.Scrollbar(results_frame, orient="vertical", command=self.results_text.yview)
+        scrollbar = tk.Scrollbar(summary_tab, orient="vertical", command=self.results_text.yview)
         self.results_text.configure(yscrollcommand=scrollbar.set)
         
         self.results_text.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
+
+        self.results_grid = ResultsGrid(self.results_tabs, on_activate=self.on_grid_activate,
+                                        sort_key=self.sorter.sort_key_by_last)
+        self.resolver = ResolverPanel(self.results_tabs, candidates=self.rank_unmatched,
+                                      confirm=self.confirm_unmatched)
+        self.results_tabs.add(summary_tab, text="📝 Summary")
+        self.results_tabs.add(self.results_grid, text="📋 MASTER Grid")
+        self.results_tabs.add(self.resolver, text="🔗 Unmatched")
         
     def select_quiz_file(self):
         # Set default directory to input folder
@@ -320,14 +323,19 @@ class QuizSorterGUI:
         if not os.path.exists(default_dir):
             default_dir = os.getcwd()
             
-        filename = filedialog.askopenfilename(
-            title="Select Quiz Data File",
+        # Several exports of one period can be selected and merged in a single pass
+        filenames = filedialog.askopenfilenames(
+            title="Select Quiz Data File(s)",
             initialdir=default_dir,
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("Quiz exports", "*.csv *.xlsx *.xlsm"), ("CSV files", "*.csv"),
+                       ("Excel workbooks", "*.xlsx *.xlsm"), ("All files", "*.*")]
         )
-        if filename:
-            self.quiz_file = filename
-            self.quiz_label.config(text=os.path.basename(filename), fg="black")
+        if filenames:
+            self.quiz_files = list(filenames)
+            self.quiz_file = self.quiz_files[0]
+            label = os.path.basename(self.quiz_file) if len(self.quiz_files) == 1 else f"{len(self.quiz_files)} files selected"
+            self.quiz_label.config(text=label, fg="black")
+            self.show_import_preview()
             
     def select_attendance_file(self):
         # Set default directory to attendance folder
@@ -338,11 +346,13 @@ class QuizSorterGUI:
         filename = filedialog.askopenfilename(
             title="Select Attendance List",
             initialdir=default_dir,
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("Attendance lists", "*.csv *.xlsx *.xlsm"), ("CSV files", "*.csv"),
+                       ("Excel workbooks", "*.xlsx *.xlsm"), ("All files", "*.*")]
         )
         if filename:
             self.attendance_file = filename
             self.attendance_label.config(text=os.path.basename(filename), fg="black")
+            self.show_import_preview()
             
     def select_output_file(self):
         # Set default directory to output folder
@@ -359,6 +369,142 @@ class QuizSorterGUI:
         if filename:
             self.output_label.config(text=os.path.basename(filename), fg="blue")
             
+    def show_import_preview(self):
+        """Dry-run the selected import against the period MASTER and list what would change."""
+        if not (self.quiz_file and self.attendance_file):
+            return
+        try:
+            preview = self.sorter.preview_imports(self.quiz_files, self.attendance_file)
+        except Exception as e:
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(1.0, f"⚠️ Preview unavailable: {str(e)}")
+            return
+
+        changes = preview["changes"]
+        filled = [c for c in changes if c["old"] == "X"]
+        raised = [c for c in changes if c["old"] != "X"]
+        text = f"🔍 Import preview for {os.path.basename(preview['master_path'])}\n\n"
+        text += f"   • X cells filled: {len(filled)}\n"
+        text += f"   • Scores raised: {len(raised)}\n"
+        text += f"   • Unmatched names: {len(preview['unmatched'])}\n\n"
+        for c in raised:
+            text += f"   ⬆️ {c['student']} – {c['quiz']}: {c['old']} → {c['new']}\n"
+        for c in filled:
+            text += f"   ✏️ {c['student']} – {c['quiz']}: X → {c['new']}\n"
+        for name in preview["unmatched"]:
+            text += f"   ⚠️ Unmatched: {name}\n"
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, text)
+
+    def current_curve_policy(self):
+        try:
+            return self.sorter.curve_policy(bool(self.curve_enabled.get()), int(self.curve_cap_var.get()))
+        except (tk.TclError, ValueError):
+            return None  # spinbox is mid-edit
+
+    def schedule_curve_rerender(self, *_):
+        """Debounce curve edits (spinbox clicks) before re-rendering."""
+        if self.master_views is None:
+            return
+        if self._rerender_job is not None:
+            self.root.after_cancel(self._rerender_job)
+        self._rerender_job = self.root.after(600, self.rerender_curve_view)
+
+    def rerender_curve_view(self):
+        """Re-export output CSV + PDF (+ extras) for the current curve from the memoized view (no re-import)."""
+        self._rerender_job = None
+        if self.master_views is None:
+            return
+        df_view = self.master_views.frame(self.current_curve_policy())
+        self.results_grid.load(df_view, self.unmatched_names, self.unmatched_scores)
+        self.root.update_idletasks()
+        self.export_outputs(df_view, pdf_title=self.master_title)
+        self.status_label.config(text="✅ Re-rendered with the new curve", fg="green")
+
+    def load_resolver(self):
+        self.resolver.load(self.unmatched_names, self.unmatched_scores)
+        count = len(self.unmatched_names)
+        self.results_tabs.tab(self.resolver, text=f"🔗 Unmatched ({count})" if count else "🔗 Unmatched")
+
+    def on_grid_activate(self, name, is_unmatched):
+        if is_unmatched:
+            self.results_tabs.select(self.resolver)
+            self.resolver.select(name)
+
+    def rank_unmatched(self, name):
+        _, roster_index = self.sorter.load_roster(self.attendance_file)
+        return self.sorter.rank_candidates(name, roster_index, k=5)
+
+    def confirm_unmatched(self, name, canonical):
+        """Apply one resolved student's scores to the MASTER and save the alias (no re-import)."""
+        try:
+            self.sorter.resolve_unmatched(self.attendance_file, name, canonical, self.unmatched_scores.get(name, {}))
+        except (ValueError, FileNotFoundError) as e:
+            messagebox.showerror("Resolve Error", str(e))
+            return False
+        self.unmatched_names.remove(name)
+        self.unmatched_scores.pop(name, None)
+        count = len(self.unmatched_names)
+        self.results_tabs.tab(self.resolver, text=f"🔗 Unmatched ({count})" if count else "🔗 Unmatched")
+
+        master_path = self.sorter.period_master_path(self.sorter.extract_period_from_path(self.attendance_file))
+        self.master_views = self.sorter.curve_views(master_path)
+        self.results_grid.load(self.master_views.frame(self.current_curve_policy()),
+                               self.unmatched_names, self.unmatched_scores)
+        self.status_label.config(text=f"✅ {name} → {canonical.split(' #')[0]}", fg="green")
+        self.schedule_curve_rerender()  # output CSV + PDF catch up once the clicking stops
+        return True
+
+    def undo_last_import(self):
+        """Revert the most recent import into this period's MASTER using its score journal."""
+        if not self.attendance_file:
+            messagebox.showerror("Error", "Please select the attendance list for the period first!")
+            return
+        period = self.sorter.extract_period_from_path(self.attendance_file)
+        master_path = self.sorter.period_master_path(period)
+        if not messagebox.askyesno("Undo Import", f"Revert the last import into {os.path.basename(master_path)}?"):
+            return
+        try:
+            df_master = self.sorter.undo_imports(master_path, 1)
+        except (ValueError, FileNotFoundError) as e:
+            messagebox.showerror("Undo Error", str(e))
+            return
+        self.status_label.config(text="↩️ Last import reverted", fg="green")
+        self.master_views = self.sorter.curve_views(master_path)
+        self.unmatched_names, self.unmatched_scores = [], {}
+        self.results_grid.load(self.master_views.frame(self.current_curve_policy()))
+        self.load_resolver()
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, f"↩️ Reverted last import into {os.path.basename(master_path)}\n"
+                                      f"   • Total students: {len(df_master)}\n")
+
+    def export_report_cards(self):
+        """One report-card page per student of this period's MASTER, as a single PDF."""
+        if not self.attendance_file:
+            messagebox.showerror("Error", "Please select the attendance list for the period first!")
+            return
+        period = self.sorter.extract_period_from_path(self.attendance_file)
+        master_path = self.sorter.period_master_path(period)
+        if not os.path.exists(master_path):
+            messagebox.showerror("Error", f"{os.path.basename(master_path)} does not exist yet - import a quiz first.")
+            return
+        default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+        filename = filedialog.asksaveasfilename(
+            title="Save Report Cards",
+            initialdir=default_dir if os.path.exists(default_dir) else os.getcwd(),
+            initialfile=f"{period.replace(' ', '_')}_report_cards.pdf",
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        from report_cards import build_report_cards
+        pipeline = self.sorter.pipeline()
+        view = pipeline.curve(pipeline.master(master_path), self.current_curve_policy()).value
+        build_report_cards(view, filename, f"{period} – Quiz Report Card")
+        self.status_label.config(text=f"🎓 {len(view)} report cards saved", fg="green")
+        messagebox.showinfo("Report Cards", f"🎓 {len(view)} report cards saved to:\n{filename}")
+
     def process_data(self):
         if not self.quiz_file:
             messagebox.showerror("Error", "Please select a quiz data file first!")
@@ -373,100 +519,46 @@ class QuizSorterGUI:
             
             # Process the data based on user selections
             if self.attendance_file:
-                # Use new canonical name processing with full roster inclusion
-                canonical_rows, unmatched = self.sorter.process_with_canonical_names_full_roster(
-                    self.quiz_file, self.attendance_file, self.output_label.cget("text")
-                )
-                
-                # ---- START MULTI-COLUMN MERGE REPLACEMENT ----
-                # Convert canonical_rows (list[dict]) to DataFrame
-                df_new = pd.DataFrame(canonical_rows)
-
-                # Normalize Student dupes and ensure a single row per student for this import
-                df_new = df_new.groupby("Student", as_index=False).first()
+                # Match, fold and retake-merge raw scores into the period MASTER (locked, atomic write)
+                result = self.sorter.import_quiz_files(self.quiz_files, self.attendance_file)
+                period = result["period"]
+                unmatched = result["unmatched"]
 
-                # Apply folding to deduplicate headers BEFORE merging into the MASTER
-                use_curve = bool(self.curve_enabled.get()) if hasattr(self, "curve_enabled") else True
-                curve_cap = int(self.curve_cap_var.get()) if hasattr(self, "curve_cap_var") else 9
-                df_new = self.sorter.fold_to_canonical(df_new, use_curve=use_curve, curve_cap=curve_cap)
+                # The curve is a read-time view over the MASTER, memoized per policy
+                self.master_views = self.sorter.curve_views(result["master_path"])
+                self.master_title = f"{period} – Quiz Results (updated)"
+                df_master = self.master_views.frame(self.current_curve_policy())
 
-                # Identify quiz columns present in this import (after folding)
-                quiz_columns = [c for c in df_new.columns if c != "Student" and self.sorter.is_canonical_quiz(c)]
-                if not quiz_columns:
-                    raise ValueError("No quiz columns detected in the quiz CSV. Expected headers like 'Quiz 1 (/10)'.")
+                # The grid is ready before any PDF rendering starts
+                self.unmatched_names = list(unmatched)
+                self.unmatched_scores = result["unmatched_scores"]
+                self.results_grid.load(df_master, unmatched, self.unmatched_scores)
+                self.load_resolver()
+                self.results_tabs.select(self.results_grid)
+                self.root.update_idletasks()
 
-                # Load or create the MASTER for this period
-                period = self.sorter.extract_period_from_path(self.attendance_file)
-                master_path = self.sorter.period_master_path(period)
+                if result["status"] == "already merged":
+                    self.status_label.config(text="✅ Already merged", fg="green")
+                    self.process_button.state(['!disabled'])
+                    self.process_text.set("🚀 Process Quiz Data")
+                    self.results_text.delete(1.0, tk.END)
+                    self.results_text.insert(1.0, f"✅ {', '.join(os.path.basename(q) for q in self.quiz_files)} already merged into "
+                                                  f"{os.path.basename(result['master_path'])} (same file and roster).\n"
+                                                  f"   Nothing to do.\n")
+                    return
 
-                if os.path.exists(master_path):
-                    df_master = pd.read_csv(master_path)
-                else:
-                    # Build master from full attendance (canonical lines) so ALL students exist
-                    # Read attendance lines for canonical names
-                    att_lines = []
-                    with open(self.attendance_file, "r", encoding="utf-8") as f:
-                        first_line = f.readline()
-                        if first_line.strip().lower() in {"student", "period 1 attendance", '"student"'}:
-                            att_lines = [line.strip() for line in f if line.strip()]
-                        else:
-                            att_lines = [first_line.strip()] + [line.strip() for line in f if line.strip()]
-                    
-                    # Convert attendance lines to canonical format
-                    canonical_attendance = []
-                    for line in att_lines:
-                        p = self.sorter.parse_attendance_entry_new(line)
-                        canon = self.sorter._format_canonical_last_middle_first(p)
-                        canonical_attendance.append(canon)
-                    
-                    df_master = pd.DataFrame({"Student": canonical_attendance})
-
-                # Deduplicate students
-                df_master = df_master.drop_duplicates(subset=["Student"]).reset_index(drop=True)
-                
-                # Clean master CSV to keep only canonical quiz columns
-                df_master = self.sorter.fold_to_canonical(df_master, use_curve=False, curve_cap=curve_cap)  # fold legacy weird headers without altering numeric values
-
-                # Ensure every quiz column from this import exists in master (default to X)
-                for qc in quiz_columns:
-                    if qc not in df_master.columns:
-                        df_master[qc] = "X"
-
-                # Retake-merge each quiz column independently
-                for qc in quiz_columns:
-                    merged = df_master.merge(df_new[["Student", qc]], on="Student", how="left", suffixes=("", "_NEW"))
-
-                    def _resolve_row(row):
-                        ex = row[qc]
-                        nv = row.get(f"{qc}_NEW", "X")
-                        # df_new already normalized/curved, but normalize again defensively
-                        nv = self.sorter.normalize_score_cell(nv)
-                        return self.sorter.retake_merge(ex, nv)
-
-                    merged[qc] = merged.apply(_resolve_row, axis=1)
-                    df_master = merged.drop(columns=[c for c in merged.columns if c.endswith("_NEW")])
-
-                # Sort by last name from canonical "Last, Middle, First (Nick) #ID"
-                df_master["__sortkey__"] = df_master["Student"].apply(lambda s: s.split(",", 1)[0].strip().lower())
-                df_master = df_master.sort_values("__sortkey__").drop(columns="__sortkey__").reset_index(drop=True)
-
-                # Save MASTER and user-selected output CSV (same data)
-                df_master.to_csv(master_path, index=False)
-                out_csv = self.output_label.cget("text")
-                df_master.to_csv(out_csv, index=False)
-
-                # Build PDF with a clear title (uses your updated create_pdf_file signature)
-                pdf_title = f"{period} – Quiz Results (updated)"
-                pdf_file = self.create_pdf_file(out_csv, pdf_title=pdf_title)
-                # ---- END MULTI-COLUMN MERGE REPLACEMENT ----
+                # Output CSV + PDF (+ XLSX/JSON) of the curved MASTER, all from the in-memory view
+                pdf_file = self.export_outputs(df_master, pdf_title=self.master_title)
                 
-                # Convert to student format for statistics
-                students = []
-                for _, row in merged.iterrows():
-                    student_info = self.sorter.parse_student_name(row['Student'])
-                    student_info['scores'] = {k: v for k, v in row.items() if k != 'Student'}
-                    student_info['absent'] = any('X' in str(v) for v in student_info['scores'].values())
-                    students.append(student_info)
+                # Statistics come from the MASTER's analytics (vectorized, updated in place per merge)
+                analytics = self.sorter.master_analytics(result["master_path"])
+                summary = analytics.summary()
+                total_count = summary["students"]
+                present_count = summary["complete"]
+                absent_count = summary["with_missing"]
+                quiz_stats = analytics.quiz_stats()
+
+                students = self.sample_students(self.master_views.get(self.current_curve_policy()))
                 
                 # Show unmatched names in results
                 if unmatched:
@@ -474,31 +566,40 @@ class QuizSorterGUI:
                     for name in unmatched:
                         self.results_text.insert(tk.END, f"   • {name}\n")
             else:
-                # Process without attendance (just sort)
-                students = self.sorter.load_quiz_data(self.quiz_file)
-                if self.sort_alphabetically.get():
-                    students.sort(key=lambda x: (x['last'], x['middle'], x['first'], x['nickname']))
-                self.sorter.export_sorted_data(students, self.output_label.cget("text"))
-            
-            # Calculate statistics
-            present_count = sum(1 for s in students if not s.get('absent', False))
-            absent_count = sum(1 for s in students if s.get('absent', False))
+                # Without attendance the same pipeline only folds retakes and (optionally) sorts
+                stages = self.sorter.pipeline().run(self.quiz_files, sort=self.sort_alphabetically.get())
+                table = stages["table"].value
+                pdf_file = self.export_outputs(table)
+                students = self.sample_students(table)
+
+                # Calculate statistics
+                total_count = len(table)
+                present_count = total_count
+                absent_count = 0
+                quiz_stats = None
             
             # Show results
             results = f"✅ Processing Complete!\n\n"
             results += f"📊 Statistics:\n"
-            results += f"   • Total students: {len(students)}\n"
+            results += f"   • Total students: {total_count}\n"
             results += f"   • Present: {present_count}\n"
             results += f"   • Absent: {absent_count}\n"
             results += f"   • Output file: {self.output_label.cget('text')}\n\n"
+
+            if quiz_stats is not None and len(quiz_stats):
+                results += f"📈 Per quiz (raw scores):\n"
+                for q in quiz_stats.to_dict("records"):
+                    results += (f"   • {q['Quiz']}: mean {q['Mean']:g}, median {q['Median']:g}, "
+                                f"{q['Completed']}/{total_count} done ({q['Completion %']:g}%)\n")
+                results += "\n"
             
             results += f"📋 Sample of processed data:\n"
             for i, student in enumerate(students[:5]):
                 status_icon = "❌" if student.get('absent', False) else "✅"
                 results += f"   {i+1}. {status_icon} {student['last']}, {student['first']}\n"
             
-            if len(students) > 5:
-                results += f"   ... and {len(students) - 5} more students\n"
+            if total_count > 5:
+                results += f"   ... and {total_count - 5} more students\n"
             
             self.results_text.delete(1.0, tk.END)
             self.results_text.insert(1.0, results)
@@ -509,9 +610,6 @@ class QuizSorterGUI:
             self.process_text.set("🚀 Process Quiz Data")
             self.root.update_idletasks()
             
-            # Create and open PDF file
-            pdf_file = self.create_pdf_file(self.output_label.cget("text"))
-            
             # Show success message
             if self.attendance_file:
                 period = self.sorter.extract_period_from_path(self.attendance_file)
@@ -522,7 +620,7 @@ class QuizSorterGUI:
                                       f"📁 CSV saved to: {self.output_label.cget('text')}\n"
                                       f"📊 Master CSV: {os.path.basename(master_path)}\n"
                                       f"📄 PDF opened: {os.path.basename(pdf_file)}\n"
-                                      f"👥 Total students: {len(students)}\n"
+                                      f"👥 Total students: {total_count}\n"
                                       f"✅ Present: {present_count}\n"
                                       f"❌ Absent: {absent_count}")
                 else:
@@ -530,7 +628,7 @@ class QuizSorterGUI:
                                       f"Data processed successfully!\n\n"
                                       f"📁 Output saved to: {self.output_label.cget('text')}\n"
                                       f"📊 Master CSV: {os.path.basename(master_path)}\n"
-                                      f"👥 Total students: {len(students)}\n"
+                                      f"👥 Total students: {total_count}\n"
                                       f"✅ Present: {present_count}\n"
                                       f"❌ Absent: {absent_count}")
             else:
@@ -539,14 +637,14 @@ class QuizSorterGUI:
                                       f"Data processed successfully!\n\n"
                                       f"📁 CSV saved to: {self.output_label.cget('text')}\n"
                                       f"📄 PDF opened: {os.path.basename(pdf_file)}\n"
-                                      f"👥 Total students: {len(students)}\n"
+                                      f"👥 Total students: {total_count}\n"
                                       f"✅ Present: {present_count}\n"
                                       f"❌ Absent: {absent_count}")
                 else:
                     messagebox.showinfo("Success", 
                                       f"Data processed successfully!\n\n"
                                       f"📁 Output saved to: {self.output_label.cget('text')}\n"
-                                      f"👥 Total students: {len(students)}\n"
+                                      f"👥 Total students: {total_count}\n"
                                       f"✅ Present: {present_count}\n"
                                       f"❌ Absent: {absent_count}")
             
@@ -0,0 +1,130 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+
+class FolderWatcher:
+    """
+    Polling watcher for the input/ and attendance/ folders.
+
+    Every poll stats the folders and compares each file's (size, mtime) with an
+    in-memory index, so unchanged files are never re-read. A changed file is only
+    picked up once polls have seen the same size/mtime for `debounce` seconds (the
+    exporter may still be writing it); the window is timed by the watcher's own
+    clock, never the file's mtime, so clock skew on a network share can't cut it
+    short. Quiz exports are paired with the attendance list of the same period
+    (extract_period_from_path) and merged incrementally into that period's MASTER;
+    the import ledger makes repeats free. When several exports are ready at once
+    they are read and folded concurrently (AsyncIngest).
+    Plain os.stat polling keeps it dependency-free (no inotify).
+    """
+
+    EXTENSIONS = (".csv", ".xlsx", ".xlsm")
+
+    def __init__(self, sorter: Optional[EnhancedQuizSorter] = None, input_dir: str = "input",
+                 attendance_dir: str = "attendance", interval: float = 5.0, debounce: float = 2.0,
+                 log: Callable[[str], None] = print):
+        self.sorter = sorter or EnhancedQuizSorter()
+        self.input_dir = input_dir
+        self.attendance_dir = attendance_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.log = log
+        # path -> {"sig": (size, mtime_ns), "seen": time the sig was first polled, "done": bool}
+        self._index: Dict[str, Dict] = {}
+        # period -> attendance file path
+        self._attendance: Dict[str, str] = {}
+
+    def _scan(self, folder: str) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        if not os.path.isdir(folder):
+            return found
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(self.EXTENSIONS) and not entry.name.startswith("."):
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def _settled(self, path: str, sig: Tuple[int, int], now: float) -> bool:
+        """Track `path` in the index; True once it is pending and polls saw it unchanged for the debounce window."""
+        state = self._index.get(path)
+        if state is None or state["sig"] != sig:
+            state = self._index[path] = {"sig": sig, "seen": now, "done": False}
+        return not state["done"] and now - state["seen"] >= self.debounce
+
+    def poll_once(self) -> List[Dict]:
+        """One pass over both folders. Returns the import results of this pass."""
+        now = time.time()
+
+        # Attendance first so new rosters are known before pairing
+        for path, sig in sorted(self._scan(self.attendance_dir).items()):
+            if self._settled(path, sig, now):
+                period = self.sorter.extract_period_from_path(path)
+                self._attendance[period] = path
+                self._index[path]["done"] = True
+                self.log(f"📋 Roster for {period}: {os.path.basename(path)}")
+                # A changed roster can match names that were unmatched before
+                for other, state in self._index.items():
+                    if other.startswith(os.path.join(self.input_dir, "")) and \
+                            self.sorter.extract_period_from_path(other) == period:
+                        state["done"] = False
+
+        # Settled exports, grouped per period so each MASTER is read and written once per poll
+        ready: Dict[str, List[str]] = {}
+        for path, sig in sorted(self._scan(self.input_dir).items()):
+            if not self._settled(path, sig, now):
+                continue
+            period = self.sorter.extract_period_from_path(path)
+            if period in self._attendance:
+                ready.setdefault(period, []).append(path)
+            # else: wait until the period's roster shows up
+
+        if sum(len(paths) for paths in ready.values()) > 1:
+            # Read and fold every ready export concurrently first; the imports below then only merge
+            from async_ingest import AsyncIngest
+            try:
+                AsyncIngest(self.sorter.pipeline()).ingest({self._attendance[p]: paths for p, paths in ready.items()})
+            except Exception as e:
+                self.log(f"⚠️ Concurrent read failed ({e}); importing file by file")
+
+        results = []
+        for period, paths in ready.items():
+            batch = [self._import(paths, self._attendance[period])]
+            if batch[0] is None and len(paths) > 1:
+                # One bad export must not hold back the rest of its period: retry the batch file by file
+                batch = [self._import([p], self._attendance[period]) for p in paths]
+            results.extend(r for r in batch if r is not None)
+        return results
+
+    def _import(self, paths: List[str], attendance_file: str) -> Optional[Dict]:
+        """Import `paths` into their MASTER; they stay pending (retried next poll) unless it succeeds."""
+        names = ", ".join(os.path.basename(p) for p in paths)
+        try:
+            result = self.sorter.import_quiz_files(paths, attendance_file)
+        except Exception as e:
+            self.log(f"❌ {names}: {e}")
+            return None
+        self.log(f"✅ {names} -> {os.path.basename(result['master_path'])} "
+                 f"({len(result['merged_files'])} merged, {len(result['skipped_files'])} already merged, "
+                 f"{len(result['unmatched'])} unmatched)")
+        for p in paths:
+            self._index[p]["done"] = True
+        return result
+
+    def run_once(self) -> List[Dict]:
+        """A single pass (e.g. from cron): poll, wait out the debounce window, poll again."""
+        self.poll_once()
+        time.sleep(self.debounce)
+        return self.poll_once()
+
+    def run_forever(self):
+        self.log(f"👀 Watching {self.input_dir}/ and {self.attendance_dir}/ every {self.interval:g}s (Ctrl+C to stop)")
+        try:
+            while True:
+                self.poll_once()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.log("Stopped.")
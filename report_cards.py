@@ -0,0 +1,277 @@
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from score_table import MISSING, ScoreTable
+
+PAGE_W, PAGE_H = letter
+LEFT, RIGHT = 72, PAGE_W - 72
+SCORE_X = RIGHT - 100  # left edge of the Score column
+TABLE_TOP = 655
+ROW_H = 18
+ROWS_PER_PAGE = 30
+HEADER_BLUE = colors.HexColor('#366092')
+
+# Below this many students a process pool costs more than it saves
+PARALLEL_CARDS_MIN = 100
+# Students per chunk PDF of a merged PDF: bounds what one canvas holds in memory
+MERGED_CHUNK = 500
+
+
+def card_pages(quizzes: Sequence[str]) -> List[List[str]]:
+    """Quizzes split into the rows of each page of one student's card (at least one page)."""
+    quizzes = list(quizzes)
+    return [quizzes[i:i + ROWS_PER_PAGE] for i in range(0, len(quizzes), ROWS_PER_PAGE)] or [[]]
+
+
+def card_filename(student: str) -> str:
+    """'Ávila, Hana #1035' -> 'Ávila_Hana_1035.pdf'"""
+    return (re.sub(r"[^\w-]+", "_", student).strip("_") or "student") + ".pdf"
+
+
+def _define_templates(c: pdf_canvas.Canvas, pages: List[List[str]], title: str):
+    """
+    Everything every student's card shares - title, table header, grid and quiz
+    names - drawn once per document as a form XObject per card page. Each
+    student page then only draws its name, summary and scores on top.
+    """
+    for p, quizzes in enumerate(pages):
+        c.beginForm(f"card{p}")
+        c.setFont("Helvetica-Bold", 16)
+        c.drawCentredString(PAGE_W / 2, 740, title)
+        c.setFillColor(HEADER_BLUE)
+        c.rect(LEFT, TABLE_TOP, RIGHT - LEFT, ROW_H, stroke=0, fill=1)
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(LEFT + 6, TABLE_TOP + 5, "Quiz")
+        c.drawCentredString((SCORE_X + RIGHT) / 2, TABLE_TOP + 5, "Score")
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", 10)
+        bottom = TABLE_TOP - ROW_H * len(quizzes)
+        for i, quiz in enumerate(quizzes):
+            c.drawString(LEFT + 6, TABLE_TOP - ROW_H * (i + 1) + 5, str(quiz)[:70])
+        for i in range(len(quizzes) + 1):
+            c.line(LEFT, TABLE_TOP - ROW_H * i, RIGHT, TABLE_TOP - ROW_H * i)
+        c.line(LEFT, TABLE_TOP + ROW_H, RIGHT, TABLE_TOP + ROW_H)
+        for x in (LEFT, SCORE_X, RIGHT):
+            c.line(x, bottom, x, TABLE_TOP + ROW_H)
+        c.endForm()
+
+
+def _draw_card(c: pdf_canvas.Canvas, student: str, scores: np.ndarray, pages: List[List[str]]):
+    """One student's page(s) over the shared templates: name, average / missing line, scores and X marks."""
+    taken = scores[scores != MISSING]
+    average = f"{taken.mean():.2f}" if taken.size else "–"
+    summary = f"Average: {average}    Missing (X): {int((scores == MISSING).sum())} of {scores.size}"
+    start = 0
+    for p, quizzes in enumerate(pages):
+        c.doForm(f"card{p}")
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(LEFT, 705, student)
+        c.setFont("Helvetica", 11)
+        c.drawString(LEFT, 687, summary)
+        for i, v in enumerate(scores[start:start + len(quizzes)].tolist()):
+            c.setFont("Helvetica-Bold" if v == MISSING else "Helvetica", 10)
+            c.drawCentredString((SCORE_X + RIGHT) / 2, TABLE_TOP - ROW_H * (i + 1) + 5,
+                                "X" if v == MISSING else str(v))
+        if len(pages) > 1:
+            c.setFont("Helvetica", 9)
+            c.drawRightString(RIGHT, 40, f"Page {p + 1} of {len(pages)}")
+        start += len(quizzes)
+        c.showPage()
+
+
+def _write_cards(students: Sequence[str], matrix: np.ndarray, quizzes: Sequence[str], paths: Sequence[str],
+                 title: str):
+    """One PDF per student; each canvas is saved (and dropped) before the next one starts."""
+    pages = card_pages(quizzes)
+    for student, scores, path in zip(students, matrix, paths):
+        c = pdf_canvas.Canvas(path, pagesize=letter, initialFontName="Helvetica")
+        c.setTitle(f"{title} – {student}")
+        _define_templates(c, pages, title)
+        _draw_card(c, student, scores, pages)
+        c.save()
+
+
+def _write_merged(students: Sequence[str], matrix: np.ndarray, quizzes: Sequence[str], path: str, title: str):
+    """Every card of these students in one PDF (a whole class, or one chunk of a merged PDF)."""
+    pages = card_pages(quizzes)
+    c = pdf_canvas.Canvas(path, pagesize=letter, initialFontName="Helvetica")
+    c.setTitle(title)
+    _define_templates(c, pages, title)
+    for student, scores in zip(students, matrix):
+        _draw_card(c, student, scores, pages)
+    c.save()
+
+
+def _cards_job(job):
+    """Pool job: rows start..stop-1 of a shared MASTER view -> one PDF per student, or one chunk PDF."""
+    from shared_master import attach
+    descriptor, start, stop, target, title = job
+    shared = attach(descriptor)
+    students, matrix = shared.names[start:stop].tolist(), shared.matrix[start:stop]
+    if isinstance(target, str):
+        _write_merged(students, matrix, shared.quizzes, target, title)
+    else:
+        _write_cards(students, matrix, shared.quizzes, target, title)
+    return target
+
+
+_REF = re.compile(rb"(\d+) 0 R\b")
+
+
+def _pdf_objects(data: bytes):
+    """
+    (catalog, info, {number: object bytes}) of a PDF written by reportlab: one classic
+    xref table, no object streams. Each object runs from its xref offset to the next one.
+    """
+    xref_at = int(data[data.rindex(b"startxref") + 9:].split()[0])
+    trailer_at = data.index(b"trailer", xref_at)
+    lines = data[xref_at:trailer_at].split(b"\n")[1:]
+    offsets, i = {}, 0
+    while i < len(lines):
+        head = lines[i].split()
+        if len(head) != 2:
+            break
+        first, count = int(head[0]), int(head[1])
+        for n, entry in enumerate(lines[i + 1:i + 1 + count]):
+            offset, _, kind = entry.split()[:3]
+            if kind == b"n":
+                offsets[first + n] = int(offset)
+        i += 1 + count
+    bounds = sorted(offsets.values()) + [xref_at]
+    ends = dict(zip(bounds, bounds[1:]))
+    objects = {n: data[at:ends[at]] for n, at in offsets.items()}
+    trailer = data[trailer_at:]
+    root, info = (int(re.search(rb"/%s (\d+) 0 R" % k, trailer).group(1)) for k in (b"Root", b"Info"))
+    return root, info, objects
+
+
+def _page_numbers(objects: Dict[int, bytes], node: int) -> List[int]:
+    """Page objects under a page-tree node, in order."""
+    obj = objects[node]
+    if b"/Type /Pages" not in obj:
+        return [node]
+    kids = obj[obj.index(b"/Kids"):]
+    kids = kids[:kids.index(b"]")]
+    return [n for kid in _REF.findall(kids) for n in _page_numbers(objects, int(kid))]
+
+
+def _concat_pdfs(paths: Iterable[str], out_path: str, title: str) -> int:
+    """
+    Stream chunk PDFs from _write_merged (in order) into one PDF: their objects are
+    renumbered and copied as each chunk arrives, so only one chunk is held in memory.
+    Each chunk file is deleted once copied. Returns the number of pages.
+    """
+    pages_obj, catalog_obj, info_obj = 1, 2, 3
+    offsets, kids, base = [], [], info_obj
+    with open(out_path, "wb") as out:
+        out.write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.unlink(path)
+            root, info, objects = _pdf_objects(data)
+            pages = re.search(rb"/Pages (\d+) 0 R", objects[root]).group(1)
+            page_numbers = _page_numbers(objects, int(pages))
+            # The chunk's catalog, info and page tree are replaced by the merged PDF's own
+            dropped = {root, info} | {n for n, obj in objects.items() if b"/Type /Pages" in obj}
+            renumber, n_new = {}, base
+            for n in sorted(objects):
+                if n not in dropped:
+                    n_new += 1
+                    renumber[n] = n_new
+
+            def ref(m):  # the only references to dropped objects are the pages' /Parent
+                return b"%d 0 R" % renumber.get(int(m.group(1)), pages_obj)
+
+            for n in sorted(renumber):
+                obj = objects[n]
+                body = obj[obj.index(b"obj") + 3:]
+                cut = body.find(b"stream")  # stream data is copied as is; only the dictionary has references
+                cut = len(body) if cut < 0 else cut
+                offsets.append(out.tell())
+                out.write(b"%d 0 obj" % renumber[n] + _REF.sub(ref, body[:cut]) + body[cut:])
+            kids.extend(renumber[n] for n in page_numbers)
+            base = n_new
+        trailer_objects = {
+            pages_obj: b"<< /Type /Pages /Count %d /Kids [ %s ] >>" % (
+                len(kids), b" ".join(b"%d 0 R" % k for k in kids)),
+            catalog_obj: b"<< /Type /Catalog /Pages %d 0 R /PageMode /UseNone >>" % pages_obj,
+            info_obj: b"<< /Title <%s> /Producer (Quiz Sorter report cards) >>" % (
+                ("\ufeff" + title).encode("utf-16-be").hex().upper().encode("ascii")),
+        }
+        own = {}
+        for n, obj in trailer_objects.items():
+            own[n] = out.tell()
+            out.write(b"%d 0 obj\n" % n + obj + b"\nendobj\n")
+        xref_at = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (base + 1))
+        for n in range(1, info_obj + 1):
+            out.write(b"%010d 00000 n \n" % own[n])
+        for offset in offsets:
+            out.write(b"%010d 00000 n \n" % offset)
+        out.write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                  % (base + 1, catalog_obj, info_obj, xref_at))
+    return len(kids)
+
+
+def build_report_cards(table: ScoreTable, out_path: str, title: str = "Quiz Report Card",
+                       merged: bool = True, workers: Optional[int] = None) -> List[str]:
+    """
+    One report card per student of a (curved) MASTER view: quiz scores, X marks,
+    average and missing count. merged=True writes every card into the single PDF
+    `out_path`; otherwise `out_path` is a folder that gets one PDF per student.
+    Large classes are split into chunks of students written by a process pool that
+    reads the scores from shared memory; a merged PDF is assembled from the chunk
+    PDFs as they finish, so neither mode holds more than a chunk per process in
+    memory. Returns the written path(s).
+    """
+    n = len(table.students)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, n // PARALLEL_CARDS_MIN)
+    if merged and workers <= 1 and n <= MERGED_CHUNK:
+        _write_merged(table.students, table.matrix, table.quizzes, out_path, title)
+        return [out_path]
+
+    if merged:
+        chunk = min(MERGED_CHUNK, -(-n // (max(1, workers) * 4)))
+        directory = tempfile.mkdtemp(prefix=".cards_", dir=os.path.dirname(os.path.abspath(out_path)))
+        targets = [os.path.join(directory, f"{i:08d}.pdf") for i in range(0, n, chunk)]
+    else:
+        os.makedirs(out_path, exist_ok=True)
+        paths, seen = [], set()
+        for i, student in enumerate(table.students):
+            name = card_filename(student)
+            if name in seen:  # same name once punctuation is dropped
+                name = f"{name[:-4]}_{i + 1}.pdf"
+            seen.add(name)
+            paths.append(os.path.join(out_path, name))
+        if workers <= 1 or n < 2:
+            _write_cards(table.students, table.matrix, table.quizzes, paths, title)
+            return paths
+        chunk = -(-n // (workers * 4))  # a few chunks per worker evens out the load
+        targets = [paths[i:i + chunk] for i in range(0, n, chunk)]
+
+    from shared_master import SharedMaster
+    try:
+        with SharedMaster(table) as shared, ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            jobs = [(shared.descriptor, i, min(i + chunk, n), target, title)
+                    for i, target in zip(range(0, n, chunk), targets)]
+            done = pool.map(_cards_job, jobs)  # in order, each as soon as it (and those before it) finished
+            if not merged:
+                list(done)
+                return paths
+            _concat_pdfs(done, out_path, title)
+            return [out_path]
+    finally:
+        if merged:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,78 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Tuple
+
+
+class ResolverPanel(ttk.Frame):
+    """
+    Unmatched-name resolver: pick a typed name on the left, then one click on a
+    ranked roster candidate confirms the match. The panel only shows names and
+    candidates; `candidates(name)` ranks and `confirm(name, canonical)` applies.
+    """
+
+    def __init__(self, master, candidates: Callable[[str], List[Tuple[str, int]]],
+                 confirm: Callable[[str, str], bool], **kwargs):
+        super().__init__(master, **kwargs)
+        self.candidates = candidates
+        self.confirm = confirm
+        self.names: List[str] = []
+        self.scores: Dict[str, Dict] = {}
+
+        left = ttk.Frame(self)
+        left.pack(side="left", fill="y", padx=(0, 10))
+        ttk.Label(left, text="Unmatched names").pack(anchor="w")
+        self.listbox = tk.Listbox(left, width=28, exportselection=False)
+        self.listbox.pack(fill="y", expand=True)
+        self.listbox.bind("<<ListboxSelect>>", lambda _: self._show_candidates())
+
+        self.right = ttk.Frame(self)
+        self.right.pack(side="left", fill="both", expand=True)
+        self.heading = ttk.Label(self.right, text="No unmatched names 🎉", font=("Arial", 10, "bold"))
+        self.heading.pack(anchor="w")
+        self.scores_label = ttk.Label(self.right, text="")
+        self.scores_label.pack(anchor="w", pady=(2, 8))
+        self.buttons = ttk.Frame(self.right)
+        self.buttons.pack(fill="x")
+
+    def load(self, names: List[str], scores: Dict[str, Dict]):
+        self.names = list(names)
+        self.scores = scores
+        self.listbox.delete(0, tk.END)
+        for name in self.names:
+            self.listbox.insert(tk.END, name)
+        self.select(self.names[0] if self.names else None)
+
+    def select(self, name):
+        self.listbox.selection_clear(0, tk.END)
+        if name in self.names:
+            i = self.names.index(name)
+            self.listbox.selection_set(i)
+            self.listbox.see(i)
+        self._show_candidates()
+
+    def _selected(self):
+        sel = self.listbox.curselection()
+        return self.names[sel[0]] if sel else None
+
+    def _show_candidates(self):
+        for child in self.buttons.winfo_children():
+            child.destroy()
+        name = self._selected()
+        if name is None:
+            self.heading.config(text="No unmatched names 🎉" if not self.names else "Select a name")
+            self.scores_label.config(text="")
+            return
+        self.heading.config(text=f"Who is “{name}”?")
+        scores = self.scores.get(name, {})
+        self.scores_label.config(text=", ".join(f"{q}: {v}" for q, v in scores.items()) or "No scores in this import")
+        for canonical, score in self.candidates(name):
+            ttk.Button(self.buttons, text=f"{score:>3}%   {canonical}",
+                       command=lambda c=canonical: self._confirm(name, c)).pack(fill="x", pady=2)
+
+    def _confirm(self, name: str, canonical: str):
+        if not self.confirm(name, canonical):
+            return
+        i = self.names.index(name)
+        self.names.pop(i)
+        self.listbox.delete(i)
+        self.select(self.names[min(i, len(self.names) - 1)] if self.names else None)
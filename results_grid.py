@@ -0,0 +1,191 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ResultsGrid(ttk.Frame):
+    """
+    Virtualized Treeview over a whole MASTER.
+
+    The Treeview only ever holds one screenful of items; scrolling moves a window
+    over the row order and re-fills those items, and cell text is formatted when a
+    row comes into view. Sorting and filtering work on an in-memory float matrix
+    (NaN = X) with numpy, so thousands of rows stay responsive. Treeview cannot
+    color single cells, so rows with X cells and unmatched names are tinted and
+    the X cells themselves are marked "✗".
+    """
+
+    FILTERS = ("All students", "Has missing", "Unmatched")
+
+    def __init__(self, master, on_activate: Optional[Callable[[str, bool], None]] = None,
+                 sort_key: Optional[Callable[[str], tuple]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_activate = on_activate  # double-click: (name, is_unmatched)
+        # "Student" column order, e.g. EnhancedQuizSorter.sort_key_by_last so it matches the sorted MASTER
+        self.sort_key = sort_key or (lambda name: (name.split(",", 1)[0].strip().lower(),))
+        self.names: List[str] = []
+        self.quizzes: List[str] = []
+        self.matrix = np.empty((0, 0))
+        self.unmatched = np.zeros(0, dtype=bool)
+        self.missing = np.zeros(0, dtype=bool)
+        self.order = np.arange(0)
+        self.view = np.arange(0)
+        self.offset = 0
+        self.page = 20
+        self._sort = (None, False)  # (column, descending)
+        self._items: List[str] = []
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", pady=(0, 6))
+        ttk.Label(bar, text="Show:").pack(side="left")
+        self.filter_var = tk.StringVar(value=self.FILTERS[0])
+        box = ttk.Combobox(bar, textvariable=self.filter_var, values=self.FILTERS, state="readonly", width=14)
+        box.pack(side="left", padx=6)
+        box.bind("<<ComboboxSelected>>", lambda _: self.refresh())
+        self.count_label = ttk.Label(bar, text="")
+        self.count_label.pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(body, show="headings", selectmode="browse", height=self.page)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.xscroll = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.xscroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.xscroll.pack(fill="x")
+
+        self.tree.tag_configure("missing", background="#FDECEA")
+        self.tree.tag_configure("unmatched", background="#FFF4CC")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1) or "break")
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.page) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.page) or "break")
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+    # ---- data ----
+    def load(self, df: pd.DataFrame, unmatched: Sequence[str] = (), unmatched_scores: Optional[Dict] = None):
+        """
+        Show a MASTER (Student + quiz columns) plus the names the import could not match;
+        unmatched_scores (typed name -> {quiz: score}) fills in their rows.
+        """
+        quizzes = [c for c in df.columns if c != "Student"]
+        scores = df[quizzes].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float) if quizzes \
+            else np.empty((len(df), 0))
+        extra = np.full((len(unmatched), len(quizzes)), np.nan)
+        for i, name in enumerate(unmatched):
+            for q, v in (unmatched_scores or {}).get(name, {}).items():
+                if q in quizzes:
+                    extra[i, quizzes.index(q)] = float(v)
+
+        columns_changed = list(self.tree["columns"]) != ["Student"] + quizzes
+        self.names = df["Student"].astype(str).tolist() + list(unmatched)
+        self.quizzes = quizzes
+        self.matrix = np.vstack([scores, extra])
+        self.unmatched = np.r_[np.zeros(len(df), dtype=bool), np.ones(len(unmatched), dtype=bool)]
+        self.missing = np.isnan(self.matrix).any(axis=1) & ~self.unmatched
+        self._name_order = np.array(sorted(range(len(self.names)), key=lambda i: self.sort_key(self.names[i])),
+                                    dtype=int)
+        if columns_changed:
+            self._build_columns()
+        self._apply_sort()
+        self.refresh()
+
+    def _build_columns(self):
+        columns = ["Student"] + self.quizzes
+        self.tree.configure(columns=columns)
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=260 if col == "Student" else 90, anchor="w" if col == "Student" else "center",
+                             stretch=col == "Student")
+        if self._sort[0] not in columns:
+            self._sort = (None, False)
+
+    def sort_by(self, column: str):
+        """Click a heading: sort ascending, click again: descending. X cells always sort last."""
+        col, desc = self._sort
+        self._sort = (column, not desc if col == column else False)
+        self._apply_sort()
+        self.refresh()
+
+    def _apply_sort(self):
+        column, desc = self._sort
+        if column is None:
+            self.order = np.arange(len(self.names))
+        elif column == "Student":
+            self.order = self._name_order
+            if desc:
+                self.order = self.order[::-1]
+        else:
+            values = self.matrix[:, self.quizzes.index(column)]
+            self.order = np.argsort(-values if desc else values, kind="stable")  # NaN sorts last
+        for col in ["Student"] + self.quizzes:
+            arrow = (" ▼" if desc else " ▲") if col == column else ""
+            self.tree.heading(col, text=col + arrow)
+
+    def refresh(self):
+        """Re-apply the filter to the current order and redraw from the top."""
+        choice = self.filter_var.get()
+        if choice == "Has missing":
+            self.view = self.order[self.missing[self.order]]
+        elif choice == "Unmatched":
+            self.view = self.order[self.unmatched[self.order]]
+        else:
+            self.view = self.order
+        self.count_label.configure(text=f"Showing {len(self.view)} of {len(self.names)}")
+        self.offset = 0
+        self._render()
+
+    # ---- virtual scrolling ----
+    def _row_values(self, i: int):
+        if self.unmatched[i]:
+            return [f"⚠️ {self.names[i]}"] + ["" if np.isnan(v) else f"{v:g}" for v in self.matrix[i]]
+        return [self.names[i]] + ["✗ X" if np.isnan(v) else f"{v:g}" for v in self.matrix[i]]
+
+    def _render(self):
+        rows = self.view[self.offset:self.offset + self.page]
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", "end"))
+        for iid, i in zip(self._items, rows):
+            tags = ("unmatched",) if self.unmatched[i] else ("missing",) if self.missing[i] else ()
+            self.tree.item(iid, values=self._row_values(i), tags=tags)
+        for idx, iid in enumerate(self._items):
+            if idx < len(rows):
+                self.tree.move(iid, "", idx)  # re-attach items detached by a shorter page
+            else:
+                self.tree.detach(iid)
+        total = max(len(self.view), 1)
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page) / total))
+
+    def scroll_by(self, rows: int):
+        last = max(0, len(self.view) - self.page)
+        offset = min(max(0, self.offset + rows), last)
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_by(int(float(amount) * len(self.view)) - self.offset)
+        elif action == "scroll":
+            self.scroll_by(int(amount) * (self.page if unit == "pages" else 1))
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        page = max(1, (event.height - 25) // row_height)  # minus the heading row
+        if page != self.page:
+            self.page = page
+            self.offset = min(self.offset, max(0, len(self.view) - self.page))
+            self._render()
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid or self.on_activate is None or iid not in self._items:
+            return
+        i = self.view[self.offset + self._items.index(iid)]
+        self.on_activate(self.names[i], bool(self.unmatched[i]))
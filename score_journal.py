@@ -0,0 +1,145 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Dict, Tuple, Optional
+
+from score_table import ScoreTable, encode_score
+
+
+class ScoreJournal:
+    """
+    Append-only history for one period MASTER.
+
+    Every import is stored as a compact delta in '<master>.journal.jsonl':
+      {"seq": 7, "kind": "import", "source": "quiz3.csv",
+       "students": [[id, canonical], ...],            # rows the import added
+       "changes": [[id, quiz, old, new], ...]}        # cells that changed
+    Every `snapshot_every` entries the current MASTER is written to
+    '<master>.snap-<seq>.csv'. Only `keep_snapshots` snapshots are kept and
+    journal entries older than the oldest kept snapshot are compacted away, so
+    undo and point-in-time rebuilds never need a full copy per run.
+    """
+
+    def __init__(self, master_path: str, snapshot_every: int = 20, keep_snapshots: int = 3):
+        self.master_path = master_path
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots
+        base = os.path.splitext(master_path)[0]
+        self.journal_path = f"{base}.journal.jsonl"
+        self._snap_prefix = f"{os.path.basename(base)}.snap-"
+        self._dir = os.path.dirname(os.path.abspath(master_path))
+
+    # ---- reading ----
+    def entries(self) -> List[Dict]:
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def snapshots(self) -> List[Tuple[int, str]]:
+        """(seq, path) for every snapshot, oldest first."""
+        rx = re.compile(re.escape(self._snap_prefix) + r"(\d+)\.csv$")
+        found = []
+        for name in os.listdir(self._dir):
+            m = rx.match(name)
+            if m:
+                found.append((int(m.group(1)), os.path.join(self._dir, name)))
+        return sorted(found)
+
+    def has_history(self) -> bool:
+        return os.path.exists(self.journal_path) or bool(self.snapshots())
+
+    def last_seq(self) -> int:
+        entries = self.entries()
+        if entries:
+            return entries[-1]["seq"]
+        snaps = self.snapshots()
+        return snaps[-1][0] if snaps else 0
+
+    def undoable(self, n: int) -> List[Dict]:
+        """The newest `n` import entries that have not been undone yet (newest first)."""
+        entries = self.entries()
+        undone = {seq for e in entries for seq in e.get("undoes", [])}
+        imports = [e for e in reversed(entries) if e["kind"] == "import" and e["seq"] not in undone]
+        return imports[:n]
+
+    # ---- writing ----
+    def append(self, kind: str, students: List, changes: List, source: Optional[str] = None,
+               undoes: Optional[List[int]] = None) -> Dict:
+        entry = {
+            "seq": self.last_seq() + 1,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "kind": kind,
+            "source": source,
+            "students": [list(s) for s in students],
+            "changes": [list(c) for c in changes],
+        }
+        if undoes:
+            entry["undoes"] = undoes
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return entry
+
+    def needs_snapshot(self, seq: int) -> bool:
+        snaps = self.snapshots()
+        last_snap = snaps[-1][0] if snaps else 0
+        return seq - last_snap >= self.snapshot_every
+
+    def write_snapshot(self, seq: int, table: ScoreTable, writer):
+        """`writer(table, path)` is the sorter's atomic CSV writer."""
+        writer(table, os.path.join(self._dir, f"{self._snap_prefix}{seq:06d}.csv"))
+        self.compact()
+
+    def compact(self):
+        """Drop snapshots beyond `keep_snapshots` and journal entries the oldest kept snapshot already covers."""
+        snaps = self.snapshots()
+        if len(snaps) <= self.keep_snapshots:
+            return
+        for _, path in snaps[:-self.keep_snapshots]:
+            os.unlink(path)
+        floor = snaps[-self.keep_snapshots][0]
+        kept = [e for e in self.entries() if e["seq"] > floor]
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for e in kept:
+                f.write(json.dumps(e) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    # ---- rebuilding ----
+    def base_for(self, seq: int) -> Tuple[int, Optional[str]]:
+        """Newest snapshot at or before `seq` -> (snapshot seq, path). (0, None) means an empty MASTER."""
+        snaps = self.snapshots()
+        usable = [s for s in snaps if s[0] <= seq]
+        if usable:
+            return usable[-1]
+        entries = self.entries()
+        floor = entries[0]["seq"] - 1 if entries else (snaps[0][0] if snaps else 0)
+        if seq < floor or snaps:
+            raise ValueError(f"Cannot rebuild entry {seq}: older history has been compacted away")
+        return 0, None
+
+
+def apply_changes(table: ScoreTable, students: List, changes: List, student_key) -> Tuple[ScoreTable, List]:
+    """
+    Apply journal cells [id, quiz, old, new] to a MASTER table, setting `new`.
+    Rows in `students` ([id, canonical]) are added first when missing.
+    Returns (table, list of cells that were actually applied).
+    """
+    keys = {student_key(s): i for i, s in enumerate(table.students)}
+    missing = [canon for sid, canon in students if sid not in keys]
+    table = table.with_students(missing).with_quizzes([c[1] for c in changes])
+    if missing:
+        keys = {student_key(s): i for i, s in enumerate(table.students)}
+    cols = {q: j for j, q in enumerate(table.quizzes)}
+    applied = []
+    for sid, quiz, old, new in changes:
+        if sid not in keys:
+            continue
+        table.matrix[keys[sid], cols[quiz]] = encode_score(new)
+        applied.append([sid, quiz, old, new])
+    return table, applied
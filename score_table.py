@@ -0,0 +1,213 @@
+import csv
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MISSING = -1  # an X cell
+DTYPE = np.dtype("<i2")
+
+
+def encode_score(v) -> int:
+    """MASTER cell -> int 0..100, MISSING for X / blank / NaN (normalize_score_cell as a number)."""
+    if isinstance(v, (int, np.integer)) and not isinstance(v, bool):
+        return max(0, min(100, int(v)))
+    s = str(v).strip()
+    if s == "" or s.lower() in {"nan", "none"}:
+        return MISSING
+    try:
+        return max(0, min(100, int(float(s))))
+    except (ValueError, OverflowError):  # 'X' and anything else unreadable
+        return MISSING
+
+
+def decode_score(v):
+    """int16 cell -> int score or 'X' (plain Python values, safe for JSON)."""
+    return "X" if v == MISSING else int(v)
+
+
+class ScoreTable:
+    """
+    Compact MASTER table: student names, quiz names and a students x quizzes int16
+    score matrix where MISSING (-1) is an X. Because X sorts below every score,
+    retake_merge of two cells is just their maximum, so merges are np.maximum over
+    whole columns. Only NumPy is needed; to_frame()/from_frame() are the pandas
+    interop for the GUI, PDFs and analytics tables.
+    """
+
+    def __init__(self, students: Sequence[str], quizzes: Sequence[str], matrix: Optional[np.ndarray] = None):
+        self.students: List[str] = list(students)
+        self.quizzes: List[str] = list(quizzes)
+        if matrix is None:
+            matrix = np.full((len(self.students), len(self.quizzes)), MISSING, dtype=DTYPE)
+        self.matrix = np.asarray(matrix, dtype=DTYPE).reshape(len(self.students), len(self.quizzes))
+        self._rows: Optional[Dict[str, int]] = None
+
+    # ---- construction ----
+    @classmethod
+    def from_vectors(cls, students: Sequence[str], quizzes: Sequence[str], vectors) -> "ScoreTable":
+        """Rows of raw cells (ints, 'X', strings) in quiz order, e.g. RetakeAccumulator vectors."""
+        matrix = np.array([[encode_score(v) for v in vec] for vec in vectors], dtype=DTYPE)
+        return cls(students, quizzes, matrix if len(students) else None)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict], quizzes: Sequence[str]) -> "ScoreTable":
+        """[{'Student': ..., quiz: cell}] -> table (missing cells are X)."""
+        return cls.from_vectors([r["Student"] for r in records], quizzes,
+                                ([r.get(q, "X") for q in quizzes] for r in records))
+
+    @classmethod
+    def from_frame(cls, df) -> "ScoreTable":
+        quizzes = [c for c in df.columns if c != "Student"]
+        return cls.from_vectors([str(s) for s in df["Student"].tolist()], quizzes,
+                                zip(*(df[q].tolist() for q in quizzes)) if quizzes else ([] for _ in range(len(df))))
+
+    def copy(self) -> "ScoreTable":
+        return ScoreTable(self.students, self.quizzes, self.matrix.copy())
+
+    # ---- access ----
+    @property
+    def columns(self) -> List[str]:
+        return ["Student"] + self.quizzes
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def row_index(self) -> Dict[str, int]:
+        """student -> row (first occurrence)"""
+        if self._rows is None:
+            rows = {}
+            for i, s in enumerate(self.students):
+                rows.setdefault(s, i)
+            self._rows = rows
+        return self._rows
+
+    def column(self, quiz: str) -> np.ndarray:
+        return self.matrix[:, self.quizzes.index(quiz)]
+
+    def rows(self) -> Iterator[list]:
+        """[student, score or 'X', ...] per student, in table order."""
+        for student, vec in zip(self.students, self.matrix.tolist()):
+            yield [student] + ["X" if v == MISSING else v for v in vec]
+
+    def records(self) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.rows()]
+
+    # ---- reshaping (each returns a new table) ----
+    def select(self, quizzes: Sequence[str]) -> "ScoreTable":
+        return ScoreTable(self.students, quizzes, self.matrix[:, [self.quizzes.index(q) for q in quizzes]])
+
+    def with_quizzes(self, quizzes: Sequence[str]) -> "ScoreTable":
+        """Same table plus an X column for every quiz in `quizzes` it does not have yet."""
+        new = [q for q in dict.fromkeys(quizzes) if q not in self.quizzes]
+        if not new:
+            return self.copy()
+        extra = np.full((len(self.students), len(new)), MISSING, dtype=DTYPE)
+        return ScoreTable(self.students, self.quizzes + new, np.hstack([self.matrix, extra]))
+
+    def with_students(self, students: Sequence[str]) -> "ScoreTable":
+        """Same table plus an all-X row per student (appended)."""
+        extra = np.full((len(students), len(self.quizzes)), MISSING, dtype=DTYPE)
+        return ScoreTable(self.students + list(students), self.quizzes, np.vstack([self.matrix, extra]))
+
+    def take(self, order: Sequence[int]) -> "ScoreTable":
+        order = list(order)
+        return ScoreTable([self.students[i] for i in order], self.quizzes, self.matrix[order])
+
+    # ---- score operations ----
+    def retake_merge(self, other: "ScoreTable", quizzes: Optional[Sequence[str]] = None,
+                     key: Optional[Callable[[str], str]] = None) -> List[str]:
+        """
+        In place: fold `other`'s scores in (max per cell; X never overwrites). Rows are
+        matched by exact name, or by `key(name)` (e.g. the student ID) when given.
+        Returns the students of `other` that have no row here (their scores are not merged).
+        """
+        if key is None:
+            rows = self.row_index()
+        else:
+            rows = {}
+            for i, s in enumerate(self.students):
+                rows.setdefault(key(s), i)
+        pairs, missing = [], []
+        for i, s in enumerate(other.students):
+            row = rows.get(s if key is None else key(s))
+            if row is None:
+                missing.append(s)
+            else:
+                pairs.append((row, i))
+        if not pairs:
+            return missing
+        mine, theirs = (np.array(p) for p in zip(*pairs))
+        for q in (other.quizzes if quizzes is None else quizzes):
+            j, k = self.quizzes.index(q), other.quizzes.index(q)
+            np.maximum.at(self.matrix[:, j], mine, other.matrix[theirs, k])
+        return missing
+
+    def curved(self, policy: Optional[Tuple]) -> "ScoreTable":
+        """Read-time curve: ('cap', N) -> min(score, N); ('linear', f, top) -> round(score * f) in 0..top."""
+        if policy is None:
+            return self.copy()
+        present = self.matrix != MISSING
+        if policy[0] == "cap":
+            curved = np.minimum(self.matrix, policy[1])
+        else:
+            _, factor, top = policy
+            curved = np.clip(np.round(self.matrix * factor), 0, top)
+        return ScoreTable(self.students, self.quizzes, np.where(present, curved, MISSING))
+
+    def diff(self, before: "ScoreTable") -> Tuple[List[str], List[Tuple[str, str, object, object]]]:
+        """
+        (students only in self, [(student, quiz, old, new)]) for every cell that differs
+        from `before` (cells `before` lacks count as X). Values are ints or 'X'.
+        """
+        old_rows = before.row_index()
+        new_students = [s for s in self.students if s not in old_rows]
+        idx = np.array([old_rows.get(s, -1) for s in self.students], dtype=np.intp)
+        known = idx >= 0
+        changes = []
+        for j, q in enumerate(self.quizzes):
+            old = np.full(len(self.students), MISSING, dtype=DTYPE)
+            if q in before.quizzes:
+                old[known] = before.matrix[idx[known], before.quizzes.index(q)]
+            for i in np.flatnonzero(old != self.matrix[:, j]):
+                changes.append((self.students[i], q, decode_score(old[i]), decode_score(self.matrix[i, j])))
+        return new_students, changes
+
+    # ---- interop / IO ----
+    def write_csv(self, f):
+        """Write as a MASTER CSV to an open text file (newline='')."""
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(self.columns)
+        w.writerows(self.rows())
+
+    def to_frame(self):
+        """pandas DataFrame with object columns holding ints and 'X' (the MASTER frame layout)."""
+        import pandas as pd
+        df = pd.DataFrame({"Student": pd.Series(self.students, dtype=object)})
+        for j, q in enumerate(self.quizzes):
+            df[q] = pd.Series([decode_score(v) for v in self.matrix[:, j]], dtype=object)
+        return df
+
+
+class RetakeAccumulator:
+    """
+    Streaming retake merge for one import.
+    Each student owns a fixed-size score vector (one slot per canonical quiz);
+    every incoming cell is normalized and folded in with retake_merge, so
+    duplicate attempts keep the best score without a groupby pass afterwards.
+    """
+    def __init__(self, sorter, slots: List[str]):
+        self.sorter = sorter
+        self.slots = slots
+        self.vectors: Dict[str, list] = {}
+
+    def ensure(self, student: str) -> list:
+        vec = self.vectors.get(student)
+        if vec is None:
+            vec = self.vectors[student] = ["X"] * len(self.slots)
+        return vec
+
+    def add(self, student: str, cells):
+        """cells: iterable of (slot index, raw cell value)"""
+        vec = self.ensure(student)
+        for slot, raw in cells:
+            vec[slot] = self.sorter.retake_merge(vec[slot], self.sorter.normalize_score_cell(raw))
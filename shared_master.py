@@ -0,0 +1,103 @@
+from multiprocessing import shared_memory, util
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from score_table import DTYPE, ScoreTable
+
+
+class SharedDescriptor(NamedTuple):
+    """What a worker needs to attach a SharedMaster: block names, shapes and the quiz axis (a few hundred bytes)."""
+    matrix: str
+    shape: Tuple[int, int]
+    names: str
+    name_dtype: str
+    quizzes: Tuple[str, ...]
+
+
+class SharedMaster:
+    """
+    A MASTER's score matrix and student names copied once into
+    multiprocessing.shared_memory blocks. Pool jobs receive only the small
+    `descriptor`; attach() in the worker maps the same pages as zero-copy
+    NumPy views, so fanning a large MASTER out across processes does not
+    pickle (and multiply) the table per worker.
+
+    The matrix is stored column-major like the columnar MASTER, so a shard of
+    quizzes is one contiguous slice. Use as a context manager: the owner
+    unlinks the blocks on exit.
+    """
+
+    def __init__(self, table: ScoreTable):
+        names = np.array(table.students, dtype=f"<U{max([1] + [len(s) for s in table.students])}")
+        self._blocks = []
+        matrix = self._share(table.matrix, "F")
+        name_block = self._share(names, "C")
+        self.descriptor = SharedDescriptor(matrix.name, tuple(table.matrix.shape), name_block.name,
+                                           names.dtype.str, tuple(table.quizzes))
+
+    def _share(self, array: np.ndarray, order: str) -> shared_memory.SharedMemory:
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self._blocks.append(block)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf, order=order)[...] = array
+        return block
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedMaster":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AttachedMaster:
+    """Worker-side views of a SharedMaster (read-only; the owner's copy is the truth)."""
+
+    def __init__(self, descriptor: SharedDescriptor):
+        self.quizzes = list(descriptor.quizzes)
+        n_students, _ = descriptor.shape
+        self._blocks = [shared_memory.SharedMemory(name=descriptor.matrix),
+                        shared_memory.SharedMemory(name=descriptor.names)]
+        self.matrix = np.ndarray(descriptor.shape, DTYPE, buffer=self._blocks[0].buf, order="F")
+        self.names = np.ndarray((n_students,), np.dtype(descriptor.name_dtype), buffer=self._blocks[1].buf)
+        self.matrix.flags.writeable = self.names.flags.writeable = False
+
+    def columns(self, start: int, stop: int) -> np.ndarray:
+        """Quizzes start..stop-1 as a contiguous students x quizzes view."""
+        return self.matrix[:, start:stop]
+
+    def close(self):
+        """Drop the views and close this process's handles (the owner unlinks the blocks)."""
+        self.matrix = self.names = None
+        for block in self._blocks:
+            block.close()
+        self._blocks = []
+
+
+_ATTACHED: Dict[str, AttachedMaster] = {}
+_FINALIZER = None
+
+
+def attach(descriptor: SharedDescriptor) -> AttachedMaster:
+    """Views of a shared MASTER; a worker attaches each one once and reuses it for later jobs."""
+    global _FINALIZER
+    attached = _ATTACHED.get(descriptor.matrix)
+    if attached is None:
+        attached = _ATTACHED[descriptor.matrix] = AttachedMaster(descriptor)
+        if _FINALIZER is None:
+            # Pool workers leave through multiprocessing's exit hooks, which skip atexit
+            _FINALIZER = util.Finalize(None, detach_all, exitpriority=0)
+    return attached
+
+
+def detach_all():
+    """Close every view this process attached (run when a pool worker exits)."""
+    global _FINALIZER
+    while _ATTACHED:
+        _ATTACHED.popitem()[1].close()
+    _FINALIZER = None
@@ -0,0 +1,122 @@
+import csv
+import io
+import os
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+XLSX_EXTENSIONS = (".xlsx", ".xlsm")
+
+# Wayground/LMS workbooks put a title block above the real header row
+HEADER_SCAN_ROWS = 20
+
+Sheet = Optional[Union[str, int]]
+
+
+def is_xlsx(path: str) -> bool:
+    return path.lower().endswith(XLSX_EXTENSIONS)
+
+
+def _open_workbook(path: str, data: Optional[bytes] = None):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError(f"Reading {os.path.basename(path)} needs openpyxl (pip install openpyxl)") from None
+    # read_only streams rows from the zip instead of building the whole sheet in memory
+    return load_workbook(path if data is None else io.BytesIO(data), read_only=True, data_only=True)
+
+
+def _cell(v) -> str:
+    """Spreadsheet value -> the text the same cell would have in a CSV export."""
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def sheet_names(path: str) -> List[str]:
+    wb = _open_workbook(path)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _worksheet(wb, path: str, sheet: Sheet):
+    if sheet is None:
+        return None
+    if isinstance(sheet, int) or str(sheet).isdigit():
+        i = int(sheet)
+        if not 0 <= i < len(wb.sheetnames):
+            raise ValueError(f"{os.path.basename(path)} has no sheet #{i} (sheets: {', '.join(wb.sheetnames)})")
+        return wb[wb.sheetnames[i]]
+    if sheet not in wb.sheetnames:
+        raise ValueError(f"{os.path.basename(path)} has no sheet '{sheet}' (sheets: {', '.join(wb.sheetnames)})")
+    return wb[sheet]
+
+
+def _default_worksheet(wb, key: Optional[str]):
+    """The first sheet whose top rows contain a `key` header cell, else the first sheet."""
+    if key is not None:
+        for candidate in wb.worksheets:
+            top = candidate.iter_rows(max_row=HEADER_SCAN_ROWS, values_only=True)
+            if any(_cell(v).strip() == key for row in top for v in row):
+                return candidate
+    return wb.worksheets[0]
+
+
+def resolve_sheet(path: str, sheet: Sheet = None, key: Optional[str] = None) -> Optional[str]:
+    """
+    Name of the worksheet iter_rows(path, sheet, key) reads, or None when that is the
+    sheet it would pick without one (always for CSV files): naming the default sheet,
+    by name or index, reads the same rows as naming none.
+    """
+    if sheet is None or not is_xlsx(path):
+        return None
+    wb = _open_workbook(path)
+    try:
+        ws = _worksheet(wb, path, sheet)
+        return None if ws.title == _default_worksheet(wb, key).title else ws.title
+    finally:
+        wb.close()
+
+
+def iter_rows(path: str, sheet: Sheet = None, key: Optional[str] = None,
+              data: Optional[bytes] = None) -> Iterator[List[str]]:
+    """
+    Rows of a CSV or XLSX file as lists of strings, one at a time. For workbooks,
+    `sheet` picks a worksheet by name or 0-based index; without one, the first
+    sheet whose top rows contain a `key` header cell is used (else the first sheet).
+    `data` is the file's content when it was already read (path then only names it).
+    """
+    if not is_xlsx(path):
+        if data is not None:
+            yield from csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+            return
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.reader(f)
+        return
+    wb = _open_workbook(path, data)
+    try:
+        ws = _worksheet(wb, path, sheet) or _default_worksheet(wb, key)
+        for row in ws.iter_rows(values_only=True):
+            yield [_cell(v) for v in row]
+    finally:
+        wb.close()
+
+
+def read_records(path: str, sheet: Sheet = None, key: str = "Student",
+                 data: Optional[bytes] = None) -> Tuple[List[str], Iterator[Dict[str, str]]]:
+    """
+    (header, row dicts) for a quiz export. The header is the first row (within
+    HEADER_SCAN_ROWS) holding a `key` cell; rows are streamed lazily, so callers
+    fold them as they arrive. Short rows read like csv.DictReader's (None cells).
+    """
+    rows = iter_rows(path, sheet, key, data)
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        header = [c.strip() for c in row]
+        if key in header:
+            break
+    else:
+        rows.close()
+        raise ValueError(f"Quiz file must have a '{key}' column.")
+    return header, (dict(zip(header, row + [None] * (len(header) - len(row)))) for row in rows if any(row))
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROSTER = ["Adams, Amy #1001", "Baker, Ben #1002", "Cruz, Carla #1003", "Smith, John #1004"]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Empty working folder (MASTERs are written to the cwd) with a 'Period 1.csv' roster."""
+    monkeypatch.chdir(tmp_path)
+    with open("Period 1.csv", "w", encoding="utf-8") as f:
+        f.write("Student\n" + "".join(f'"{name}"\n' for name in ROSTER))
+    return tmp_path
+
+
+@pytest.fixture
+def write_quiz(workdir):
+    """write_quiz(name, {typed name: score}) -> path of a one-quiz export 'name.csv' with column 'name (/10)'."""
+    def write(name, scores):
+        path = os.path.join(str(workdir), f"{name}.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Student,{name} (/10)\n" + "".join(f"{typed},{v}\n" for typed, v in scores.items()))
+        return path
+    return write
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+import async_ingest
+from async_ingest import AsyncIngest
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+
+def _exports(write_quiz):
+    return [write_quiz("Quiz 1", {"Amy Adams": 7, "John Smith": 9, "Nobody Here": 5}),
+            write_quiz("Quiz 2", {"Ben Baker": 4, "Amy Adams": "X"}),
+            write_quiz("Quiz 1 retake", {"Amy Adams": 10, "Carla Cruz": 6})]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_then_import_equals_sequential_imports(workdir, write_quiz, workers):
+    files = _exports(write_quiz)
+    sequential = EnhancedQuizSorter()
+    expected = sequential.import_quiz_files(files, "Period 1.csv")["master"].records()
+    os.remove(sequential.period_master_path("Period 1"))
+
+    sorter = EnhancedQuizSorter()
+    built = AsyncIngest(sorter.pipeline(), readers=2, queue_size=1, workers=workers).ingest({"Period 1.csv": files})
+    assert built["Period 1.csv"].value["delta"].records() == \
+        EnhancedQuizSorter().pipeline().build(files, "Period 1.csv", workers=1).value["delta"].records()
+    folds = sorter.pipeline().runs["fold"]
+    assert sorter.import_quiz_files(files, "Period 1.csv")["master"].records() == expected
+    assert sorter.pipeline().runs["fold"] == folds  # the import only combined the ingested folds
+
+    # Everything is in the ledger now: nothing left to build
+    assert AsyncIngest(sorter.pipeline(), workers=workers).ingest({"Period 1.csv": files}) == {}
+
+
+def test_export_that_keeps_changing_is_an_error(workdir, write_quiz, monkeypatch):
+    quiz = write_quiz("Quiz 1", {"Amy Adams": 7})
+    sorter = EnhancedQuizSorter()
+    versions = iter(range(1000))
+    monkeypatch.setattr(sorter, "master_version", lambda path: next(versions))
+    with pytest.raises(ValueError, match="kept changing"):
+        AsyncIngest(sorter.pipeline(), workers=1)._read_file(quiz)
+    assert next(versions) == 2 * async_ingest.READ_RETRIES
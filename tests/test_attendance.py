@@ -0,0 +1,48 @@
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+QUIZ = ('Student,Quiz 1 (/10),Quiz 2 (/10)\n'
+        '"Vance, Bob Michael (Bobby) #1000000001",8,9\n'
+        '"Ion, Allison Grace (Allie) #1000000002",10,X\n')
+
+
+def test_sample_attendance_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "test_quiz_data.csv").write_text(QUIZ, encoding="utf-8")
+    sorter = EnhancedQuizSorter()
+    sorter.create_sample_attendance("test_quiz_data.csv", "full_attendance_list.csv")
+    lines = (tmp_path / "full_attendance_list.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "Name,Expected_Status" and len(lines) == 13
+
+    students = sorter.process_with_attendance("test_quiz_data.csv", "full_attendance_list.csv")
+    present = {s["full"]: s["scores"] for s in students if not s["absent"]}
+    assert present == {
+        "Ion, Allison Grace (Allie) #1000000002": {"Quiz 1 (/10)": 10, "Quiz 2 (/10)": "X"},
+        "Vance, Bob Michael (Bobby) #1000000001": {"Quiz 1 (/10)": 8, "Quiz 2 (/10)": 9},
+    }
+    absent = [s for s in students if s["absent"]]
+    assert len(absent) == 10 and all(set(s["scores"].values()) == {"X"} for s in absent)
+    assert [s["full"] for s in students] == sorted((s["full"] for s in students), key=sorter.sort_key_by_last)
+
+    sorter.export_with_attendance(students, "enhanced_sorted_data.csv")
+    rows = (tmp_path / "enhanced_sorted_data.csv").read_text(encoding="utf-8").splitlines()
+    assert rows[0] == "Student,Quiz 1 (/10),Quiz 2 (/10)" and len(rows) == 13
+
+
+def test_name_column_and_single_column_rosters_read_the_same(tmp_path):
+    names = ["Adams, Amy #1001", "Baker, Ben #1002"]
+    legacy = tmp_path / "legacy.csv"
+    legacy.write_text("Name,Expected_Status\n" + "".join(f'"{n}",Present\n' for n in names), encoding="utf-8")
+    plain = tmp_path / "plain.csv"
+    plain.write_text("Name\n" + "".join(f"{n}\n" for n in names), encoding="utf-8")
+    sorter = EnhancedQuizSorter()
+    assert sorter.read_attendance_lines(str(legacy)) == names
+    assert sorter.load_roster(str(legacy))[1] == sorter.load_roster(str(plain))[1]
+
+
+def test_names_without_roster_ids_fail_loudly(tmp_path):
+    legacy = tmp_path / "legacy.csv"
+    legacy.write_text("Name,Expected_Status\nAllie Ion,Present\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Allie Ion"):
+        EnhancedQuizSorter().load_roster(str(legacy))
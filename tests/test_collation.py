@@ -0,0 +1,36 @@
+import numpy as np
+
+from conftest import ROSTER
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from score_table import ScoreTable
+
+
+def test_collation_order():
+    sorter = EnhancedQuizSorter()
+    names = ["de la Cruz, Ana #7", "Ávila, Zoe #3", "Avila, Ana #4", "Adams, Amy Beth #2", "Adams, Amy #9",
+             "Adams, Amy #1", "adams, Ben #5", "Adams, Amy (Mimi) #6"]
+    assert sorted(names, key=sorter.sort_key_by_last) == [
+        "Adams, Amy #1", "Adams, Amy #9", "Adams, Amy (Mimi) #6", "Adams, Amy Beth #2", "adams, Ben #5",
+        "Avila, Ana #4", "Ávila, Zoe #3", "de la Cruz, Ana #7"]
+
+
+def test_mid_term_student_is_inserted_in_place():
+    sorter = EnhancedQuizSorter()
+    master = ScoreTable(list(ROSTER), ["Quiz 1 (/10)"], np.array([[7], [8], [6], [9]], dtype=np.int16))
+    joined = sorter.insert_students(master, ["Baxter, Bea #1005", "Adams, Amy #1001", "Zhou, Zed #1006"])
+    assert joined.students == ["Adams, Amy #1001", "Baker, Ben #1002", "Baxter, Bea #1005", "Cruz, Carla #1003",
+                               "Smith, John #1004", "Zhou, Zed #1006"]
+    assert [r["Quiz 1 (/10)"] for r in joined.records()] == [7, 8, "X", 6, 9, "X"]
+    assert sorter.sort_master(joined) is joined  # already in order: no re-sort
+    assert master.students == list(ROSTER)
+
+
+def test_roster_added_mid_term_keeps_the_master_sorted(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 7})], "Period 1.csv")
+    with open("Period 1.csv", "a", encoding="utf-8") as f:
+        f.write('"Baxter, Bea #1005"\n')
+    master = sorter.import_quiz_files([write_quiz("Quiz 2", {"Bea Baxter": 9})], "Period 1.csv")["master"]
+    assert master.students == sorted(master.students, key=sorter.sort_key_by_last)
+    assert master.students.index("Baxter, Bea #1005") == 2
+    assert [r["Quiz 2 (/10)"] for r in master.records()][2] == 9
@@ -0,0 +1,104 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+
+from columnar_master import ColumnarMaster
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from score_table import ScoreTable
+
+STUDENTS = ["Adams, Amy #1001", "Baker, Ben #1002", "Cruz, Carla #1003"]
+
+
+def table():
+    return ScoreTable.from_vectors(STUDENTS, ["Quiz 1 (/10)", "Quiz 2 (/10)"], [[7, "X"], [8, 10], ["X", 0]])
+
+
+def test_write_and_read_round_trip(tmp_path):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    ColumnarMaster.write_table(table(), path)
+    store = ColumnarMaster(path)
+    assert store.students == STUDENTS and store.quizzes == ["Quiz 1 (/10)", "Quiz 2 (/10)"]
+    assert list(store.to_table().rows()) == list(table().rows())
+    assert store.column("Quiz 2 (/10)").tolist() == [-1, 10, 0]
+    assert list(store.to_table(["Quiz 2 (/10)"]).rows()) == [[s, v] for s, v in zip(STUDENTS, ["X", 10, 0])]
+
+
+def test_update_columns_rewrites_and_appends(tmp_path):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    store = ColumnarMaster.write_table(table(), path)
+    assert store.update_columns({"Quiz 1 (/10)": [9, 9, "X"], "Quiz 3 (/10)": [1, "X", 3]})
+    assert store.quizzes == ["Quiz 1 (/10)", "Quiz 2 (/10)", "Quiz 3 (/10)"]
+    assert store.column("Quiz 3 (/10)").tolist() == [1, -1, 3]
+    assert os.listdir(tmp_path) == ["Period_1_MASTER.qsm"]  # no temp file left behind
+
+    reread = ColumnarMaster(path)
+    assert reread.quizzes == ["Quiz 1 (/10)", "Quiz 2 (/10)", "Quiz 3 (/10)"]
+    assert list(reread.to_table().rows()) == [
+        ["Adams, Amy #1001", 9, "X", 1],
+        ["Baker, Ben #1002", 9, 10, "X"],
+        ["Cruz, Carla #1003", "X", 0, 3],
+    ]
+
+
+def test_every_write_bumps_the_generation(tmp_path):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    store = ColumnarMaster.write_table(table(), path)
+    sorter = EnhancedQuizSorter()
+    versions = [sorter.master_version(path)]
+    store.update_columns({"Quiz 1 (/10)": [1, 2, 3]})  # same size, same inode
+    versions.append(sorter.master_version(path))
+    ColumnarMaster.write_table(table(), path)
+    versions.append(sorter.master_version(path))
+    assert ColumnarMaster.read_generation(path) == 2
+    assert len(set(versions)) == 3
+
+
+def test_views_keep_their_version_across_updates(tmp_path):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    store = ColumnarMaster.write_table(table(), path)
+    view = store.to_table(copy=False)
+    assert not view.matrix.flags.writeable and not view.matrix.flags.owndata  # a view of the mapping
+    store.update_columns({"Quiz 2 (/10)": [5, 5, 5]})
+    assert np.asarray(view.column("Quiz 2 (/10)")).tolist() == [-1, 10, 0]  # the version it was read at
+    assert ColumnarMaster(path).column("Quiz 2 (/10)").tolist() == [5, 5, 5]
+
+
+def test_failed_update_leaves_the_master_whole(tmp_path, monkeypatch):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    store = ColumnarMaster.write_table(table(), path)
+    with open(path, "rb") as f:
+        before = f.read()
+
+    def crash(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", crash)
+    with pytest.raises(OSError):
+        store.update_columns({"Quiz 1 (/10)": [0, 0, 0], "Quiz 3 (/10)": [1, 2, 3]})
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert os.listdir(tmp_path) == ["Period_1_MASTER.qsm"]
+
+
+def test_rewrite_keeps_permissions(tmp_path):
+    path = str(tmp_path / "Period_1_MASTER.qsm")
+    ColumnarMaster.write_table(table(), path)
+    os.chmod(path, 0o640)
+    ColumnarMaster.write_table(table().with_quizzes(["Quiz 1 (/10)", "Quiz 2 (/10)", "Quiz 3 (/10)"]), path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_columnar_period_imports_match_csv(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 7, "John Smith": 9})], "Period 1.csv")
+    csv_rows = list(sorter.load_table(sorter.period_master_path("Period 1"), []).rows())
+    path = sorter.convert_master("Period 1", "columnar")
+    assert path.endswith(".qsm") and sorter.period_master_path("Period 1") == path
+    assert list(sorter.load_table(path, []).rows()) == csv_rows
+
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 10})], "Period 1.csv")  # retake, one column
+    sorter.import_quiz_files([write_quiz("Quiz 2", {"John Smith": 4})], "Period 1.csv")  # appended column
+    rows = {row[0]: row[1:] for row in sorter.load_table(path, []).rows()}
+    assert rows["Adams, Amy #1001"] == [10, "X"]
+    assert rows["Smith, John #1004"] == [9, 4]
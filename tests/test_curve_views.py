@@ -0,0 +1,46 @@
+import csv
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+SCORES = {"Amy Adams": 10, "Ben Baker": 7, "Carla Cruz": "X", "John Smith": 3}
+
+
+@pytest.mark.parametrize("spec, policy", [
+    (None, None), ("none", None), ("raw", None), ("", None),
+    ("cap9", ("cap", 9)), ("cap:8", ("cap", 8)), ("CAP:8", ("cap", 8)),
+    ("linear:1.25", ("linear", 1.25, 100)), ("linear:1.1:10", ("linear", 1.1, 10)),
+    (("cap", 7), ("cap", 7)),
+])
+def test_parse_curve_policy(spec, policy):
+    assert EnhancedQuizSorter().parse_curve_policy(spec) == policy
+
+
+@pytest.mark.parametrize("spec", ["cap", "cap:x", "linear", "linear:1:2:3", "bell"])
+def test_unknown_curve_policy(spec):
+    with pytest.raises(ValueError):
+        EnhancedQuizSorter().parse_curve_policy(spec)
+
+
+def test_curves_are_read_time_views(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    result = sorter.import_quiz_files([write_quiz("Quiz 1", SCORES)], "Period 1.csv",
+                                      output_file="curved.csv", curve="cap:8")
+    with open("curved.csv", newline="", encoding="utf-8") as f:
+        assert [row[1] for row in csv.reader(f)][1:] == ["8", "7", "X", "3"]
+    with open(result["master_path"], newline="", encoding="utf-8") as f:
+        assert [row[1] for row in csv.reader(f)][1:] == ["10", "7", "X", "3"]  # the MASTER keeps raw scores
+
+    views = sorter.curve_views(result["master_path"])
+    raw = views.get(None)
+    for spec in ("cap9", "linear:1.1:10", "linear:0.5"):
+        curved = views.get(spec)
+        assert views.get(spec) is curved  # computed once per policy
+        assert [r["Quiz 1 (/10)"] for r in curved.records()] == \
+            [sorter.apply_curve_policy(r["Quiz 1 (/10)"], spec) for r in raw.records()]
+    assert [r["Quiz 1 (/10)"] for r in views.get("linear:1.1:10").records()] == [10, 8, "X", 3]
+
+    sorter.import_quiz_files([write_quiz("Quiz 2", SCORES)], "Period 1.csv")
+    fresh = sorter.curve_views(result["master_path"])
+    assert fresh is not views and fresh.get("cap9").quizzes == ["Quiz 1 (/10)", "Quiz 2 (/10)"]
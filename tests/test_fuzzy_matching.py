@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+FIRST = ["Amy", "Ben", "Carla", "Dana", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo"]
+LAST = ["Adams", "Baker", "Cruz", "Diaz", "Evans", "Fischer", "Garcia", "Huang", "Ito", "Jones"]
+
+
+def _typo(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("aeiouxyz") + name[i + 1:]
+
+
+@pytest.fixture
+def sorter_and_roster():
+    sorter = EnhancedQuizSorter()
+    lines = [f"{last}, {first} #{1000 + 10 * i + j}" for i, last in enumerate(LAST) for j, first in enumerate(FIRST)]
+    roster_index = sorter.build_roster_index_new(lines)
+    rng = random.Random(5)
+    typed = [f"{_typo(first, rng)} {_typo(last, rng)}" for last in LAST for first in FIRST]
+    typed += [f"Stranger {n}" for n in range(20)] + ["Amy Adams", "amy  adams", typed[0]]
+    return sorter, roster_index, typed
+
+
+def test_pooled_matching_does_not_depend_on_the_worker_count(sorter_and_roster):
+    sorter, roster_index, typed = sorter_and_roster
+    serial = sorter.match_names(typed, roster_index, workers=1)
+    assert serial == {raw: sorter.lookup_canonical_new(raw, roster_index) for raw in typed}
+    assert serial["Amy Adams"] == serial["amy  adams"] == "Adams, Amy #1000"
+    assert 0 < sum(v is None for v in serial.values()) < len(serial)
+    for workers in (2, 3):
+        assert sorter.match_names(typed, roster_index, workers=workers) == serial
+
+
+def test_threshold_is_passed_to_the_workers(sorter_and_roster):
+    sorter, roster_index, typed = sorter_and_roster
+    strict = sorter.match_names(typed, roster_index, workers=1, threshold=95)
+    assert sorter.match_names(typed, roster_index, workers=2, threshold=95) == strict
+    assert sum(v is None for v in strict.values()) > sum(v is None for v in sorter.match_names(
+        typed, roster_index, workers=1).values())
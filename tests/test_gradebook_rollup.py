@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from gradebook_rollup import GradebookRollup
+
+
+@pytest.fixture
+def periods(workdir, write_quiz):
+    """Period 1 (the fixture roster) and a two-student Period 2, each with one import."""
+    with open("Period 2.csv", "w", encoding="utf-8") as f:
+        f.write('Student\n"Diaz, Dana #2001"\n"Evans, Eli #2002"\n')
+    sorter = EnhancedQuizSorter()
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 6, "Ben Baker": 8})], "Period 1.csv")
+    p2 = write_quiz("Quiz 2", {"Dana Diaz": 10, "Eli Evans": "X"})
+    sorter.import_quiz_files([p2], "Period 2.csv")
+    return sorter
+
+
+def test_rollup_combines_every_period(periods):
+    result = GradebookRollup(periods).build(csv_path="gradebook.csv")
+    assert result["periods"] == ["Period 1", "Period 2"] and result["recomputed"] == ["Period 1", "Period 2"]
+    table = result["table"]
+    assert list(table.columns) == ["Period", "Student", "Quiz 1 (/10)", "Quiz 2 (/10)", "Average", "Missing"]
+    assert len(table) == 6 and (table["Period"] == "Period 2").sum() == 2
+    summary = result["summary"].set_index("Period")
+    assert summary.loc["All periods", "Students"] == 6
+    assert summary.loc["All periods", "Mean"] == round((6 + 8 + 10) / 3, 2)
+    assert os.path.exists("gradebook.csv")
+
+
+def test_only_changed_periods_are_recomputed(periods, write_quiz):
+    rollup = GradebookRollup(periods)
+    first = rollup.build()
+    assert GradebookRollup(periods).build()["recomputed"] == []
+
+    os.utime(periods.period_master_path("Period 1"))  # touched, same content: checksum only
+    assert GradebookRollup(periods).build()["recomputed"] == []
+
+    periods.import_quiz_files([write_quiz("Quiz 3", {"Eli Evans": 7})], "Period 2.csv")
+    again = GradebookRollup(EnhancedQuizSorter()).build()  # a fresh process reads the cache from disk
+    assert again["recomputed"] == ["Period 2"]
+    assert again["summary"].set_index("Period").loc["Period 1"].to_dict() == \
+        first["summary"].set_index("Period").loc["Period 1"].to_dict() | {"Quiz 3 (/10)": ""}
@@ -0,0 +1,44 @@
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from import_ledger import ImportLedger
+
+SCORES = {"Amy Adams": 7, "Ben Baker": 8}
+
+
+def test_reimport_is_skipped(workdir, write_quiz):
+    quiz = write_quiz("Quiz 1", SCORES)
+    first = EnhancedQuizSorter().import_quiz_files([quiz], "Period 1.csv")
+    assert first["merged_files"] == [quiz]
+
+    sorter = EnhancedQuizSorter()  # a fresh process: only the ledger on disk remembers the import
+    journal = sorter.score_journal(first["master_path"])
+    seqs = [e["seq"] for e in journal.entries()]
+    again = sorter.import_quiz_files([quiz], "Period 1.csv")
+    assert again["status"] == "already merged"
+    assert again["skipped_files"] == [quiz] and again["merged_files"] == []
+    assert [e["seq"] for e in journal.entries()] == seqs
+
+
+def test_changed_content_or_roster_is_imported_again(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    quiz = write_quiz("Quiz 1", SCORES)
+    sorter.import_quiz_files([quiz], "Period 1.csv")
+    write_quiz("Quiz 1", {**SCORES, "Amy Adams": 9})
+    assert sorter.import_quiz_files([quiz], "Period 1.csv")["merged_files"] == [quiz]
+    with open("Period 1.csv", "a", encoding="utf-8") as f:
+        f.write('"Diaz, Dana #1005"\n')
+    assert sorter.import_quiz_files([quiz], "Period 1.csv")["merged_files"] == [quiz]
+
+
+def test_undo_forgets_the_import(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    first, second = write_quiz("Quiz 1", SCORES), write_quiz("Quiz 2", SCORES)
+    sorter.import_quiz_files([first], "Period 1.csv")
+    master_path = sorter.import_quiz_files([second], "Period 1.csv")["master_path"]
+    assert len(ImportLedger(master_path)._load()) == 2
+
+    sorter.undo_imports(master_path, 1)
+    assert [e["file"] for e in ImportLedger(master_path)._load().values()] == ["Quiz 1.csv"]
+    assert sorter.import_quiz_files([first], "Period 1.csv")["status"] == "already merged"
+    redo = sorter.import_quiz_files([second], "Period 1.csv")
+    assert redo["merged_files"] == [second]
+    assert redo["master"].column("Quiz 2 (/10)").tolist() == [7, 8, -1, -1]
@@ -0,0 +1,41 @@
+import os
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from import_ledger import ImportLedger
+
+
+def _snapshot(master_path):
+    return {name: open(name, "rb").read() for name in sorted(os.listdir(os.path.dirname(master_path)))
+            if name.startswith("Period_1_MASTER")}
+
+
+def test_preview_lists_changes_and_writes_nothing(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    master_path = sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 7, "Ben Baker": 8})],
+                                           "Period 1.csv")["master_path"]
+    before = _snapshot(master_path)
+    retake = write_quiz("Quiz 1", {"Amy Adams": 10, "Ben Baker": 5, "Carla Cruz": 6, "Nobody Here": 4})
+
+    preview = sorter.preview_import(retake, "Period 1.csv")
+    assert preview["master_path"] == master_path and preview["new_students"] == []
+    assert sorted((c["student"], c["old"], c["new"]) for c in preview["changes"]) == [
+        ("Adams, Amy #1001", 7, 10),
+        ("Cruz, Carla #1003", "X", 6),  # an X cell fills; Ben's lower retake changes nothing
+    ]
+    assert preview["unmatched"] == ["Nobody Here"]
+    assert _snapshot(master_path) == before
+    assert not ImportLedger(master_path).lookup(sorter.import_ledger_key(retake, "Period 1.csv"))
+
+    # The import then makes exactly the previewed changes
+    after = sorter.import_quiz_files([retake], "Period 1.csv")["master"].records()
+    assert {r["Student"]: r["Quiz 1 (/10)"] for r in after} == {
+        "Adams, Amy #1001": 10, "Baker, Ben #1002": 8, "Cruz, Carla #1003": 6, "Smith, John #1004": "X"}
+
+
+def test_preview_without_a_master_creates_none(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    preview = sorter.preview_imports([write_quiz("Quiz 1", {"Amy Adams": 7}), write_quiz("Quiz 2", {"Ben Baker": 3})],
+                                     "Period 1.csv")
+    assert preview["new_students"] == []  # a new MASTER starts from the whole roster
+    assert sorted((c["quiz"], c["new"]) for c in preview["changes"]) == [("Quiz 1 (/10)", 7), ("Quiz 2 (/10)", 3)]
+    assert sorted(os.listdir(".")) == ["Period 1.csv", "Quiz 1.csv", "Quiz 2.csv"]
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+import master_export
+from master_export import export_master
+from score_table import MISSING, ScoreTable
+
+FORMATS = ("csv", "json", "xlsx", "pdf")
+
+
+@pytest.fixture
+def table():
+    matrix = np.array([[7, MISSING, 10], [MISSING, 8, 3], [9, 9, MISSING]], dtype=np.int16)
+    return ScoreTable(["Adams, Amy #1001", "Baker, Ben #1002", "Ávila, José #1003"],
+                      ["Quiz 1 (/10)", "Quiz 2 (/10)", "Quiz 3 (/10)"], matrix)
+
+
+@pytest.fixture
+def invariant_pdf(monkeypatch):
+    """reportlab's invariant mode: no timestamps or random IDs, so equal PDFs are equal bytes."""
+    from reportlab import rl_config
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def _read(path):
+    if path.endswith(".xlsx"):
+        openpyxl = pytest.importorskip("openpyxl")
+        wb = openpyxl.load_workbook(path)
+        return [list(row) for row in wb.active.iter_rows(values_only=True)]
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_concurrent_exports_equal_one_at_a_time(tmp_path, table, invariant_pdf):
+    pytest.importorskip("openpyxl")
+    before = table.copy()
+    together = export_master(table, {fmt: str(tmp_path / f"all.{fmt}") for fmt in FORMATS}, "Period 1")
+    for fmt in FORMATS:
+        export_master(table, {fmt: str(tmp_path / f"one.{fmt}")}, "Period 1")
+        assert _read(together[fmt]) == _read(str(tmp_path / f"one.{fmt}")), fmt
+    assert table.students == before.students and np.array_equal(table.matrix, before.matrix)
+    assert _read(together["csv"]).decode("utf-8").splitlines()[1:] == [
+        '"Adams, Amy #1001",7,X,10', '"Baker, Ben #1002",X,8,3', '"Ávila, José #1003",9,9,X']
+
+
+def test_a_failing_format_does_not_stop_the_others(tmp_path, table, monkeypatch):
+    def broken(table, path, title):
+        raise OSError("disk full")
+
+    monkeypatch.setitem(master_export.WRITERS, "pdf", broken)
+    with pytest.raises(OSError, match="disk full"):
+        export_master(table, {"pdf": str(tmp_path / "out.pdf"), "csv": str(tmp_path / "out.csv"),
+                              "json": str(tmp_path / "out.json")})
+    assert sorted(os.listdir(tmp_path)) == ["out.csv", "out.json"]
+
+
+def test_unknown_formats_are_rejected_before_writing(tmp_path, table):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_master(table, {"csv": str(tmp_path / "out.csv"), "docx": str(tmp_path / "out.docx")})
+    assert os.listdir(tmp_path) == []
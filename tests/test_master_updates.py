@@ -0,0 +1,56 @@
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor
+
+from conftest import ROSTER
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+SCORES = {"Amy Adams": 7, "Ben Baker": 8, "Carla Cruz": 6, "John Smith": 9}
+
+
+def _import(quiz_file):
+    EnhancedQuizSorter().import_quiz_files([quiz_file], "Period 1.csv")
+    return quiz_file
+
+
+def read_master():
+    with open("Period_1_MASTER.csv", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_concurrent_imports_lose_no_update(workdir, write_quiz):
+    files = [write_quiz(f"Quiz {i}", SCORES) for i in range(1, 7)]
+    with ProcessPoolExecutor(max_workers=len(files)) as pool:
+        list(pool.map(_import, files))
+    header = read_master()[0].split(",")
+    assert sorted(header[1:]) == sorted(f"Quiz {i} (/10)" for i in range(1, 7))
+    journal = EnhancedQuizSorter().score_journal(os.path.abspath("Period_1_MASTER.csv"))
+    assert len(journal.entries()) == len(files)
+
+
+def test_writer_committing_mid_merge_is_remerged(workdir, write_quiz):
+    first, second = write_quiz("Quiz 1", SCORES), write_quiz("Quiz 2", SCORES)
+    _import(first)
+    sorter = EnhancedQuizSorter()
+    merge = sorter.merge_into_master
+    calls = []
+
+    def merge_while_another_writer_commits(master, delta, quiz_columns):
+        if not calls:  # the optimistic merge: someone else commits before we take the lock
+            _import(write_quiz("Quiz 3", SCORES))
+        calls.append(quiz_columns)
+        return merge(master, delta, quiz_columns)
+
+    sorter.merge_into_master = merge_while_another_writer_commits
+    sorter.import_quiz_files([second], "Period 1.csv")
+    assert len(calls) == 2
+    lines = read_master()
+    assert sorted(lines[0].split(",")[1:]) == ["Quiz 1 (/10)", "Quiz 2 (/10)", "Quiz 3 (/10)"]
+    assert lines[1:] == [f'"{s}",{v},{v},{v}' for s, v in zip(ROSTER, SCORES.values())]
+
+
+def test_rewrite_keeps_master_permissions(workdir, write_quiz):
+    _import(write_quiz("Quiz 1", SCORES))
+    os.chmod("Period_1_MASTER.csv", 0o640)
+    _import(write_quiz("Quiz 2", SCORES))
+    assert stat.S_IMODE(os.stat("Period_1_MASTER.csv").st_mode) == 0o640
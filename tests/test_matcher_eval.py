@@ -0,0 +1,42 @@
+import pytest
+
+from matcher_eval import MatcherEvaluation
+
+FIXTURES = "Typed,Expected\nAmy Adams,\"Adams, Amy #1001\"\nben bakr,#1002\nCarla Cruz,#1003\nNobody Here,\nJohn Smyth,#1004\n"
+
+
+@pytest.fixture
+def evaluation(workdir):
+    with open("fixtures.csv", "w", encoding="utf-8") as f:
+        f.write(FIXTURES)
+    return MatcherEvaluation("Period 1.csv")
+
+
+def test_fixtures_load_with_blank_meaning_no_match(evaluation):
+    fixtures = evaluation.load_fixtures("fixtures.csv")
+    assert fixtures[0] == ("Amy Adams", "Adams, Amy #1001") and fixtures[3] == ("Nobody Here", None)
+    with open("bad.csv", "w", encoding="utf-8") as f:
+        f.write("Typed,Student\nAmy Adams,x\n")
+    with pytest.raises(ValueError, match="'Typed' and 'Expected'"):
+        evaluation.load_fixtures("bad.csv")
+
+
+def test_report_scores_every_strategy_and_threshold(evaluation):
+    report = evaluation.evaluate(evaluation.load_fixtures("fixtures.csv"), thresholds=[60, 95])
+    assert [(r["Strategy"], r["Threshold"]) for r in report.to_dict("records")] == [
+        ("exact", ""), ("ratio", 60), ("ratio", 95), ("batch", 60), ("batch", 95),
+        ("variations", 60), ("variations", 95)]
+    rows = report.set_index(["Strategy", "Threshold"])
+    assert rows.loc[("exact", ""), ["Precision", "Recall"]].tolist() == [1.0, 0.5]  # two exact names of four
+    assert rows.loc[("ratio", 60), ["Precision", "Recall"]].tolist() == [1.0, 1.0]
+    assert rows.loc[("ratio", 95), "Recall"] == 0.5
+    # The batch matcher imports use is scored exactly like one-at-a-time lookups
+    for t in (60, 95):
+        assert rows.loc[("batch", t), ["Precision", "Recall"]].tolist() == \
+            rows.loc[("ratio", t), ["Precision", "Recall"]].tolist()
+    assert (report["Queries"] == 5).all() and (report["p99 ms"] >= report["p50 ms"]).all()
+
+
+def test_unknown_strategy(evaluation):
+    with pytest.raises(ValueError, match="Unknown strategy: soundex"):
+        evaluation.evaluate([("Amy Adams", None)], strategies=["soundex"])
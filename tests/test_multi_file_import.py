@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+EXPORTS = {
+    "Quiz 1": {"Amy Adams": 7, "Ben Baker": 8},
+    "Quiz 1 retake": {"Amy Adams": 9, "Ben Baker": 2},
+    "Quiz 2": {"Carla Cruz": 6, "John Smith": "X"},
+    "Quiz 3": {"John Smith": 10, "Nobody Here": 1},
+}
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_many_files_are_one_master_pass(workdir, write_quiz, workers):
+    files = [write_quiz(name, scores) for name, scores in EXPORTS.items()]
+    sorter = EnhancedQuizSorter()
+    result = sorter.import_quiz_files(files, "Period 1.csv", workers=workers)
+    assert result["merged_files"] == files and result["unmatched"] == ["Nobody Here"]
+    entries = sorter.score_journal(result["master_path"]).entries()
+    assert len(entries) == 1
+    assert entries[0]["changes"] == [["#1001", "Quiz 1 (/10)", "X", 9], ["#1002", "Quiz 1 (/10)", "X", 8],
+                                     ["#1003", "Quiz 2 (/10)", "X", 6], ["#1004", "Quiz 3 (/10)", "X", 10]]
+    batch = _read(result["master_path"])
+
+    # Same MASTER as importing the files one at a time
+    os.makedirs("one_by_one")
+    os.chdir("one_by_one")
+    for q in files:
+        EnhancedQuizSorter().import_quiz_files([q], os.path.join("..", "Period 1.csv"))
+    assert _read("Period_1_MASTER.csv") == batch
+
+
+def test_merged_files_are_skipped_one_by_one(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    first = write_quiz("Quiz 1", EXPORTS["Quiz 1"])
+    sorter.import_quiz_files([first], "Period 1.csv")
+    second = write_quiz("Quiz 2", EXPORTS["Quiz 2"])
+    result = sorter.import_quiz_files([first, second, second], "Period 1.csv")
+    assert result["skipped_files"] == [first] and result["merged_files"] == [second]
+    assert len(sorter.score_journal(result["master_path"]).entries()) == 2
@@ -0,0 +1,40 @@
+import unicodedata
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from name_normalization import normalize_name, strip_diacritics
+
+
+@pytest.mark.parametrize("raw, normal", [
+    ("José Núñez", "jose nunez"),
+    ('  "Amy   Adams"  ', "amy adams"),
+    ("AMY\tADAMS", "amy adams"),
+    ("Zoë O'Brien-Łukasz", "zoe o'brien-łukasz"),  # Ł has no decomposition: kept, lowercased
+    ("", ""),
+])
+def test_normalize_name(raw, normal):
+    assert normalize_name(raw) == normal
+
+
+def test_composed_and_decomposed_spellings_are_one_name():
+    composed, decomposed = "Renée", unicodedata.normalize("NFD", "Renée")
+    assert composed != decomposed
+    assert normalize_name(composed) == normalize_name(decomposed) == "renee"
+    assert strip_diacritics("plain ascii") == "plain ascii"
+
+
+def test_repeated_names_are_served_from_the_cache():
+    normalize_name.cache_clear()
+    for _ in range(3):
+        normalize_name("Ávila, Hana")
+    info = normalize_name.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_typed_and_roster_spellings_match():
+    sorter = EnhancedQuizSorter()
+    roster_index = sorter.build_roster_index_new(["Ávila, José #2001", "Adams, Amy #1001"])
+    assert sorter.lookup_canonical_new("jose avila", roster_index) == "Ávila, José #2001"
+    assert sorter.lookup_canonical_new("  JOSÉ   ÁVILA ", roster_index) == "Ávila, José #2001"
+    assert sorter.sort_key_by_last("Ávila, José #2001") < sorter.sort_key_by_last("Baker, Ben #1002")
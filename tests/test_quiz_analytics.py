@@ -0,0 +1,60 @@
+import numpy as np
+
+import quiz_analytics
+import shared_master
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from quiz_analytics import MasterAnalytics
+from score_table import MISSING, ScoreTable
+
+
+def _table(n_students=40, n_quizzes=9):
+    rng = np.random.default_rng(7)
+    matrix = rng.integers(0, 11, size=(n_students, n_quizzes)).astype(np.int16)
+    matrix[rng.random(matrix.shape) < 0.2] = MISSING
+    return ScoreTable([f"Last{i}, First #{1000 + i}" for i in range(n_students)],
+                      [f"Quiz {j + 1} (/10)" for j in range(n_quizzes)], matrix)
+
+
+def _stats(analytics):
+    return (analytics.quiz_stats().to_dict("list"), analytics.student_stats().to_dict("list"),
+            analytics.summary(), [analytics.distribution(q) for q in analytics.quizzes])
+
+
+def test_shared_memory_reduction_equals_serial(monkeypatch):
+    table = _table()
+    key = EnhancedQuizSorter().student_key
+    serial = MasterAnalytics(table, key, workers=1)
+    monkeypatch.setattr(MasterAnalytics, "PARALLEL_CELLS", 10)
+    monkeypatch.setattr(quiz_analytics.os, "cpu_count", lambda: 3)
+    shared = MasterAnalytics(table, key)
+    assert repr(_stats(shared)) == repr(_stats(serial))
+
+
+def test_attached_views_are_closed_on_detach():
+    table = _table(5, 3)
+    with shared_master.SharedMaster(table) as shared:
+        attached = shared_master.attach(shared.descriptor)
+        assert attached.names.tolist() == table.students
+        assert np.array_equal(attached.columns(1, 3), table.matrix[:, 1:3])
+        assert shared_master.attach(shared.descriptor) is attached
+        shared_master.detach_all()
+        assert attached.matrix is None and not shared_master._ATTACHED
+
+
+def test_apply_matches_a_rebuild(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    master_path = sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 4, "Ben Baker": 8})],
+                                           "Period 1.csv")["master_path"]
+    analytics = sorter.master_analytics(master_path)
+    with open("Period 1.csv", "a", encoding="utf-8") as f:
+        f.write('"Diaz, Dana #1005"\n')
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 9, "Dana Diaz": 6}),
+                              write_quiz("Quiz 2", {"Ben Baker": "X", "John Smith": 10})], "Period 1.csv")
+    assert sorter.master_analytics(master_path) is analytics  # the commit was folded in, not rebuilt
+    rebuilt = MasterAnalytics(sorter.load_table(master_path, []), sorter.student_key)
+    assert repr(_stats(analytics)) == repr(_stats(rebuilt))
+    assert analytics.summary()["students"] == 5
+
+    sorter.undo_imports(master_path, 1)
+    rebuilt = MasterAnalytics(sorter.load_table(master_path, []), sorter.student_key)
+    assert repr(_stats(sorter.master_analytics(master_path))) == repr(_stats(rebuilt))
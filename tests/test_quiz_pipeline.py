@@ -0,0 +1,56 @@
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+SCORES = {"Amy Adams": 7, "John Smith": 9}
+
+
+def test_commit_is_never_served_from_the_memo(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    pipeline = sorter.pipeline()
+    built = pipeline.build([write_quiz("Quiz 1", SCORES)], "Period 1.csv")
+    master_path = sorter.period_master_path("Period 1")
+    att_lines = pipeline.roster("Period 1.csv").value[0]
+    commits = []
+
+    def update_master(path, delta, quiz_columns, att, source=None, ledger_keys=None):
+        commits.append((source, ledger_keys))  # writes nothing: the MASTER version stays the same
+        return delta
+
+    sorter.update_master = update_master
+    pipeline.merge(built, master_path, att_lines, commit=True, source="a", ledger_keys=[("k1", "a")])
+    pipeline.merge(built, master_path, att_lines, commit=True, source="b", ledger_keys=[("k2", "b")])
+    assert commits == [("a", [("k1", "a")]), ("b", [("k2", "b")])]
+
+
+def test_uncommitted_merge_is_memoized_until_the_master_changes(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    pipeline = sorter.pipeline()
+    quiz = write_quiz("Quiz 1", SCORES)
+    preview = sorter.preview_imports([quiz], "Period 1.csv")
+    assert sorter.preview_imports([quiz], "Period 1.csv") == preview
+    assert pipeline.runs["merge"] == 1
+    assert not (workdir / "Period_1_MASTER.csv").exists()  # a preview writes nothing
+
+    sorter.import_quiz_files([quiz], "Period 1.csv")
+    assert pipeline.runs["merge"] == 1  # the commit bypasses the memo
+    sorter.preview_imports([write_quiz("Quiz 2", SCORES)], "Period 1.csv")
+    assert pipeline.runs["merge"] == 2
+
+
+def test_changing_only_the_curve_reruns_only_the_curve_and_export(workdir, write_quiz):
+    pipeline = EnhancedQuizSorter().pipeline()
+    quizzes = [write_quiz("Quiz 1", SCORES), write_quiz("Quiz 2", {"Ben Baker": 4})]
+    pipeline.run(quizzes, "Period 1.csv", curve="cap:8", targets={"csv": "out.csv"})
+    first = dict(pipeline.runs)
+    assert first["render"] == 1 and first["curve"] == 1
+
+    pipeline.run(quizzes, "Period 1.csv", curve="cap:8", targets={"csv": "out.csv"})
+    assert dict(pipeline.runs) == first  # nothing changed: every stage is served from the memo
+
+    stages = pipeline.run(quizzes, "Period 1.csv", curve="cap9", targets={"csv": "out.csv"})
+    assert dict(pipeline.runs) == {**first, "curve": 2, "render": 2}
+    assert [r["Quiz 1 (/10)"] for r in stages["view"].value.records()] == [7, "X", "X", 9]
+
+    write_quiz("Quiz 2", {"Ben Baker": 6})  # one export changed: only its load/match/fold re-run
+    pipeline.run(quizzes, "Period 1.csv", curve="cap9")
+    assert pipeline.runs["export"] == first["export"] + 1 and pipeline.runs["fold"] == first["fold"] + 1
+    assert pipeline.runs["roster"] == first["roster"]
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+import pytest
+
+from quiz_service import QuizService, ServiceClient, parse_address, serve
+
+
+@pytest.fixture
+def service(workdir):
+    """A running service in the working folder; yields its socket path."""
+    address = os.path.join(str(workdir), ".quiz_sorter.sock")
+    thread = threading.Thread(target=serve, args=(address, QuizService()), kwargs={"log": lambda message: None})
+    thread.start()
+    deadline = time.time() + 10
+    while not os.path.exists(address) and time.time() < deadline:
+        time.sleep(0.01)
+    yield address
+    with ServiceClient(address) as client:
+        client.call("shutdown")
+    thread.join(10)
+    assert not thread.is_alive() and not os.path.exists(address)
+
+
+def test_jobs_run_in_the_resident_sorter(service, write_quiz):
+    quiz = write_quiz("Quiz 1", {"Amy Adams": 7, "Nobody Here": 3})
+    attendance = os.path.abspath("Period 1.csv")
+    with ServiceClient(service) as client:
+        assert client.call("ping")["pid"] == os.getpid()
+        preview = client.call("preview", quiz_files=[quiz], attendance_file=attendance)
+        assert [(c["student"], c["new"]) for c in preview["changes"]] == [("Adams, Amy #1001", 7)]
+        result = client.call("import", quiz_files=[quiz], attendance_file=attendance)
+        assert result["status"] == "merged" and result["students"] == 4 and result["unmatched"] == ["Nobody Here"]
+        # The sorter (and its import ledger) stays warm between calls on other connections too
+    with ServiceClient(service) as client:
+        again = client.call("import", quiz_files=[quiz], attendance_file=attendance)
+        assert again["status"] == "already merged" and again["skipped_files"] == [quiz]
+
+
+def test_failures_are_reported_and_the_service_keeps_running(service, workdir, monkeypatch):
+    with ServiceClient(service) as client:
+        with pytest.raises(RuntimeError, match="Unknown operation"):
+            client.call("explode")
+        with pytest.raises(RuntimeError, match="FileNotFoundError"):
+            client.call("render", period="Period 9")
+        monkeypatch.chdir(workdir.parent)
+        with pytest.raises(RuntimeError, match="Service runs in"):
+            client.call("ping")
+        monkeypatch.chdir(workdir)
+        assert client.call("ping")["cwd"] == os.getcwd()
+
+
+def test_tcp_addresses_must_be_loopback():
+    assert parse_address("127.0.0.1:8765") == ("127.0.0.1", 8765)
+    assert parse_address(":8765") == ("127.0.0.1", 8765)
+    assert parse_address("[::1]:8765") == ("::1", 8765)
+    assert parse_address("run/quiz.sock") == "run/quiz.sock"
+    with pytest.raises(ValueError, match="loopback"):
+        parse_address("0.0.0.0:8765")
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from quiz_watcher import FolderWatcher
+
+
+@pytest.mark.parametrize("path, period", [
+    # the forms the docstring and README have always listed
+    ("attendance/Period 1.csv", "Period 1"),
+    ("quiz_data/Period3_Mitosis.csv", "Period 3"),
+    ("period_2_attendance.csv", "Period 2"),
+    ("period_7.csv", "Period 7"),
+    # separators and zero padding all name the same period (and MASTER)
+    ("input/Period_03_Quiz4.csv", "Period 3"),
+    ("input/PERIOD-12 quiz.xlsx", "Period 12"),
+    ("Period 10.csv", "Period 10"),
+    ("Period 3/Quiz 4.csv", "Period 3"),
+    ("input/Quiz 4.csv", "Period"),
+])
+def test_extract_period_from_path(path, period):
+    assert EnhancedQuizSorter().extract_period_from_path(path) == period
+
+
+@pytest.fixture
+def watcher(workdir):
+    os.makedirs("input")
+    os.makedirs("attendance")
+    shutil.move("Period 1.csv", "attendance/Period 1.csv")
+    return FolderWatcher(debounce=0, log=lambda message: None)
+
+
+def _export(name, scores):
+    path = os.path.join("input", f"Period 1 {name}.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Student,{name} (/10)\n" + "".join(f"{typed},{v}\n" for typed, v in scores.items()))
+    return path
+
+
+def test_failed_import_is_retried(watcher, monkeypatch):
+    _export("Quiz 1", {"Amy Adams": 7})
+    import_quiz_files = watcher.sorter.import_quiz_files
+    calls = []
+
+    def flaky(paths, attendance_file):
+        calls.append(paths)
+        if len(calls) == 1:
+            raise OSError("share unavailable")
+        return import_quiz_files(paths, attendance_file)
+
+    monkeypatch.setattr(watcher.sorter, "import_quiz_files", flaky)
+    assert watcher.poll_once() == []
+    results = watcher.poll_once()  # same file, unchanged: still pending
+    assert [r["merged_files"] for r in results] == [[os.path.join("input", "Period 1 Quiz 1.csv")]]
+    assert watcher.poll_once() == [] and len(calls) == 2
+
+
+def test_bad_export_does_not_hold_back_its_period(watcher):
+    good = _export("Quiz 1", {"Amy Adams": 7})
+    with open(os.path.join("input", "Period 1 broken.csv"), "w", encoding="utf-8") as f:
+        f.write("Name,Quiz 2\nAmy Adams,5\n")
+    assert [r["merged_files"] for r in watcher.poll_once()] == [[good]]
+    messages = []
+    watcher.log = messages.append
+    assert watcher.poll_once() == []  # the broken export is retried, and fails again
+    assert [m.split(":")[0] for m in messages] == ["❌ Period 1 broken.csv"]
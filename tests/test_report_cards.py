@@ -0,0 +1,55 @@
+import os
+import re
+
+import pytest
+
+import report_cards
+from report_cards import build_report_cards
+from score_table import ScoreTable
+
+QUIZZES = [f"Quiz {i} (/10)" for i in range(1, 36)]  # two pages per card
+
+
+def table(n=9):
+    students = [f"Student{i:02d}, Pat #{1000 + i}" for i in range(n)]
+    return ScoreTable.from_vectors(students, QUIZZES, [[(i + j) % 11 if (i + j) % 7 else "X" for j in range(35)]
+                                                       for i in range(n)])
+
+
+def pdf_pages(path):
+    """Page count of a PDF after checking that its xref table points at every object it lists."""
+    with open(path, "rb") as f:
+        data = f.read()
+    xref_at = int(data[data.rindex(b"startxref") + 9:].split()[0])
+    assert data[xref_at:].startswith(b"xref")
+    lines = data[xref_at:data.index(b"trailer", xref_at)].split(b"\n")
+    first, count = map(int, lines[1].split())
+    objects = {}
+    for n, entry in enumerate(lines[2:2 + count], first):
+        offset, _, kind = entry.split()
+        if kind == b"n":
+            assert data[int(offset):].startswith(b"%d 0 obj" % n)
+            objects[n] = data[int(offset):data.index(b"endobj", int(offset))]
+    for obj in objects.values():
+        for ref in re.findall(rb"(\d+) 0 R", obj.split(b"stream")[0]):
+            assert int(ref) in objects
+    pages = [obj for obj in objects.values() if re.search(rb"/Type /Page\b(?!s)", obj)]
+    assert max(int(c) for c in re.findall(rb"/Count (\d+)", data)) == len(pages)  # the root of the page tree
+    return len(pages)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merged_and_per_student_have_the_same_pages(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(report_cards, "MERGED_CHUNK", 4)  # several chunk PDFs, concatenated
+    merged = str(tmp_path / "cards.pdf")
+    assert build_report_cards(table(), merged, "Period 1 – Cards", workers=workers) == [merged]
+    per_student = build_report_cards(table(), str(tmp_path / "cards"), merged=False, workers=workers)
+    assert len(per_student) == 9
+    assert pdf_pages(merged) == sum(pdf_pages(p) for p in per_student) == 18
+    assert sorted(os.listdir(tmp_path)) == ["cards", "cards.pdf"]  # no chunk files left behind
+
+
+def test_small_class_is_one_canvas(tmp_path):
+    merged = str(tmp_path / "cards.pdf")
+    build_report_cards(table(3), merged)
+    assert pdf_pages(merged) == 6
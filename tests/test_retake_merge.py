@@ -0,0 +1,21 @@
+from conftest import ROSTER
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+
+def _master(result):
+    return {r["Student"]: r["Quiz 1 (/10)"] for r in result["master"].records()}
+
+
+def test_retakes_in_one_export_keep_the_best_attempt(workdir):
+    with open("Quiz 1.csv", "w", encoding="utf-8") as f:
+        f.write("Student,Quiz 1 (/10)\n"
+                "Amy Adams,4\nBen Baker,X\nAmy Adams,9\nAmy Adams,\nBen Baker,6\nAmy Adams,7\nCarla Cruz,X\n")
+    result = EnhancedQuizSorter().import_quiz_files(["Quiz 1.csv"], "Period 1.csv")
+    assert _master(result) == dict(zip(ROSTER, [9, 6, "X", "X"]))
+
+
+def test_later_lower_attempt_does_not_lower_the_master(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    sorter.import_quiz_files([write_quiz("Quiz 1", {"Amy Adams": 9, "Ben Baker": "X"})], "Period 1.csv")
+    write_quiz("Quiz 1", {"Amy Adams": 5, "Ben Baker": 3})  # the retake export, same quiz
+    assert _master(sorter.import_quiz_files(["Quiz 1.csv"], "Period 1.csv")) == dict(zip(ROSTER, [9, 3, "X", "X"]))
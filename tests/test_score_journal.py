@@ -0,0 +1,46 @@
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from score_journal import ScoreJournal
+
+
+@pytest.fixture
+def sorter():
+    """A sorter whose journals snapshot every 2 entries and keep 2 snapshots, so a few imports compact."""
+    sorter = EnhancedQuizSorter()
+    sorter.score_journal = lambda master_path: ScoreJournal(master_path, snapshot_every=2, keep_snapshots=2)
+    return sorter
+
+
+def as_cells(table):
+    return {(row[0], q): v for row in table.rows() for q, v in zip(table.quizzes, row[1:])}
+
+
+def test_rebuild_after_compaction_equals_master(workdir, write_quiz, sorter):
+    for i in range(1, 8):
+        scores = {"Amy Adams": i % 10, "Ben Baker": 10 - i, "John Smith": (3 * i) % 11}
+        sorter.import_quiz_files([write_quiz(f"Quiz {i}", scores)], "Period 1.csv")
+        # a retake of an earlier quiz changes cells that already exist
+        sorter.import_quiz_files([write_quiz(f"Quiz {max(1, i - 2)}", {"Carla Cruz": i})], "Period 1.csv")
+
+    master_path = sorter.period_master_path("Period 1")
+    journal = sorter.score_journal(master_path)
+    assert len(journal.snapshots()) == 2
+    assert journal.entries()[0]["seq"] > 1  # older entries were compacted away
+
+    current = sorter.load_table(master_path, [])
+    rebuilt = sorter.rebuild_master(master_path, journal.last_seq())
+    assert rebuilt.students == current.students
+    assert as_cells(rebuilt) == as_cells(current)
+
+    with pytest.raises(ValueError, match="compacted"):
+        sorter.rebuild_master(master_path, 1)
+
+
+def test_undo_after_compaction_reverts_last_import(workdir, write_quiz, sorter):
+    for i in range(1, 6):
+        sorter.import_quiz_files([write_quiz(f"Quiz {i}", {"Amy Adams": i})], "Period 1.csv")
+    master_path = sorter.period_master_path("Period 1")
+    before_last = sorter.rebuild_master(master_path, sorter.score_journal(master_path).last_seq() - 1)
+    undone = sorter.undo_imports(master_path, 1)
+    assert as_cells(undone) == {**as_cells(before_last), **{(s, "Quiz 5 (/10)"): "X" for s in undone.students}}
@@ -0,0 +1,54 @@
+import io
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from score_table import MISSING, ScoreTable, decode_score, encode_score
+
+MASTER = ('Student,Quiz 1 (/10),Quiz 2 (/10)\n'
+          '"Adams, Amy #1001",7,X\n'
+          '"Baker, Ben #1002",X,10\n'
+          '"Ávila, José ""Pepe"" #1003",0,9\n')
+
+
+@pytest.mark.parametrize("cell, code", [
+    (7, 7), ("8", 8), ("9.0", 9), (" 10 ", 10), (250, 100), ("-3", 0), (np.int64(4), 4),
+    ("X", MISSING), ("", MISSING), ("nan", MISSING), (float("nan"), MISSING), ("None", MISSING), ("abc", MISSING),
+])
+def test_cells_encode_like_normalize_score_cell(cell, code):
+    assert encode_score(cell) == code
+    assert decode_score(code) == EnhancedQuizSorter().normalize_score_cell(cell)
+
+
+def test_master_csv_round_trip_is_byte_identical(workdir):
+    with open("Period_1_MASTER.csv", "w", encoding="utf-8", newline="") as f:
+        f.write(MASTER)
+    table = EnhancedQuizSorter().load_table(os.path.abspath("Period_1_MASTER.csv"), [])
+    out = io.StringIO(newline="")
+    table.write_csv(out)
+    assert out.getvalue() == MASTER
+    assert ScoreTable.from_frame(table.to_frame()).records() == table.records()
+
+
+def test_retake_merge_is_a_cellwise_maximum():
+    master = ScoreTable(["Adams, Amy #1001", "Baker, Ben #1002"], ["Q1", "Q2"],
+                        np.array([[7, MISSING], [5, 10]], dtype=np.int16))
+    delta = ScoreTable(["Amy A. #1001", "Cruz, Carla #1003"], ["Q2", "Q1"], np.array([[MISSING, 9], [8, 8]], dtype=np.int16))
+    missing = master.retake_merge(delta, key=lambda s: s.rsplit("#", 1)[1])
+    assert missing == ["Cruz, Carla #1003"]
+    assert master.records() == [{"Student": "Adams, Amy #1001", "Q1": 9, "Q2": "X"},
+                                {"Student": "Baker, Ben #1002", "Q1": 5, "Q2": 10}]
+
+
+def test_imports_never_load_pandas(workdir, write_quiz):
+    quiz = write_quiz("Quiz 1", {"Amy Adams": 7})
+    script = ("import sys; from enhanced_quiz_sorter import EnhancedQuizSorter; "
+              f"EnhancedQuizSorter().import_quiz_files([{quiz!r}], 'Period 1.csv'); print('pandas' in sys.modules)")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    assert out.stdout.strip() == "False"
+    assert os.path.exists("Period_1_MASTER.csv")
@@ -0,0 +1,50 @@
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+from sheet_reader import read_records, resolve_sheet
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+@pytest.fixture
+def workbook(workdir):
+    """An LMS-style workbook: a title sheet, then the scores under a title block, then another class."""
+    wb = openpyxl.Workbook()
+    wb.active.title = "Info"
+    wb["Info"].append(["Exported from the LMS"])
+    scores = wb.create_sheet("Scores")
+    scores.append(["Quiz report"])
+    scores.append([])
+    scores.append(["Student", "Quiz 1 (/10)"])
+    scores.append(["Amy Adams", 7.0])
+    other = wb.create_sheet("Other")
+    other.append(["Student", "Quiz 1 (/10)"])
+    other.append(["Ben Baker", 8])
+    path = str(workdir / "Quiz 1.xlsx")
+    wb.save(path)
+    return path
+
+
+def test_header_row_is_found_below_a_title_block(workbook):
+    header, records = read_records(workbook)
+    assert header == ["Student", "Quiz 1 (/10)"]
+    assert list(records) == [{"Student": "Amy Adams", "Quiz 1 (/10)": "7"}]
+    assert [r["Student"] for r in read_records(workbook, "Other")[1]] == ["Ben Baker"]
+
+
+def test_naming_the_default_sheet_keeps_the_ledger_key(workbook, write_quiz):
+    assert [resolve_sheet(workbook, s, "Student") for s in (None, "Scores", 1, "1", "Other", 0)] == \
+        [None, None, None, None, "Other", "Info"]
+    key = EnhancedQuizSorter().import_ledger_key
+    default = key(workbook, "Period 1.csv")
+    assert key(workbook, "Period 1.csv", "Scores") == key(workbook, "Period 1.csv", 1) == default
+    assert key(workbook, "Period 1.csv", "Other") != default
+    quiz = write_quiz("Quiz 2", {"Amy Adams": 7})
+    assert key(quiz, "Period 1.csv", "Scores") == key(quiz, "Period 1.csv")  # CSV files have no sheets
+
+
+def test_explicit_default_sheet_is_already_merged(workbook):
+    sorter = EnhancedQuizSorter()
+    assert sorter.import_quiz_files([workbook], "Period 1.csv")["merged_files"] == [workbook]
+    assert sorter.import_quiz_files([workbook], "Period 1.csv", sheet="Scores")["status"] == "already merged"
+    assert sorter.import_quiz_files([workbook], "Period 1.csv", sheet="Other")["merged_files"] == [workbook]
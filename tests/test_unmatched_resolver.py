@@ -0,0 +1,42 @@
+import pytest
+
+from enhanced_quiz_sorter import EnhancedQuizSorter
+
+TYPO = "Mimi Adms"
+
+
+def _scores(table, quiz="Quiz 1 (/10)"):
+    return {r["Student"]: r[quiz] for r in table.records()}
+
+
+def test_candidates_are_ranked_best_first(workdir):
+    sorter = EnhancedQuizSorter()
+    roster_index = sorter.load_roster("Period 1.csv")[1]
+    ranked = sorter.rank_candidates(TYPO, roster_index, k=3)
+    assert [c for c, _ in ranked] == ["Adams, Amy #1001", "Smith, John #1004", "Baker, Ben #1002"]
+    assert ranked[0][1] > ranked[1][1] >= ranked[2][1]
+    assert sorter.rank_candidates("Ben Baker", roster_index, k=1) == [("Baker, Ben #1002", 100)]
+
+
+def test_resolving_merges_the_scores_and_remembers_the_spelling(workdir, write_quiz):
+    sorter = EnhancedQuizSorter()
+    result = sorter.import_quiz_files([write_quiz("Quiz 1", {TYPO: 7, "Ben Baker": 8})], "Period 1.csv")
+    assert result["unmatched"] == [TYPO] and result["unmatched_scores"] == {TYPO: {"Quiz 1 (/10)": 7}}
+    assert _scores(result["master"])["Adams, Amy #1001"] == "X"
+
+    master = sorter.resolve_unmatched("Period 1.csv", TYPO, "Adams, Amy #1001", result["unmatched_scores"][TYPO])
+    assert _scores(master)["Adams, Amy #1001"] == 7
+    journal = sorter.score_journal(result["master_path"]).entries()
+    assert journal[-1]["source"] == f"resolved: {TYPO} -> Adams, Amy #1001"
+
+    # The next export with the same spelling matches on its own, in a fresh process too
+    later = EnhancedQuizSorter().import_quiz_files([write_quiz("Quiz 2", {TYPO: 9})], "Period 1.csv")
+    assert later["unmatched"] == [] and _scores(later["master"], "Quiz 2 (/10)")["Adams, Amy #1001"] == 9
+
+    sorter.undo_imports(result["master_path"], 2)  # Quiz 2, then the resolution
+    assert _scores(sorter.load_table(result["master_path"], []))["Adams, Amy #1001"] == "X"
+
+
+def test_only_roster_students_can_be_confirmed(workdir):
+    with pytest.raises(ValueError, match="not on the Period 1 roster"):
+        EnhancedQuizSorter().resolve_unmatched("Period 1.csv", TYPO, "Nobody, Else #9999", {"Quiz 1 (/10)": 7})